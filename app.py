@@ -1,40 +1,150 @@
 import os
+import io
+import functools
+import hashlib
+import json
+import base64
+import atexit
 import logging
 from logging.handlers import RotatingFileHandler
 from flask import Flask, render_template, request, redirect, jsonify, abort
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from datetime import datetime
-from urllib.parse import quote_plus
-import sentry_sdk
-from sentry_sdk.integrations.flask import FlaskIntegration
+from datetime import datetime, timedelta, timezone
+import click
+from flask.cli import AppGroup
 from config import Config
+from link_cache import LinkCache, VersionStamp, DatabaseVersionStamp, ClockVersionStamp, MISSING
+from link_trie import ShortlinkTrie
+from suggestions import SuggestionIndex
+from usage_writer import UsageWriter
+from rollups import (
+    UsageAggregate, apply_aggregate, upsert_counts, merge_sketches, day_bucket, BUCKETS, bucket_range,
+    bucket_starts, visitor_key
+)
+from hll import HyperLogLog
+from retention import UsageRetention, RetentionScheduler
+from search import LinkSearch
+from destinations import DestinationTemplate
+from http_cache import versioned
+from assets import StaticAssets
+from compression import install_compression
+from streaming import STREAM_CHUNK_SIZE, stream_json, wants_ndjson
+from bulk import (
+    FORMATS, RecordError, chunked, export_lines, format_for_content_type,
+    format_for_filename, read_records
+)
+from interning import InternTable
+from db_types import EpochDateTime, PackedIP
+from sqlite_profile import sqlite_pragmas, install_sqlite_profile
+from read_replica import REPLICA_BIND, RoutingSession, use_replica, wrote_recently, install_read_your_writes
+from tracing import init_sentry
+from metrics import MetricsRegistry, install_request_metrics, install_query_metrics
 
 # Initialize Sentry if DSN is provided
-if dsn := os.environ.get('SENTRY_DSN'):
-    sentry_sdk.init(
-        dsn=dsn,
-        integrations=[FlaskIntegration()],
-        traces_sample_rate=1.0,
-        profiles_sample_rate=1.0,
-    )
+if Config.SENTRY_DSN:
+    init_sentry(Config)
 
 app = Flask(__name__)
 app.config.from_object(Config)
 Config.init_app(app)
 
-# Initialize SQLAlchemy with app
-db = SQLAlchemy(app)
+# Initialize SQLAlchemy with app; sessions can route reads to the replica bind
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 migrate = Migrate(app, db)
 
+with app.app_context():
+    install_sqlite_profile(db.engine, sqlite_pragmas(app.config))
+    if REPLICA_BIND in db.engines:
+        install_sqlite_profile(db.engines[REPLICA_BIND], sqlite_pragmas(app.config, read_only=True))
+
+if REPLICA_BIND in app.config['SQLALCHEMY_BINDS'] and app.config['REPLICA_STICKY_SECONDS'] > 0:
+    install_read_your_writes(app, db.session, app.config['REPLICA_STICKY_SECONDS'])
+
+def reads_from_replica(view):
+    """Run a read-only view against the replica, unless the client has just written."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if REPLICA_BIND in app.config['SQLALCHEMY_BINDS'] and not wrote_recently():
+            use_replica(db.session)
+        return view(*args, **kwargs)
+    return wrapper
+
+# Versioned static URLs, cached forever by browsers
+assets = StaticAssets(app)
+
+if app.config['COMPRESSION_MIN_SIZE'] > 0:
+    install_compression(
+        app,
+        min_size=app.config['COMPRESSION_MIN_SIZE'],
+        level=app.config['COMPRESSION_LEVEL']
+    )
+
+# Largest number of shortlinks accepted by the batch stats endpoint
+MAX_STATS_BATCH = 1000
+
+# Time-series analytics: window used when `from` is omitted, and size limits
+TIMESERIES_DEFAULT_SPAN = {
+    'hour': timedelta(hours=48),
+    'day': timedelta(days=30),
+    'week': timedelta(weeks=26),
+}
+MAX_TIMESERIES_POINTS = 1000
+TOP_LINKS_DEFAULT_SPAN = timedelta(days=7)
+MAX_TOP_LINKS = 100
+
+# Pagination of GET /api/links
+LINK_FIELDS = ('id', 'shortlink', 'destination', 'created_at')
+MAX_LINKS_PAGE = 1000
+MAX_CACHED_COUNTS = 256
+
+# Bulk import
+IMPORT_CONFLICT_POLICIES = ('error', 'skip', 'update')
+IMPORT_CHUNK_SIZE = 1000
+
+def version_stamp(name, path, shared=True):
+    """Version stamp shared by every process that uses the database.
+
+    A SQLite database lives on one host, so a file next to it will do; with
+    a database server the stamp is a row in data_versions that every node
+    can see. Stamps that aren't `shared` are bumped too often for a single
+    row, and on a database server expire every VERSION_POLL_INTERVAL
+    seconds instead.
+    """
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == 'sqlite':
+        return VersionStamp(path)
+    if not shared:
+        return ClockVersionStamp(app.config['VERSION_POLL_INTERVAL'])
+    return DatabaseVersionStamp(engine, name, app.config['VERSION_POLL_INTERVAL'])
+
+# Bumped whenever links change. The resolver cache, trie and suggestions
+# each read it through their own reader, and apply this process's changes
+# in place rather than reloading.
+links_stamp = version_stamp('links', app.config['LINKS_VERSION_FILE'])
+
+# In-memory shortlink -> destination map used by redirects
+link_cache = LinkCache(app.config['LINK_CACHE_SIZE'], links_stamp)
+
+# Bumped whenever usage rollups change, for conditional GETs of analytics.
+# Every usage flush bumps it, so it never touches the data_versions row.
+usage_stamp = version_stamp('usage', app.config['USAGE_VERSION_FILE'], shared=False)
+
 # Models
 class GoLink(db.Model):
     __tablename__ = 'golinks'
     id = db.Column(db.Integer, primary_key=True)
     shortlink = db.Column(db.String(255), unique=True, nullable=False, index=True)
     destination = db.Column(db.String(2048), nullable=False)
+    # DestinationTemplate.dumps() of destination, compiled on every write
+    destination_template = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_golinks_created_at_id', 'created_at', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -43,14 +153,272 @@ class GoLink(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+class UserAgent(db.Model):
+    __tablename__ = 'user_agents'
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.String(1024), unique=True, nullable=False, index=True)
+
 class LinkUsage(db.Model):
     __tablename__ = 'link_usage'
     id = db.Column(db.Integer, primary_key=True)
     shortlink = db.Column(db.String(255), nullable=False, index=True)
-    accessed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    accessed_at = db.Column(EpochDateTime, default=datetime.utcnow)
     args = db.Column(db.String(1024), nullable=True)
-    user_agent = db.Column(db.String(1024), nullable=True)
-    ip_address = db.Column(db.String(45), nullable=True)
+    user_agent_id = db.Column(db.Integer, db.ForeignKey('user_agents.id'), nullable=True)
+    ip_address = db.Column(PackedIP, nullable=True)
+
+# Usage rollups, maintained incrementally as usage events are written
+class LinkUsageTotal(db.Model):
+    __tablename__ = 'link_usage_totals'
+    shortlink = db.Column(db.String(255), primary_key=True)
+    visits = db.Column(db.Integer, nullable=False, default=0)
+    last_used = db.Column(db.DateTime, nullable=True)
+    # HyperLogLog sketch of distinct visitors (IP address and user agent),
+    # and its estimate so listings don't have to decode every sketch
+    visitors = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    # NULL for links whose clicks predate the sketches, until a backfill
+    unique_visitors = db.Column(db.Integer, nullable=True, default=0)
+
+class LinkUsageHourly(db.Model):
+    __tablename__ = 'link_usage_hourly'
+    # Covers time-range scans across all shortlinks without touching the table
+    __table_args__ = (db.Index('ix_link_usage_hourly_bucket', 'bucket', 'shortlink', 'visits'),)
+    shortlink = db.Column(db.String(255), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    visits = db.Column(db.Integer, nullable=False, default=0)
+
+class LinkUsageDaily(db.Model):
+    __tablename__ = 'link_usage_daily'
+    # Covers time-range scans across all shortlinks without touching the table
+    __table_args__ = (db.Index('ix_link_usage_daily_bucket', 'bucket', 'shortlink', 'visits'),)
+    shortlink = db.Column(db.String(255), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    visits = db.Column(db.Integer, nullable=False, default=0)
+    # Distinct visitors of the day; merged across days for totals
+    visitors = db.deferred(db.Column(db.LargeBinary, nullable=True))
+
+# Version counters polled by DatabaseVersionStamp
+class DataVersion(db.Model):
+    __tablename__ = 'data_versions'
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False)
+
+def update_rollups(aggregate):
+    apply_aggregate(
+        db.session,
+        aggregate,
+        LinkUsageTotal.__table__,
+        LinkUsageHourly.__table__,
+        LinkUsageDaily.__table__
+    )
+
+# GET /api/links/<shortlink>/stats would read a/stats as the stats of a
+RESERVED_LAST_SEGMENTS = ('stats',)
+
+@functools.cache
+def reserved_segments():
+    """First path segments of the app's own routes, which a shortlink would never reach."""
+    segments = {rule.rule.split('/')[1] for rule in app.url_map.iter_rules()}
+    return {segment for segment in segments if segment and not segment.startswith('<')}
+
+def validate_link(data):
+    """Normalize a submitted link; returns (shortlink, destination, error)."""
+    shortlink = str(data.get('shortlink') or '').strip()
+    destination = str(data.get('destination') or '').strip()
+    
+    if not shortlink or not destination:
+        return shortlink, destination, 'Both shortlink and destination are required'
+    
+    # Slashes separate the segments of hierarchical shortlinks like docs/setup
+    segments = shortlink.split('/')
+    if not all(segments) or not all(c.isalnum() or c in '-_' for c in shortlink.replace('/', '')):
+        return shortlink, destination, 'Shortlink can only contain letters, numbers, hyphens, underscores, and slashes between them'
+    
+    if segments[0] in reserved_segments():
+        return shortlink, destination, f"Shortlinks can't start with '{segments[0]}', it is used by golinks itself"
+    if len(segments) > 1 and segments[-1] in RESERVED_LAST_SEGMENTS:
+        return shortlink, destination, f"Shortlinks can't end with '/{segments[-1]}', it is used by golinks itself"
+    
+    if not destination.startswith(('http://', 'https://')):
+        destination = 'https://' + destination
+    
+    return shortlink, destination, None
+
+def all_shortlinks():
+    return (row.shortlink for row in db.session.query(GoLink.shortlink).execution_options(yield_per=10000))
+
+# Longest-prefix matching of request paths against every shortlink
+link_trie = ShortlinkTrie(all_shortlinks, links_stamp.reader())
+
+# "Did you mean" suggestions for shortlinks that don't exist
+link_suggestions = SuggestionIndex(all_shortlinks, links_stamp.reader())
+
+def compile_destination(destination):
+    return DestinationTemplate.compile(destination).dumps()
+
+def resolve_destination(shortlink):
+    """Return the compiled DestinationTemplate of a shortlink, or None if it doesn't exist."""
+    template = link_cache.get(shortlink)
+    if template is not MISSING:
+        return template
+    return load_destination(shortlink)
+
+def load_destination(shortlink):
+    """Look a shortlink up in the database and put the result in the resolver cache."""
+    generation = link_cache.generation
+    row = db.session.query(GoLink.destination, GoLink.destination_template).filter_by(
+        shortlink=shortlink
+    ).first()
+    template = None
+    if row and row.destination_template:
+        template = DestinationTemplate.loads(row.destination_template)
+    elif row:
+        template = DestinationTemplate.compile(row.destination)
+    link_cache.put(shortlink, template, generation)
+    return template
+
+# User agent strings are stored once in user_agents and referenced by id
+user_agents = InternTable(db, UserAgent)
+
+def usage_rows(events):
+    """Turn usage events into link_usage rows, interning their user agents."""
+    agent_ids = user_agents.ids({event['user_agent'] for event in events})
+    return [{
+        'shortlink': event['shortlink'],
+        'accessed_at': event['accessed_at'],
+        'args': event['args'],
+        'user_agent_id': agent_ids.get(event['user_agent']),
+        'ip_address': event['ip_address']
+    } for event in events]
+
+def write_usage_events(events):
+    """Insert a batch of queued usage events in a single transaction."""
+    aggregate = UsageAggregate()
+    for event in events:
+        aggregate.add(
+            event['shortlink'],
+            event['accessed_at'],
+            visitor_key(event['ip_address'], event['user_agent'])
+        )
+    
+    with app.app_context():
+        try:
+            db.session.execute(db.insert(LinkUsage), usage_rows(events))
+            update_rollups(aggregate)
+            db.session.commit()
+            usage_stamp.bump()
+        except Exception:
+            # Ids of user agents inserted by this transaction are gone too
+            db.session.rollback()
+            user_agents.clear()
+            raise
+
+# Click recording happens off the request path
+usage_writer = UsageWriter(
+    write_usage_events,
+    max_queue=app.config['USAGE_QUEUE_SIZE'],
+    batch_size=app.config['USAGE_FLUSH_SIZE'],
+    interval_ms=app.config['USAGE_FLUSH_INTERVAL_MS'],
+    overflow=app.config['USAGE_OVERFLOW_POLICY'],
+    logger=app.logger
+)
+atexit.register(usage_writer.stop)
+
+# Old raw clicks are archived and deleted; the rollups keep their counts
+def archived_usage(row):
+    return {
+        'id': row.id,
+        'shortlink': row.shortlink,
+        'accessed_at': row.accessed_at.isoformat() if row.accessed_at else None,
+        'args': row.args,
+        'user_agent': user_agents.value(row.user_agent_id),
+        'ip_address': row.ip_address
+    }
+
+usage_retention = UsageRetention(
+    db,
+    LinkUsage,
+    app.config['ARCHIVE_DIR'],
+    batch_size=app.config['RETENTION_BATCH_SIZE'],
+    logger=app.logger,
+    serialize=archived_usage
+)
+
+def run_scheduled_retention():
+    with app.app_context():
+        usage_retention.run(app.config['RETENTION_DAYS'])
+
+retention_scheduler = RetentionScheduler(
+    run_scheduled_retention,
+    app.config['RETENTION_INTERVAL_HOURS'] * 3600,
+    os.path.join(app.config['GOLINKS_DIR'], 'retention.lock'),
+    logger=app.logger
+)
+
+if app.config['RETENTION_DAYS'] > 0:
+    @app.before_request
+    def start_retention_scheduler():
+        retention_scheduler.ensure_started()
+
+# Metrics exposed on /api/metrics
+metrics = MetricsRegistry()
+request_duration = None
+if app.config['METRICS_ENABLED']:
+    request_duration = metrics.histogram(
+        'golinks_request_duration_seconds',
+        'Request latency by endpoint.',
+        ('endpoint', 'method', 'status')
+    )
+    install_request_metrics(app, request_duration)
+    query_duration = metrics.histogram(
+        'golinks_db_query_duration_seconds',
+        'SQL statement latency by statement type.',
+        ('statement',)
+    )
+    with app.app_context():
+        for engine in db.engines.values():
+            install_query_metrics(engine, query_duration)
+    metrics.counter_callback('golinks_link_cache_hits_total', 'Redirect lookups served from the resolver cache.', lambda: link_cache.hits)
+    metrics.counter_callback('golinks_link_cache_misses_total', 'Redirect lookups that went to the database.', lambda: link_cache.misses)
+    metrics.gauge_callback('golinks_link_cache_entries', 'Shortlinks held in the resolver cache.', lambda: len(link_cache))
+    metrics.gauge_callback('golinks_usage_queue_depth', 'Usage events waiting to be written.', usage_writer.depth)
+    metrics.counter_callback('golinks_usage_events_queued_total', 'Usage events accepted into the queue.', lambda: usage_writer.queued)
+    metrics.counter_callback('golinks_usage_events_flushed_total', 'Usage events written to the database.', lambda: usage_writer.flushed)
+    metrics.counter_callback('golinks_usage_events_dropped_total', 'Usage events dropped because the queue was full.', lambda: usage_writer.dropped)
+    metrics.counter_callback('golinks_usage_events_failed_total', 'Usage events lost to write errors.', lambda: usage_writer.failed)
+
+def encode_cursor(*position):
+    """Opaque cursor: (created_at, id) of the last link, or an offset for ranked search."""
+    raw = json.dumps([p.isoformat() if isinstance(p, datetime) else p for p in position]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor, ranked):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if ranked:
+            (offset,) = position
+            return int(offset)
+        created_at, link_id = position
+        return datetime.fromisoformat(created_at), int(link_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+link_search = LinkSearch()
+
+# Link counts per search query, valid until the links table changes
+_link_counts = {}
+
+def count_links(search_query, query):
+    signature = link_cache.stamp.signature()
+    cached = _link_counts.get(search_query)
+    if cached and cached[0] == signature:
+        return cached[1]
+    
+    total = query.order_by(None).count()
+    if len(_link_counts) >= MAX_CACHED_COUNTS:
+        _link_counts.clear()
+    _link_counts[search_query] = (signature, total)
+    return total
 
 # Error handlers
 @app.errorhandler(404)
@@ -67,44 +435,73 @@ def internal_error(error):
         return jsonify({'error': 'Internal server error'}), 500
     return render_template('error.html'), 500
 
+# The dashboard has no per-request data, so it is rendered once per process
+_index_page = None
+
+def index_page():
+    """Return (hash, html) of the rendered dashboard."""
+    global _index_page
+    if _index_page is None or app.debug:
+        html = render_template('index.html')
+        _index_page = (hashlib.sha1(html.encode()).hexdigest(), html)
+    return _index_page
+
+def index_version():
+    return index_page()[0]
+
 # Routes
 @app.route('/')
+@versioned(index_version)
 def root():
-    return render_template('index.html')
+    return index_page()[1]
+
+@app.route('/api/metrics')
+def get_metrics():
+    if not app.config['METRICS_ENABLED']:
+        abort(404)
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 @app.route('/<path:shortlink>')
 def handle_go_link(shortlink):
     try:
-        # Find the link in database
-        link = GoLink.query.filter_by(shortlink=shortlink).first()
-        if not link:
+        # The longest shortlink that prefixes the path wins; the rest of the
+        # path is passed to the destination
+        request_path = shortlink
+        shortlink, path = link_trie.longest_prefix(request_path)
+        
+        # Find the link in the resolver cache or database
+        template = resolve_destination(shortlink) if shortlink else None
+        if template is None:
+            shortlink = shortlink or request_path
             app.logger.info(f'Shortlink not found: {shortlink}')
-            return render_template('not_found.html', shortlink=shortlink), 404
+            limit = app.config['SUGGESTION_LIMIT']
+            suggestions = link_suggestions.suggest(shortlink, limit=limit) if limit > 0 else []
+            query = request.query_string.decode()
+            return render_template(
+                'not_found.html',
+                shortlink=shortlink,
+                suggestions=suggestions,
+                query=f'?{query}' if query else ''
+            ), 404
         
         # Get any additional arguments
         args = request.args.get('q', '')
         
         # Record usage with additional metadata
-        usage = LinkUsage(
-            shortlink=shortlink,
-            args=args,
-            user_agent=request.user_agent.string,
-            ip_address=request.remote_addr
-        )
-        db.session.add(usage)
-        db.session.commit()
+        usage_writer.enqueue({
+            'shortlink': shortlink,
+            'accessed_at': datetime.utcnow(),
+            'args': args or path,
+            'user_agent': request.user_agent.string,
+            'ip_address': request.remote_addr
+        })
         
-        # Handle the destination URL
-        destination = link.destination
-        if '{query}' in destination and args:
-            destination = destination.replace('{query}', quote_plus(args))
-        elif args:
-            if '?' in destination:
-                destination += f'&q={quote_plus(args)}'
-            else:
-                destination += f'?q={quote_plus(args)}'
+        destination = template.expand(args, path, request.args)
         
-        return redirect(destination)
+        response = redirect(destination)
+        if app.config['REDIRECT_CACHE_MAX_AGE'] > 0:
+            response.headers['Cache-Control'] = f"private, max-age={app.config['REDIRECT_CACHE_MAX_AGE']}"
+        return response
     
     except Exception as e:
         app.logger.error(f'Error handling go link: {str(e)}')
@@ -112,20 +509,78 @@ def handle_go_link(shortlink):
         return redirect('/')
 
 @app.route('/api/links', methods=['GET'])
+@versioned(link_cache.stamp.signature)
+@reads_from_replica
 def get_links():
     try:
         search_query = request.args.get('q', '').strip().lower()
-        query = GoLink.query.order_by(GoLink.created_at.desc())
         
+        fields = request.args.get('fields')
+        fields = fields.split(',') if fields else list(LINK_FIELDS)
+        if not fields or any(field not in LINK_FIELDS for field in fields):
+            return jsonify({'error': f"fields must be a comma-separated subset of {', '.join(LINK_FIELDS)}"}), 400
+        
+        limit = request.args.get('limit', type=int)
+        if limit is not None and not 1 <= limit <= MAX_LINKS_PAGE:
+            return jsonify({'error': f'limit must be between 1 and {MAX_LINKS_PAGE}'}), 400
+        
+        # Only load the requested columns plus the keyset columns
+        columns = {field: getattr(GoLink, field) for field in fields}
+        columns.setdefault('created_at', GoLink.created_at)
+        columns.setdefault('id', GoLink.id)
+        query = db.session.query(*columns.values()).order_by(
+            GoLink.created_at.desc(), GoLink.id.desc()
+        )
+        
+        ranked = False
         if search_query:
-            search_filter = db.or_(
-                GoLink.shortlink.ilike(f'%{search_query}%'),
-                GoLink.destination.ilike(f'%{search_query}%')
-            )
-            query = query.filter(search_filter)
+            query, ranked = link_search.apply(query, db.engine, GoLink, search_query)
+        total = count_links(search_query, query)
+        
+        cursor = request.args.get('cursor')
+        try:
+            cursor = decode_cursor(cursor, ranked) if cursor else None
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        # Ranked results page by offset, everything else by keyset
+        offset = (cursor or 0) if ranked else 0
+        if cursor and not ranked:
+            created_at, link_id = cursor
+            query = query.filter(db.or_(
+                GoLink.created_at < created_at,
+                db.and_(GoLink.created_at == created_at, GoLink.id < link_id)
+            ))
+        
+        def serialize(row):
+            row = row._asdict()
+            return {
+                field: row[field].isoformat() if field == 'created_at' else row[field]
+                for field in fields
+            }
+        
+        # Without a limit the whole table is streamed instead of built in memory
+        if limit is None:
+            rows = query.execution_options(yield_per=STREAM_CHUNK_SIZE)
+            response = stream_json((serialize(row) for row in rows), wants_ndjson())
+            response.headers['X-Total-Count'] = str(total)
+            return response
         
-        links = query.all()
-        return jsonify([link.to_dict() for link in links])
+        rows = query.offset(offset).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        links = [serialize(row) for row in rows[:limit]]
+        
+        if wants_ndjson():
+            response = stream_json(links, ndjson=True)
+        else:
+            response = jsonify(links)
+        response.headers['X-Total-Count'] = str(total)
+        if has_more and ranked:
+            response.headers['X-Next-Cursor'] = encode_cursor(offset + limit)
+        elif has_more:
+            last = rows[limit - 1]
+            response.headers['X-Next-Cursor'] = encode_cursor(last.created_at, last.id)
+        return response
     except Exception as e:
         app.logger.error(f'Error getting links: {str(e)}')
         return jsonify({'error': 'Internal server error'}), 500
@@ -134,25 +589,24 @@ def get_links():
 def create_link():
     try:
         data = request.get_json()
-        shortlink = data.get('shortlink', '').strip()
-        destination = data.get('destination', '').strip()
-        
-        if not shortlink or not destination:
-            return jsonify({'error': 'Both shortlink and destination are required'}), 400
-        
-        if not shortlink.isalnum() and not all(c in '-_' for c in shortlink if not c.isalnum()):
-            return jsonify({'error': 'Shortlink can only contain letters, numbers, hyphens, and underscores'}), 400
-            
-        if not destination.startswith(('http://', 'https://')):
-            destination = 'https://' + destination
+        shortlink, destination, error = validate_link(data)
+        if error:
+            return jsonify({'error': error}), 400
         
         existing = GoLink.query.filter_by(shortlink=shortlink).first()
         if existing:
             return jsonify({'error': 'Shortlink already exists'}), 409
         
-        link = GoLink(shortlink=shortlink, destination=destination)
+        link = GoLink(
+            shortlink=shortlink,
+            destination=destination,
+            destination_template=compile_destination(destination)
+        )
         db.session.add(link)
         db.session.commit()
+        link_cache.invalidate(shortlink)
+        link_trie.add(shortlink)
+        link_suggestions.add(shortlink)
         
         return jsonify(link.to_dict()), 201
     
@@ -161,7 +615,7 @@ def create_link():
         db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/links/<string:shortlink>', methods=['DELETE'])
+@app.route('/api/links/<path:shortlink>', methods=['DELETE'])
 def delete_link(shortlink):
     try:
         link = GoLink.query.filter_by(shortlink=shortlink).first()
@@ -170,6 +624,9 @@ def delete_link(shortlink):
         
         db.session.delete(link)
         db.session.commit()
+        link_cache.invalidate(shortlink)
+        link_trie.remove(shortlink)
+        link_suggestions.remove(shortlink)
         return '', 204
     
     except Exception as e:
@@ -185,26 +642,25 @@ def update_link(link_id):
             return '', 404
         
         data = request.get_json()
-        shortlink = data.get('shortlink', '').strip()
-        destination = data.get('destination', '').strip()
-        
-        if not shortlink or not destination:
-            return jsonify({'error': 'Both shortlink and destination are required'}), 400
-        
-        if not shortlink.isalnum() and not all(c in '-_' for c in shortlink if not c.isalnum()):
-            return jsonify({'error': 'Shortlink can only contain letters, numbers, hyphens, and underscores'}), 400
-            
-        if not destination.startswith(('http://', 'https://')):
-            destination = 'https://' + destination
+        shortlink, destination, error = validate_link(data)
+        if error:
+            return jsonify({'error': error}), 400
         
         # Check if the new shortlink already exists (excluding the current link)
         existing = GoLink.query.filter(GoLink.shortlink == shortlink, GoLink.id != link_id).first()
         if existing:
             return jsonify({'error': 'Shortlink already exists'}), 409
         
+        old_shortlink = link.shortlink
         link.shortlink = shortlink
         link.destination = destination
+        link.destination_template = compile_destination(destination)
         db.session.commit()
+        link_cache.invalidate(old_shortlink, shortlink)
+        link_trie.remove(old_shortlink)
+        link_trie.add(shortlink)
+        link_suggestions.remove(old_shortlink)
+        link_suggestions.add(shortlink)
         
         return jsonify(link.to_dict()), 200
     
@@ -213,44 +669,483 @@ def update_link(link_id):
         db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/links/<string:shortlink>/stats', methods=['GET'])
-def get_link_stats(shortlink):
+def parse_timestamp(value):
+    """Parse an ISO 8601 timestamp into naive UTC; empty means now."""
+    if not value:
+        return datetime.utcnow()
+    timestamp = datetime.fromisoformat(str(value))
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def import_links(records, on_conflict='error', chunk_size=IMPORT_CHUNK_SIZE):
+    """Create links from (row number, record) pairs, one transaction per chunk.
+    
+    Existing shortlinks are looked up with a single query per chunk and are
+    reported as errors, skipped or updated depending on `on_conflict`.
+    Returns counts of created, updated and skipped links and an error entry
+    for every row that was not imported, in row order.
+    """
+    report = {'created': 0, 'updated': 0, 'skipped': 0, 'errors': []}
+    seen = set()
+    
+    for chunk in chunked(records, chunk_size):
+        rows = {}
+        for number, record in chunk:
+            if isinstance(record, RecordError):
+                report['errors'].append({'row': number, 'error': str(record)})
+                continue
+            
+            shortlink, destination, error = validate_link(record)
+            if not error and shortlink in seen:
+                error = 'Duplicate shortlink in input'
+            if not error:
+                try:
+                    created_at = parse_timestamp(record.get('created_at'))
+                except ValueError:
+                    error = 'created_at must be an ISO 8601 timestamp'
+            if error:
+                report['errors'].append({'row': number, 'shortlink': shortlink, 'error': error})
+                continue
+            
+            seen.add(shortlink)
+            rows[shortlink] = (number, {
+                'shortlink': shortlink,
+                'destination': destination,
+                'destination_template': compile_destination(destination),
+                'created_at': created_at
+            })
+        
+        if not rows:
+            continue
+        
+        existing = dict(
+            db.session.query(GoLink.shortlink, GoLink.id).filter(GoLink.shortlink.in_(rows))
+        )
+        inserts, updates, changed = [], [], []
+        for shortlink, (number, row) in rows.items():
+            if shortlink not in existing:
+                inserts.append(row)
+                changed.append(shortlink)
+            elif on_conflict == 'update':
+                updates.append({
+                    'id': existing[shortlink],
+                    'destination': row['destination'],
+                    'destination_template': row['destination_template']
+                })
+                changed.append(shortlink)
+            elif on_conflict == 'skip':
+                report['skipped'] += 1
+            else:
+                report['errors'].append({'row': number, 'shortlink': shortlink, 'error': 'Shortlink already exists'})
+        
+        try:
+            if inserts:
+                db.session.execute(db.insert(GoLink), inserts)
+            if updates:
+                db.session.execute(db.update(GoLink), updates)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        report['created'] += len(inserts)
+        report['updated'] += len(updates)
+        if changed:
+            link_cache.invalidate(*changed)
+            for row in inserts:
+                link_trie.add(row['shortlink'])
+                link_suggestions.add(row['shortlink'])
+    
+    # Conflicts are only found after a chunk is validated; report in input order
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
+
+@app.route('/api/links/bulk', methods=['POST'])
+def bulk_import_links():
     try:
-        # Get visit count
-        visit_count = LinkUsage.query.filter_by(shortlink=shortlink).count()
+        on_conflict = request.args.get('on_conflict', 'error')
+        if on_conflict not in IMPORT_CONFLICT_POLICIES:
+            return jsonify({'error': f"on_conflict must be one of {', '.join(IMPORT_CONFLICT_POLICIES)}"}), 400
         
-        # Get last used time
-        last_usage = LinkUsage.query.filter_by(shortlink=shortlink).order_by(LinkUsage.accessed_at.desc()).first()
+        fmt = format_for_content_type(request.mimetype)
+        if fmt is None:
+            return jsonify({'error': 'Content-Type must be text/csv, application/x-ndjson or application/json'}), 415
         
-        stats = {
-            'visits': visit_count,
-            'last_used': last_usage.accessed_at.isoformat() if last_usage else None
-        }
+        if fmt == 'json':
+            data = request.get_json()
+            links = data.get('links') if isinstance(data, dict) else data
+            if not isinstance(links, list):
+                return jsonify({'error': 'Expected a list of links'}), 400
+            records = (
+                (number, record if isinstance(record, dict) else RecordError('Expected a JSON object'))
+                for number, record in enumerate(links, start=1)
+            )
+        else:
+            # Parse the body while it is read instead of buffering it whole
+            stream = io.TextIOWrapper(
+                io.BufferedReader(request.stream),
+                encoding=request.mimetype_params.get('charset', 'utf-8'),
+                newline=''
+            )
+            records = read_records(stream, fmt)
         
-        return jsonify(stats)
+        return jsonify(import_links(records, on_conflict)), 200
+    
+    except UnicodeDecodeError:
+        return jsonify({'error': 'Request body is not valid text'}), 400
+    except Exception as e:
+        app.logger.error(f'Error importing links: {str(e)}')
+        return jsonify({'error': 'Internal server error'}), 500
+
+def usage_stats(totals):
+    return {
+        'visits': totals.visits if totals else 0,
+        'unique_visitors': totals.unique_visitors if totals else 0,
+        'last_used': totals.last_used.isoformat() if totals and totals.last_used else None
+    }
+
+@app.route('/api/links/<path:shortlink>/stats', methods=['GET'])
+@versioned(usage_stamp.signature)
+@reads_from_replica
+def get_link_stats(shortlink):
+    try:
+        totals = db.session.get(LinkUsageTotal, shortlink)
+        return jsonify(usage_stats(totals))
     except Exception as e:
         app.logger.error(f'Error getting link stats: {str(e)}')
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/links/stats', methods=['POST'])
+@reads_from_replica
+def get_links_stats():
+    try:
+        data = request.get_json(silent=True)
+        shortlinks = data.get('shortlinks') if isinstance(data, dict) else None
+        
+        if not isinstance(shortlinks, list) or not all(isinstance(s, str) for s in shortlinks):
+            return jsonify({'error': 'shortlinks must be a list of strings'}), 400
+        
+        if len(shortlinks) > MAX_STATS_BATCH:
+            return jsonify({'error': f'At most {MAX_STATS_BATCH} shortlinks can be requested at once'}), 400
+        
+        totals = {}
+        if shortlinks:
+            rows = LinkUsageTotal.query.filter(LinkUsageTotal.shortlink.in_(set(shortlinks))).all()
+            totals = {row.shortlink: row for row in rows}
+        
+        return jsonify({shortlink: usage_stats(totals.get(shortlink)) for shortlink in shortlinks})
+    except Exception as e:
+        app.logger.error(f'Error getting links stats: {str(e)}')
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/analytics')
+@versioned(usage_stamp.signature)
+@reads_from_replica
 def get_analytics():
     try:
         analytics = db.session.query(
-            LinkUsage.shortlink,
-            db.func.count(LinkUsage.id).label('usage_count'),
-            db.func.max(LinkUsage.accessed_at).label('last_used')
-        ).group_by(LinkUsage.shortlink).all()
+            LinkUsageTotal.shortlink,
+            LinkUsageTotal.visits,
+            LinkUsageTotal.unique_visitors,
+            LinkUsageTotal.last_used
+        ).order_by(LinkUsageTotal.shortlink).execution_options(yield_per=STREAM_CHUNK_SIZE)
         
-        return jsonify([{
+        return stream_json(({
             'shortlink': item[0],
             'usage_count': item[1],
-            'last_used': item[2].isoformat() if item[2] else None
-        } for item in analytics])
+            'unique_visitors': item[2],
+            'last_used': item[3].isoformat() if item[3] else None
+        } for item in analytics), wants_ndjson())
     
     except Exception as e:
         app.logger.error(f'Error getting analytics: {str(e)}')
         return jsonify({'error': 'Internal server error'}), 500
 
+def analytics_window(default_span):
+    """Read the `from` and `to` query arguments; returns (start, end, error).
+    
+    Both are ISO 8601 timestamps, converted to naive UTC. `to` defaults to
+    now and `from` to `default_span` before `to`.
+    """
+    try:
+        end = parse_timestamp(request.args.get('to'))
+        start = parse_timestamp(request.args.get('from')) if request.args.get('from') else end - default_span
+    except ValueError:
+        return None, None, 'from and to must be ISO 8601 timestamps'
+    if start >= end:
+        return None, None, 'from must be earlier than to'
+    return start, end, None
+
+def windowed_visits(start, end):
+    """Select (shortlink, visits) rows covering the hours in [start, end).
+    
+    Whole days come from the daily rollup and only the hours at either end
+    from the hourly one, so long windows read few rows.
+    """
+    hourly, daily = LinkUsageHourly, LinkUsageDaily
+    first_day = day_bucket(start)
+    if first_day < start:
+        first_day += timedelta(days=1)
+    last_day = day_bucket(end)
+    
+    if first_day >= last_day:
+        return db.select(hourly.shortlink, hourly.visits).where(hourly.bucket >= start, hourly.bucket < end)
+    return db.union_all(
+        db.select(hourly.shortlink, hourly.visits).where(hourly.bucket >= start, hourly.bucket < first_day),
+        db.select(daily.shortlink, daily.visits).where(daily.bucket >= first_day, daily.bucket < last_day),
+        db.select(hourly.shortlink, hourly.visits).where(hourly.bucket >= last_day, hourly.bucket < end)
+    )
+
+@app.route('/api/analytics/timeseries')
+@versioned(usage_stamp.signature)
+@reads_from_replica
+def get_analytics_timeseries():
+    try:
+        bucket = request.args.get('bucket', 'day')
+        if bucket not in BUCKETS:
+            return jsonify({'error': f"bucket must be one of: {', '.join(BUCKETS)}"}), 400
+        
+        start, end, error = analytics_window(TIMESERIES_DEFAULT_SPAN[bucket])
+        if error:
+            return jsonify({'error': error}), 400
+        start, end, count = bucket_range(start, end, bucket)
+        if count > MAX_TIMESERIES_POINTS:
+            return jsonify({
+                'error': f'At most {MAX_TIMESERIES_POINTS} buckets can be requested at once; use a larger bucket'
+            }), 400
+        
+        # Weeks are summed from the daily rollup
+        rollup = LinkUsageHourly if bucket == 'hour' else LinkUsageDaily
+        query = db.session.query(rollup.bucket, db.func.sum(rollup.visits)).filter(
+            rollup.bucket >= start,
+            rollup.bucket < end
+        )
+        shortlink = request.args.get('shortlink')
+        if shortlink:
+            query = query.filter(rollup.shortlink == shortlink)
+        
+        floor = BUCKETS[bucket][1]
+        visits = {}
+        for row_bucket, row_visits in query.group_by(rollup.bucket):
+            key = floor(row_bucket)
+            visits[key] = visits.get(key, 0) + row_visits
+        
+        points = [
+            {'t': point.isoformat(), 'visits': visits.get(point, 0)}
+            for point in bucket_starts(start, end, bucket)
+        ]
+        return jsonify({
+            'shortlink': shortlink or None,
+            'bucket': bucket,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'total': sum(visits.values()),
+            'points': points
+        })
+    
+    except Exception as e:
+        app.logger.error(f'Error getting analytics time series: {str(e)}')
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/api/analytics/top')
+@versioned(usage_stamp.signature)
+@reads_from_replica
+def get_top_links():
+    try:
+        try:
+            limit = int(request.args.get('limit', 10))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if not 1 <= limit <= MAX_TOP_LINKS:
+            return jsonify({'error': f'limit must be between 1 and {MAX_TOP_LINKS}'}), 400
+        
+        start, end, error = analytics_window(TOP_LINKS_DEFAULT_SPAN)
+        if error:
+            return jsonify({'error': error}), 400
+        start, end, _ = bucket_range(start, end, 'hour')
+        
+        rows = windowed_visits(start, end).subquery()
+        total = db.func.sum(rows.c.visits).label('visits')
+        top = db.session.query(rows.c.shortlink, total).group_by(rows.c.shortlink).order_by(
+            total.desc(),
+            rows.c.shortlink
+        ).limit(limit)
+        
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'links': [{'shortlink': shortlink, 'visits': visits} for shortlink, visits in top]
+        })
+    
+    except Exception as e:
+        app.logger.error(f'Error getting top links: {str(e)}')
+        return jsonify({'error': 'Internal server error'}), 500
+
+def rebuild_rollups(chunk_size=10000):
+    """Recompute the usage rollup tables from the raw link_usage rows.
+    
+    Clicks removed by retention only survive in the rollups, so buckets older
+    than the oldest raw row are left alone and totals are summed from the
+    daily buckets. Likewise the visitor sketches of the totals are merged
+    from the daily ones.
+    
+    Retention prunes a day in batches, so the oldest day may have lost some
+    of its raw rows: its buckets are only raised to the recomputed counts,
+    never lowered. Every later day is rebuilt from scratch.
+    """
+    oldest = db.session.query(db.func.min(LinkUsage.accessed_at)).scalar()
+    if oldest is None:
+        first_day_end = None
+    else:
+        first_day_end = day_bucket(oldest) + timedelta(days=1)
+        db.session.query(LinkUsageHourly).filter(LinkUsageHourly.bucket >= first_day_end).delete()
+        db.session.query(LinkUsageDaily).filter(LinkUsageDaily.bucket >= first_day_end).delete()
+    
+    def raw_rows(*criteria):
+        return db.session.query(
+            LinkUsage.shortlink,
+            LinkUsage.accessed_at,
+            LinkUsage.ip_address,
+            UserAgent.value
+        ).outerjoin(UserAgent, LinkUsage.user_agent_id == UserAgent.id).filter(
+            LinkUsage.accessed_at.isnot(None), *criteria
+        ).execution_options(yield_per=chunk_size)
+    
+    def write_chunk(aggregate, keep_larger=False):
+        upsert_counts(
+            db.session, LinkUsageHourly.__table__, aggregate.hourly_rows(), ['shortlink', 'bucket'], keep_larger
+        )
+        upsert_counts(
+            db.session, LinkUsageDaily.__table__, aggregate.daily_rows(), ['shortlink', 'bucket'], keep_larger
+        )
+        merge_sketches(db.session, LinkUsageDaily.__table__, aggregate.daily_visitors, ['shortlink', 'bucket'])
+    
+    last_used = {}
+    count = 0
+    if first_day_end is not None:
+        # Aggregated in one go: keeping the larger count is only right for
+        # the whole day's counts, not for chunks of them
+        aggregate = UsageAggregate()
+        for shortlink, accessed_at, ip_address, user_agent in raw_rows(LinkUsage.accessed_at < first_day_end):
+            aggregate.add(shortlink, accessed_at, visitor_key(ip_address, user_agent))
+            count += 1
+        last_used.update(aggregate.last_used)
+        write_chunk(aggregate, keep_larger=True)
+    
+    rows = raw_rows() if first_day_end is None else raw_rows(LinkUsage.accessed_at >= first_day_end)
+    aggregate = UsageAggregate()
+    for shortlink, accessed_at, ip_address, user_agent in rows:
+        aggregate.add(shortlink, accessed_at, visitor_key(ip_address, user_agent))
+        count += 1
+        if count % chunk_size == 0:
+            last_used.update(aggregate.last_used)
+            write_chunk(aggregate)
+            aggregate = UsageAggregate()
+    last_used.update(aggregate.last_used)
+    write_chunk(aggregate)
+    
+    for shortlink, previous in db.session.query(LinkUsageTotal.shortlink, LinkUsageTotal.last_used):
+        if previous and (shortlink not in last_used or previous > last_used[shortlink]):
+            last_used[shortlink] = previous
+    db.session.query(LinkUsageTotal).delete()
+    totals = db.session.query(LinkUsageDaily.shortlink, db.func.sum(LinkUsageDaily.visits)).group_by(
+        LinkUsageDaily.shortlink
+    ).all()
+    if totals:
+        db.session.execute(db.insert(LinkUsageTotal), [
+            {'shortlink': shortlink, 'visits': visits, 'last_used': last_used.get(shortlink)}
+            for shortlink, visits in totals
+        ])
+    
+    # Merging is idempotent, so a shortlink split across two batches is fine
+    sketches = {}
+    daily_sketches = db.session.query(LinkUsageDaily.shortlink, LinkUsageDaily.visitors).filter(
+        LinkUsageDaily.visitors.isnot(None)
+    ).order_by(LinkUsageDaily.shortlink).execution_options(yield_per=chunk_size)
+    for shortlink, blob in daily_sketches:
+        sketches.setdefault((shortlink,), HyperLogLog()).merge(HyperLogLog.loads(blob))
+        # Each sketch holds 2 KB of registers
+        if len(sketches) >= 1000:
+            merge_sketches(db.session, LinkUsageTotal.__table__, sketches, ['shortlink'])
+            sketches = {}
+    merge_sketches(db.session, LinkUsageTotal.__table__, sketches, ['shortlink'])
+    
+    db.session.commit()
+    usage_stamp.bump()
+    return count
+
+# CLI commands
+usage_cli = AppGroup('usage', help='Manage link usage data.')
+
+@usage_cli.command('backfill')
+@click.option('--chunk-size', default=10000, show_default=True,
+              help='Number of usage rows aggregated per upsert.')
+def backfill_rollups(chunk_size):
+    """Rebuild the usage rollup tables from the raw link_usage rows."""
+    count = rebuild_rollups(chunk_size)
+    click.echo(f'Rolled up {count} usage rows')
+
+@usage_cli.command('prune')
+@click.option('--days', type=int, default=None,
+              help='Keep raw clicks for this many days (default: GOLINKS_RETENTION_DAYS).')
+@click.option('--batch-size', type=int, default=None,
+              help='Rows deleted per transaction (default: GOLINKS_RETENTION_BATCH_SIZE).')
+@click.option('--no-archive', is_flag=True, help='Delete old clicks without exporting them.')
+@click.option('--full-vacuum', is_flag=True,
+              help='Run a full VACUUM if the database is not in incremental auto_vacuum mode.')
+def prune_usage(days, batch_size, no_archive, full_vacuum):
+    """Archive and delete raw clicks older than the retention period."""
+    days = days if days is not None else app.config['RETENTION_DAYS']
+    if days <= 0:
+        raise click.UsageError('Set --days or GOLINKS_RETENTION_DAYS to a positive number of days')
+    if batch_size:
+        usage_retention.batch_size = batch_size
+    removed = usage_retention.run(days, archive=not no_archive, full_vacuum=full_vacuum)
+    click.echo(f'Removed {removed} usage rows older than {days} days')
+
+app.cli.add_command(usage_cli)
+
+golinks_cli = AppGroup('golinks', help='Import and export links.')
+
+@golinks_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS),
+              help='Input format (default: from the file extension, else jsonl).')
+@click.option('--on-conflict', type=click.Choice(IMPORT_CONFLICT_POLICIES), default='error',
+              show_default=True, help='What to do with shortlinks that already exist.')
+@click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True,
+              help='Links inserted per transaction.')
+def import_links_command(source, fmt, on_conflict, chunk_size):
+    """Import links from a CSV or JSONL file (- for stdin)."""
+    fmt = fmt or format_for_filename(source.name)
+    report = import_links(read_records(source, fmt), on_conflict, chunk_size)
+    for error in report['errors']:
+        click.echo(f"Row {error['row']}: {error['error']}", err=True)
+    click.echo(
+        f"Created {report['created']}, updated {report['updated']}, "
+        f"skipped {report['skipped']}, failed {len(report['errors'])}"
+    )
+
+@golinks_cli.command('export')
+@click.argument('target', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS),
+              help='Output format (default: from the file extension, else jsonl).')
+def export_links_command(target, fmt):
+    """Export all links as CSV or JSONL (- for stdout)."""
+    fmt = fmt or format_for_filename(target.name)
+    rows = db.session.query(GoLink.shortlink, GoLink.destination, GoLink.created_at).order_by(
+        GoLink.id
+    ).execution_options(yield_per=IMPORT_CHUNK_SIZE)
+    rows = (
+        (shortlink, destination, created_at.isoformat() if created_at else None)
+        for shortlink, destination, created_at in rows
+    )
+    for line in export_lines(rows, fmt):
+        target.write(line)
+
+app.cli.add_command(golinks_cli)
+
 def setup_logging(app):
     if not app.debug:
         file_handler = RotatingFileHandler(
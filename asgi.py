@@ -0,0 +1,240 @@
+# ASGI entry point for serving golinks on an event loop:
+#   uvicorn asgi:application      (or: python asgi.py)
+#
+# Shortlink redirects are answered on the loop itself from the in-memory
+# trie and resolver cache. Only a cache miss reads the database, in a small
+# thread pool, so a slow query or commit never holds up other redirects.
+# Whether other processes changed the links is checked in that pool too,
+# once per GOLINKS_VERSION_POLL_INTERVAL, so the loop never reads the stamp.
+# Everything else, including the not-found page, runs in the Flask app
+# through asgiref's WSGI adapter, which also keeps it off the loop.
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qsl
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.urls import iri_to_uri
+from werkzeug.utils import redirect
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from link_cache import MISSING
+from app import (
+    app, link_cache, link_trie, load_destination, request_duration,
+    resolve_destination, retention_scheduler, usage_writer
+)
+
+REDIRECT_METHODS = ('GET', 'HEAD')
+
+
+def links_current():
+    """Catch up with link changes made by other processes.
+
+    Runs in the database thread pool, since reading the stamp is a stat()
+    or a query. Returns whether the trie in memory is current, i.e. whether
+    resolve_cached() can be trusted until the next check.
+    """
+    link_cache.refresh()
+    return link_trie.ready()
+
+
+def resolve_cached(request_path):
+    """Split and resolve a request path from memory only, without any I/O.
+
+    Returns (shortlink, path, template) like resolve(); the template is
+    MISSING when answering needs the database. The stamps aren't read here:
+    links_current() has to have said the memory is current.
+    """
+    if not link_trie.loaded():
+        return None, request_path, MISSING
+    shortlink, path = link_trie.longest_prefix(request_path, check_stamp=False)
+    if not shortlink:
+        return None, path, None
+    return shortlink, path, link_cache.get(shortlink, check_stamp=False)
+
+
+def resolve(request_path, shortlink=None, path=None):
+    """Resolve a request path, reading the database if needed.
+
+    Runs in the database thread pool. Pass the shortlink and path found by
+    resolve_cached() to skip the trie and resolver cache.
+    """
+    with app.app_context():
+        if shortlink is None:
+            shortlink, path = link_trie.longest_prefix(request_path)
+            template = resolve_destination(shortlink) if shortlink else None
+        else:
+            template = load_destination(shortlink)
+    return shortlink, path, template
+
+
+def usage_event(scope, shortlink, args):
+    headers = dict(scope['headers'])
+    client = scope.get('client')
+    return {
+        'shortlink': shortlink,
+        'accessed_at': datetime.utcnow(),
+        'args': args,
+        'user_agent': headers.get(b'user-agent', b'').decode('latin-1'),
+        'ip_address': client[0] if client else None
+    }
+
+
+class ConcurrentWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi that runs up to `limit` requests at once.
+
+    asgiref treats the WSGI app as thread-sensitive code and by default runs
+    all of it in one shared thread, so a single slow admin request or commit
+    would hold up all the others. Inside a ThreadSensitiveContext each
+    request gets a thread of its own instead.
+    """
+
+    def __init__(self, wsgi_application, limit):
+        super().__init__(wsgi_application)
+        self.slots = asyncio.Semaphore(limit)
+
+    async def __call__(self, scope, receive, send):
+        async with self.slots, ThreadSensitiveContext():
+            await super().__call__(scope, receive, send)
+
+
+class GoLinksASGI:
+    """Serves redirects natively and hands every other request to Flask."""
+
+    def __init__(self, flask_app, db_threads):
+        self.flask_app = flask_app
+        self.fallback = ConcurrentWsgiToAsgi(flask_app, db_threads)
+        self.routes = flask_app.url_map.bind('localhost')
+        self.executor = ThreadPoolExecutor(db_threads, thread_name_prefix='golinks-db')
+        self.poll_interval = max(flask_app.config['VERSION_POLL_INTERVAL'], 0.05)
+        # Set by the watch_links() task; until it runs every redirect
+        # takes the thread pool, which reads the stamps itself
+        self.links_current = False
+        self.watcher = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] in REDIRECT_METHODS:
+            if await self.redirect(scope, send):
+                return
+        await self.fallback(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Flask starts it from before_request, which redirects skip here
+                if self.flask_app.config['RETENTION_DAYS'] > 0:
+                    retention_scheduler.ensure_started()
+                self.watcher = asyncio.create_task(self.watch_links())
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.watcher is not None:
+                    self.watcher.cancel()
+                # Write out clicks still queued in memory before the worker goes away
+                await asyncio.get_running_loop().run_in_executor(self.executor, usage_writer.stop)
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def watch_links(self):
+        """Check the links stamp in the thread pool once per poll interval."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                self.links_current = await loop.run_in_executor(self.executor, links_current)
+            except Exception as e:
+                self.links_current = False
+                app.logger.error(f'Error checking for link changes: {str(e)}')
+            await asyncio.sleep(self.poll_interval)
+
+    async def redirect(self, scope, send):
+        """Answer a shortlink redirect; returns False if Flask should handle the request."""
+        started = time.perf_counter()
+        try:
+            endpoint, view_args = self.routes.match(scope['path'], scope['method'])
+        except HTTPException:
+            return False
+        if endpoint != 'handle_go_link':
+            return False
+
+        request_path = view_args['shortlink']
+        try:
+            if self.links_current:
+                shortlink, path, template = resolve_cached(request_path)
+            else:
+                shortlink, path, template = None, request_path, MISSING
+            if template is MISSING:
+                shortlink, path, template = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, resolve, request_path, shortlink, path
+                )
+            if template is None:
+                # Flask renders the not-found page with its suggestions
+                return False
+
+            params = MultiDict(parse_qsl(
+                scope['query_string'].decode('latin-1'),
+                keep_blank_values=True,
+                encoding='utf-8',
+                errors='replace'
+            ))
+            args = params.get('q', '')
+
+            # Never wait for queue space on the event loop
+            usage_writer.enqueue(usage_event(scope, shortlink, args or path), wait=False)
+
+            response = redirect(iri_to_uri(template.expand(args, path, params)))
+            if self.flask_app.config['REDIRECT_CACHE_MAX_AGE'] > 0:
+                response.headers['Cache-Control'] = (
+                    f"private, max-age={self.flask_app.config['REDIRECT_CACHE_MAX_AGE']}"
+                )
+        except Exception as e:
+            app.logger.error(f'Error handling go link: {str(e)}')
+            return False
+
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in response.headers.items()
+            ]
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'' if scope['method'] == 'HEAD' else response.get_data()
+        })
+        if request_duration is not None:
+            request_duration.observe(
+                time.perf_counter() - started,
+                ('handle_go_link', scope['method'], str(response.status_code))
+            )
+        return True
+
+
+application = GoLinksASGI(app, db_threads=Config.ASGI_DB_THREADS)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    # One event loop per CPU; each loop keeps many redirects in flight
+    uvicorn.run(
+        'asgi:application',
+        host=Config.HOST,
+        port=Config.PORT,
+        workers=int(os.environ.get('GOLINKS_WORKERS', multiprocessing.cpu_count())),
+        log_level=Config.LOG_LEVEL.lower(),
+        lifespan='on'
+    )
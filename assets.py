@@ -0,0 +1,54 @@
+import hashlib
+import os
+import threading
+
+from flask import request, url_for
+
+# Cache-Control for static files requested with their current version
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class StaticAssets:
+    """Content-hashed URLs for files in the static folder.
+
+    static_url('js/index.js') renders as /static/js/index.js?v=<hash>, so a
+    file's URL changes whenever its content does and browsers may cache
+    each version forever. Hashes are computed once per process, or on every
+    change of the file's mtime in debug mode.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._versions = {}
+        self._lock = threading.Lock()
+        app.add_template_global(self.url, 'static_url')
+        app.after_request(self._cache_headers)
+
+    def version(self, filename):
+        path = os.path.join(self.app.static_folder, filename)
+        cached = self._versions.get(filename)
+        if cached and not self.app.debug:
+            return cached[1]
+        mtime = os.stat(path).st_mtime_ns
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:12]
+        with self._lock:
+            self._versions[filename] = (mtime, digest)
+        return digest
+
+    def url(self, filename):
+        return url_for('static', filename=filename, v=self.version(filename))
+
+    def _cache_headers(self, response):
+        if request.endpoint != 'static' or response.status_code not in (200, 304):
+            return response
+        filename = request.view_args.get('filename')
+        try:
+            current = filename and request.args.get('v') == self.version(filename)
+        except OSError:
+            current = False
+        if current:
+            response.headers['Cache-Control'] = IMMUTABLE
+        return response
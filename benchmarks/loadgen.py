@@ -0,0 +1,96 @@
+"""Synthetic traffic for the benchmark suite.
+
+Shortlink popularity follows a Zipf distribution, like real go-links
+traffic: a handful of links get most of the clicks and a long tail is
+rarely used.
+"""
+
+import bisect
+import http.client
+import itertools
+import random
+import threading
+import time
+
+
+class Zipf:
+    """Draws ranks 0..n-1 with probability proportional to 1 / (rank + 1) ** s."""
+
+    def __init__(self, n, s=1.1, seed=None):
+        weights = [1 / (rank + 1) ** s for rank in range(n)]
+        self._cumulative = list(itertools.accumulate(weights))
+        self._total = self._cumulative[-1]
+        self._random = random.Random(seed)
+
+    def sample(self):
+        return bisect.bisect_left(self._cumulative, self._random.random() * self._total)
+
+
+def summarize(timings, elapsed):
+    """Latency percentiles (milliseconds) and throughput for one run."""
+    timings = sorted(timings)
+    count = len(timings)
+
+    def percentile(p):
+        return round(timings[min(count - 1, int(count * p))] * 1000, 3)
+
+    return {
+        'requests': count,
+        'rps': round(count / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(timings[-1] * 1000, 3),
+    }
+
+
+def run_client(client, paths, requests):
+    """Issue `requests` GETs through a Flask test client, one at a time."""
+    timings = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        path = paths()
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append(time.perf_counter() - start)
+        if response.status_code >= 500:
+            raise RuntimeError(f'{path} returned {response.status_code}')
+    return summarize(timings, time.perf_counter() - started)
+
+
+def run_http(host, port, paths, requests, concurrency):
+    """Issue `requests` GETs against a live server from `concurrency` threads."""
+    timings = []
+    errors = []
+    lock = threading.Lock()
+    remaining = itertools.count()
+
+    def worker():
+        local = []
+        while next(remaining) < requests:
+            path = paths()
+            start = time.perf_counter()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    errors.append(f'{path} returned {response.status}')
+            except OSError as e:
+                errors.append(f'{path}: {e}')
+            finally:
+                conn.close()
+            local.append(time.perf_counter() - start)
+        with lock:
+            timings.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = summarize(timings, time.perf_counter() - started)
+    result['errors'] = len(errors)
+    return result
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark golinks endpoints against a seeded SQLite database.
+
+Seeds a throwaway data directory, then drives each endpoint with
+Zipf-distributed shortlink traffic through the Flask test client (no
+network, one request at a time) and through a threaded WSGI server on
+localhost (concurrent HTTP). Results are written as JSON so that two runs
+can be compared with --compare.
+
+    python benchmarks/run.py --links 10000 --usage 1000000
+    python benchmarks/run.py --compare benchmarks/results/before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from loadgen import Zipf, run_client, run_http
+from seed import seed, shortlink_name
+
+
+def endpoints(links, zipf_s):
+    """Path generators for each benchmarked endpoint, keyed by view name."""
+    zipf = Zipf(links, s=zipf_s, seed=1)
+    search = Zipf(links, s=zipf_s, seed=2)
+
+    return {
+        'handle_go_link': lambda: f'/{shortlink_name(zipf.sample())}',
+        'handle_go_link_query': lambda: f'/{shortlink_name(zipf.sample())}?q=benchmark+query',
+        'get_links': lambda: '/api/links?limit=100',
+        'get_links_search': lambda: f'/api/links?limit=100&q={shortlink_name(search.sample())}',
+        'get_analytics': lambda: '/api/analytics',
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline_path, results):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+
+    print(f"\nCompared with {baseline_path}:")
+    print(f"{'mode':<7} {'endpoint':<22} {'p50 ms':>16} {'p99 ms':>16} {'req/s':>18}")
+    for mode, by_endpoint in results.items():
+        for name, current in by_endpoint.items():
+            before = baseline.get(mode, {}).get(name)
+            if not before:
+                continue
+            cells = []
+            for key in ('p50_ms', 'p99_ms', 'rps'):
+                change = (current[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+                cells.append(f'{current[key]:>8} ({change:+5.1f}%)')
+            print(f"{mode:<7} {name:<22} {cells[0]:>16} {cells[1]:>16} {cells[2]:>18}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--links', type=int, default=1000, help='GoLink rows to seed')
+    parser.add_argument('--usage', type=int, default=100000, help='LinkUsage rows to seed')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per endpoint and mode')
+    parser.add_argument('--concurrency', type=int, default=8, help='Client threads in http mode')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent of link popularity')
+    parser.add_argument('--modes', default='client,http', help='Comma-separated list of client, http')
+    parser.add_argument('--endpoints', help='Comma-separated subset of endpoints to run')
+    parser.add_argument('--data-dir', help='Data directory to use instead of a temporary one')
+    parser.add_argument('--output', help='Where to write the JSON results')
+    parser.add_argument('--compare', metavar='BASELINE', help='Results file to compare against')
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='golinks-bench-')
+    os.environ['GOLINKS_DIR'] = data_dir
+    os.environ.pop('SENTRY_DSN', None)
+    # Always a throwaway SQLite database, never the configured server
+    os.environ.pop('GOLINKS_DATABASE_URL', None)
+    os.environ.pop('DATABASE_URL', None)
+
+    from flask_migrate import upgrade
+    import app as app_module
+
+    app = app_module.app
+    started = time.perf_counter()
+    with app.app_context():
+        upgrade(directory=os.path.join(ROOT, 'migrations'))
+        if app_module.GoLink.query.count() == 0:
+            seed(app_module, args.links, args.usage)
+    print(f'Seeded {args.links} links and {args.usage} clicks in {data_dir} '
+          f'({time.perf_counter() - started:.1f}s)')
+
+    paths = endpoints(args.links, args.zipf)
+    if args.endpoints:
+        paths = {name: paths[name] for name in args.endpoints.split(',')}
+
+    results = {}
+    modes = args.modes.split(',')
+    if 'client' in modes:
+        client = app.test_client()
+        results['client'] = {}
+        for name, path in paths.items():
+            results['client'][name] = run_client(client, path, args.requests)
+            print(f"client {name:<22} {results['client'][name]}")
+
+    if 'http' in modes:
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        results['http'] = {}
+        for name, path in paths.items():
+            results['http'][name] = run_http(
+                '127.0.0.1', server.server_port, path, args.requests, args.concurrency
+            )
+            print(f"http   {name:<22} {results['http'][name]}")
+        server.shutdown()
+
+    app_module.usage_writer.stop()
+
+    output = args.output or os.path.join(
+        BENCH_DIR, 'results', time.strftime('%Y%m%d-%H%M%S') + '.json'
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'git_revision': git_revision(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'params': {key: value for key, value in vars(args).items() if key != 'compare'},
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f'Results written to {output}')
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Populate a golinks database with synthetic links and clicks."""
+
+import random
+from datetime import datetime, timedelta
+
+from loadgen import Zipf
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'curl/8.4.0',
+]
+
+
+def shortlink_name(rank):
+    return f'link{rank}'
+
+
+def seed(app_module, links, usage, days=90, batch_size=10000, seed=0):
+    """Insert `links` GoLinks and `usage` Zipf-distributed LinkUsage rows.
+
+    Must run inside an app context. Rollups are rebuilt afterwards so the
+    analytics endpoints see the same data as the raw table.
+    """
+    db = app_module.db
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    rows = []
+    for rank in range(links):
+        rows.append({
+            'shortlink': shortlink_name(rank),
+            'destination': f'https://example.com/{rank}/search?q={{query}}',
+            'created_at': now - timedelta(seconds=links - rank),
+        })
+        if len(rows) == batch_size:
+            db.session.execute(db.insert(app_module.GoLink), rows)
+            rows = []
+    if rows:
+        db.session.execute(db.insert(app_module.GoLink), rows)
+
+    zipf = Zipf(links, seed=seed)
+    window = days * 86400
+    rows = []
+    for _ in range(usage):
+        rows.append({
+            'shortlink': shortlink_name(zipf.sample()),
+            'accessed_at': now - timedelta(seconds=rng.randrange(window)),
+            'args': '',
+            'user_agent': rng.choice(USER_AGENTS),
+            'ip_address': f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}',
+        })
+        if len(rows) == batch_size:
+            db.session.execute(db.insert(app_module.LinkUsage), app_module.usage_rows(rows))
+            rows = []
+    if rows:
+        db.session.execute(db.insert(app_module.LinkUsage), app_module.usage_rows(rows))
+    db.session.commit()
+
+    app_module.rebuild_rollups()
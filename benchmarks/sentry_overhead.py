@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Measure the per-request cost of each Sentry mode.
+
+Every mode runs in its own process against a fresh data directory. Events
+are handed to a transport that discards them, so the numbers cover the
+SDK's in-process work (sampling, spans, profiling) but not network I/O.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ('none', 'errors', 'sampled', 'full')
+
+
+def measure(client, path, requests):
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.get(path)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return {
+        'mean_us': round(statistics.fmean(timings), 1),
+        'p50_us': round(timings[len(timings) // 2], 1),
+        'p99_us': round(timings[int(len(timings) * 0.99)], 1),
+    }
+
+
+def child(mode, requests):
+    os.environ['GOLINKS_DIR'] = tempfile.mkdtemp()
+    os.environ.pop('SENTRY_DSN', None)
+    if mode != 'none':
+        os.environ['SENTRY_MODE'] = mode
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+
+    from sentry_sdk.transport import Transport
+    from config import Config
+    from tracing import init_sentry
+
+    class NullTransport(Transport):
+        def capture_event(self, event):
+            pass
+
+        def capture_envelope(self, envelope):
+            pass
+
+    class BenchConfig(Config):
+        SENTRY_DSN = 'https://public@localhost/1'
+
+    if mode != 'none':
+        init_sentry(BenchConfig, transport=NullTransport)
+
+    from flask_migrate import upgrade
+    from app import app, usage_writer
+
+    with app.app_context():
+        upgrade(directory=os.path.join(ROOT, 'migrations'))
+    client = app.test_client()
+    client.post('/api/links', json={'shortlink': 'bench', 'destination': 'https://example.com'})
+
+    # Warm up caches and lazily created state before timing
+    measure(client, '/bench', 200)
+    measure(client, '/api/links', 200)
+    results = {
+        'mode': mode,
+        'redirect': measure(client, '/bench', requests),
+        'api': measure(client, '/api/links', requests),
+    }
+    usage_writer.stop()
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000, help='Requests per endpoint and mode')
+    parser.add_argument('--modes', default=','.join(MODES), help='Comma-separated modes to run')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.requests)
+        return
+
+    results = []
+    for mode in args.modes.split(','):
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', mode, '--requests', str(args.requests)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':>8}  {'redirect p50':>12} {'redirect p99':>12}  {'api p50':>8} {'api p99':>8}   (microseconds)")
+    for result in results:
+        redirect, api = result['redirect'], result['api']
+        print(f"{result['mode']:>8}  {redirect['p50_us']:>12} {redirect['p99_us']:>12}  "
+              f"{api['p50_us']:>8} {api['p99_us']:>8}")
+
+
+if __name__ == '__main__':
+    main()
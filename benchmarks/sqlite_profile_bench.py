@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Compare redirect-style throughput with and without the SQLite profile.
+
+Each thread mixes shortlink lookups with single-row usage inserts, the
+access pattern of handle_go_link, against a fresh database file. The
+same workload runs once with SQLite's defaults and once with the pragmas
+from Config.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from sqlite_profile import sqlite_pragmas, install_sqlite_profile
+
+SCHEMA = [
+    "CREATE TABLE golinks (id INTEGER PRIMARY KEY, shortlink VARCHAR(255) UNIQUE NOT NULL, "
+    "destination VARCHAR(2048) NOT NULL, created_at DATETIME)",
+    "CREATE TABLE link_usage (id INTEGER PRIMARY KEY, shortlink VARCHAR(255) NOT NULL, "
+    "accessed_at DATETIME, args VARCHAR(1024), user_agent VARCHAR(1024), ip_address VARCHAR(45))",
+    "CREATE INDEX ix_link_usage_shortlink ON link_usage (shortlink)",
+]
+
+
+def run(profile, args):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    engine = create_engine(
+        f'sqlite:///{path}',
+        pool_size=args.threads,
+        connect_args={'timeout': args.timeout}
+    )
+    if profile:
+        install_sqlite_profile(engine, sqlite_pragmas(vars(Config)))
+
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(
+            text("INSERT INTO golinks (shortlink, destination, created_at) "
+                 "VALUES (:s, :d, CURRENT_TIMESTAMP)"),
+            [{'s': f'link{i}', 'd': f'https://example.com/{i}'} for i in range(args.links)]
+        )
+
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def worker():
+        local = {'reads': 0, 'writes': 0, 'locked': 0}
+        rng = random.Random()
+        while time.monotonic() < deadline:
+            shortlink = f'link{rng.randrange(args.links)}'
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text("SELECT destination FROM golinks WHERE shortlink = :s"),
+                        {'s': shortlink}
+                    ).scalar()
+                    local['reads'] += 1
+                    if rng.random() < args.write_ratio:
+                        conn.execute(
+                            text("INSERT INTO link_usage (shortlink, accessed_at, user_agent, ip_address) "
+                                 "VALUES (:s, CURRENT_TIMESTAMP, 'bench', '127.0.0.1')"),
+                            {'s': shortlink}
+                        )
+                        conn.commit()
+                        local['writes'] += 1
+            except OperationalError:
+                local['locked'] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        'profile': 'tuned' if profile else 'default',
+        'reads_per_sec': round(counts['reads'] / args.duration),
+        'writes_per_sec': round(counts['writes'] / args.duration),
+        'locked_errors': counts['locked'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per profile')
+    parser.add_argument('--links', type=int, default=1000)
+    parser.add_argument('--write-ratio', type=float, default=1.0,
+                        help='Fraction of lookups that also record usage')
+    parser.add_argument('--timeout', type=float, default=5.0,
+                        help='sqlite3 connect timeout in seconds (the driver default)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = [run(False, args), run(True, args)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print(f"{result['profile']:>8}: {result['reads_per_sec']:>7} reads/s "
+              f"{result['writes_per_sec']:>7} writes/s {result['locked_errors']:>5} locked errors")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from itertools import islice
+
+FORMATS = ('csv', 'jsonl')
+
+# Columns written by export; import only needs shortlink and destination
+EXPORT_FIELDS = ('shortlink', 'destination', 'created_at')
+
+CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'application/json': 'json',
+}
+
+
+class RecordError(ValueError):
+    """A single input record could not be parsed."""
+
+
+def format_for_filename(filename, default='jsonl'):
+    if filename and filename.lower().endswith('.csv'):
+        return 'csv'
+    if filename and filename.lower().endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return default
+
+
+def format_for_content_type(mimetype):
+    return CONTENT_TYPES.get(mimetype)
+
+
+def read_records(stream, fmt):
+    """Yield (row number, record) pairs from a text stream, one at a time.
+
+    Rows that cannot be parsed are yielded as (row number, RecordError) so
+    that one bad line doesn't abort the whole import.
+    """
+    if fmt == 'csv':
+        for number, record in enumerate(csv.DictReader(stream), start=1):
+            yield number, record
+    elif fmt == 'jsonl':
+        number = 0
+        for line in stream:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield number, RecordError(f'Invalid JSON: {e}')
+                continue
+            if not isinstance(record, dict):
+                yield number, RecordError('Expected a JSON object')
+                continue
+            yield number, record
+    else:
+        raise ValueError(f'Unknown format: {fmt}')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_lines(rows, fmt):
+    """Yield `rows` (tuples in EXPORT_FIELDS order) as CSV or JSONL text."""
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    elif fmt == 'jsonl':
+        for row in rows:
+            yield json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n'
+    else:
+        raise ValueError(f'Unknown format: {fmt}')
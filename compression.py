@@ -0,0 +1,115 @@
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # gzip only
+        brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv',
+    'application/javascript', 'text/javascript', 'application/json', 'application/x-ndjson',
+    'image/svg+xml',
+}
+
+
+def choose_encoding():
+    """The best encoding the client accepts, or None."""
+    encodings = request.accept_encodings
+    if brotli is not None and encodings['br']:
+        return 'br'
+    if encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def gzip_stream(chunks, level):
+    """Gzip an iterable of chunks, flushing after each one so nothing stalls."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def install_compression(app, min_size=1024, level=6, cache_size=128):
+    """Compress HTML, JSON and other text responses with brotli or gzip.
+
+    Responses smaller than `min_size` bytes are left alone. Streamed
+    responses are gzipped chunk by chunk. Responses with an ETag are only
+    compressed once per ETag and encoding; their ETag becomes weak, which
+    still matches If-None-Match.
+    """
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed and not response.direct_passthrough:
+            if not request.accept_encodings['gzip']:
+                return response
+            response.response = gzip_stream(response.response, level)
+            response.headers['Content-Encoding'] = 'gzip'
+            response.headers.pop('Content-Length', None)
+            return response
+
+        # Static files are sent straight from disk; read them to compress
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (etag, encoding)
+        compressed = None
+        if etag:
+            with lock:
+                compressed = cache.get(key)
+                if compressed is not None:
+                    cache.move_to_end(key)
+        if compressed is None:
+            compressed = compress(data, encoding, level)
+            if etag:
+                with lock:
+                    cache[key] = compressed
+                    if len(cache) > cache_size:
+                        cache.popitem(last=False)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
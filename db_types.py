@@ -0,0 +1,45 @@
+import ipaddress
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+
+class PackedIP(TypeDecorator):
+    """An IPv4 or IPv6 address stored as its 4 or 16 packed bytes.
+
+    Values that are not valid addresses are stored as NULL.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return ipaddress.ip_address(value).packed
+        except ValueError:
+            return None
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(ipaddress.ip_address(bytes(value)))
+
+
+class EpochDateTime(TypeDecorator):
+    """A naive UTC datetime stored as whole seconds since the Unix epoch."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,90 @@
+import json
+import re
+from urllib.parse import quote, quote_plus
+
+# {query}, {1}, {2}, ... or {?name}, each optionally with a default: {?name:default}.
+# Named arguments need the '?' so that braces already in destinations, like
+# .../wiki/{page}, stay literal text.
+PLACEHOLDER_RE = re.compile(r'\{(query|\d+|\?[A-Za-z_]\w*)(?::([^{}]*))?\}')
+
+
+class DestinationTemplate:
+    """A destination URL parsed into literal text and placeholders.
+
+    Placeholders are filled in at redirect time:
+
+        {query}          the ?q= argument, or the path after the shortlink
+        {1}, {2}, ...    positional arguments: path segments after the
+                         shortlink, or the words of ?q= if there are none
+        {?name}          the ?name= query argument
+        {?name:default}  any of the above, with text used when it is empty
+
+    Values are percent-encoded for where they appear: quote_plus after the
+    '?' of the destination, path quoting before it. Destinations without
+    placeholders keep the old behaviour of appending ?q= when given one.
+    Anything in braces that isn't a valid placeholder stays literal text.
+    """
+
+    __slots__ = ('parts', 'has_placeholders')
+
+    def __init__(self, parts):
+        # Literal strings and (name, default, in_query) tuples, in order
+        self.parts = tuple(part if isinstance(part, str) else tuple(part) for part in parts)
+        self.has_placeholders = any(not isinstance(part, str) for part in self.parts)
+
+    @classmethod
+    def compile(cls, destination):
+        parts = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(destination):
+            if match.start() > position:
+                parts.append(destination[position:match.start()])
+            in_query = '?' in destination[:match.start()]
+            parts.append((match.group(1), match.group(2), in_query))
+            position = match.end()
+        if position < len(destination):
+            parts.append(destination[position:])
+        return cls(parts)
+
+    def dumps(self):
+        return json.dumps(self.parts)
+
+    @classmethod
+    def loads(cls, data):
+        return cls(json.loads(data))
+
+    def expand(self, query='', path='', params=None):
+        """Build the redirect URL for a request.
+
+        `query` is the ?q= argument, `path` what followed the shortlink in
+        the URL and `params` the remaining query arguments.
+        """
+        if not self.has_placeholders:
+            url = self.parts[0] if self.parts else ''
+            if path:
+                url = url.rstrip('/') + '/' + quote(path, safe='/')
+            if query:
+                url += ('&' if '?' in url else '?') + 'q=' + quote_plus(query)
+            return url
+
+        args = path.split('/') if path else query.split()
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            name, default, in_query = part
+            if name == 'query':
+                value = query or path
+            elif name.isdigit():
+                index = int(name) - 1
+                value = args[index] if 0 <= index < len(args) else ''
+            else:
+                value = params.get(name[1:], '') if params else ''
+            if not value:
+                out.append(default or '')
+            elif in_query:
+                out.append(quote_plus(value))
+            else:
+                out.append(quote(value, safe='/'))
+        return ''.join(out)
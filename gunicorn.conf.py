@@ -0,0 +1,53 @@
+# Gunicorn settings for serving golinks in production:
+#   gunicorn --config gunicorn.conf.py app:app
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+
+bind = f'{Config.HOST}:{Config.PORT}'
+
+# Redirects are short and mostly I/O bound, so a few threads per process
+# keep a worker busy while another thread waits on SQLite.
+workers = int(os.environ.get('GOLINKS_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('GOLINKS_WORKER_CLASS', 'gthread')  # or 'gevent'
+threads = int(os.environ.get('GOLINKS_THREADS', 4))
+worker_connections = int(os.environ.get('GOLINKS_WORKER_CONNECTIONS', 1000))
+
+# Import the app once in the master so workers fork with it already loaded.
+# Note that code changes then need a restart rather than a HUP reload.
+preload_app = os.environ.get('GOLINKS_PRELOAD', '1') == '1'
+
+keepalive = int(os.environ.get('GOLINKS_KEEPALIVE', 5))
+timeout = int(os.environ.get('GOLINKS_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GOLINKS_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers periodically; the jitter keeps them from restarting together
+max_requests = int(os.environ.get('GOLINKS_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GOLINKS_MAX_REQUESTS_JITTER', 1000))
+
+accesslog = os.environ.get('GOLINKS_ACCESS_LOG')
+errorlog = os.environ.get('GOLINKS_ERROR_LOG', '-')
+loglevel = Config.LOG_LEVEL.lower()
+
+
+def on_starting(server):
+    from app import app, setup_logging
+    setup_logging(app)
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading must not be shared across processes
+    from app import app, db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    # Write out clicks still queued in memory before the worker goes away
+    from app import usage_writer
+    usage_writer.stop()
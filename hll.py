@@ -0,0 +1,166 @@
+import hashlib
+import math
+import struct
+import zlib
+
+# 2**11 registers: a standard error of 1.04 / sqrt(2048), about 2.3%
+PRECISION = 11
+REGISTERS = 1 << PRECISION
+STANDARD_ERROR = 1.04 / math.sqrt(REGISTERS)
+
+# Serialized forms: a list of (register, rank) pairs while few registers are
+# set, the compressed register array once that is smaller
+SPARSE = 0
+DENSE = 1
+HEADER = struct.Struct('>BB')
+SPARSE_ENTRY = struct.Struct('>HB')
+
+# Sketches with at most this many registers set are kept as a dict, in
+# memory as well as on disk
+SPARSE_LIMIT = REGISTERS // 2 // SPARSE_ENTRY.size
+
+_RANK_BITS = 64 - PRECISION
+_RANK_MASK = (1 << _RANK_BITS) - 1
+_ALPHA_INF = 1 / (2 * math.log(2))
+
+
+def _sigma(x):
+    # Corrects for the registers that are still 0
+    if x == 1:
+        return math.inf
+    y = 1.0
+    z = x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x):
+    # Corrects for the registers that reached the largest possible rank
+    if x == 0 or x == 1:
+        return 0.0
+    y = 1.0
+    z = 1 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+def hash64(value):
+    # Stable across processes, unlike hash(), so sketches from different
+    # workers and days can be merged
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """Approximate count of distinct values in at most 2 KB of registers.
+
+    Sketches of the same precision merge by taking the larger of each pair
+    of registers, so the union of any number of sketches (days, workers) is
+    estimated as accurately as a sketch that saw every value itself.
+
+    `registers` is a {register: rank} dict while few registers are set,
+    which is the case for most links on most days, and a bytearray of all
+    REGISTERS ranks after that.
+    """
+
+    __slots__ = ('registers',)
+
+    def __init__(self, registers=None):
+        self.registers = registers if registers is not None else {}
+
+    def _densify(self):
+        if isinstance(self.registers, dict):
+            registers = bytearray(REGISTERS)
+            for index, rank in self.registers.items():
+                registers[index] = rank
+            self.registers = registers
+        return self.registers
+
+    def _update(self, index, rank):
+        registers = self.registers
+        if isinstance(registers, dict):
+            if rank > registers.get(index, 0):
+                registers[index] = rank
+                if len(registers) > SPARSE_LIMIT:
+                    self._densify()
+        elif rank > registers[index]:
+            registers[index] = rank
+
+    def add(self, value):
+        """Add a str or bytes value."""
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        h = hash64(value)
+        self._update(h >> _RANK_BITS, _RANK_BITS - (h & _RANK_MASK).bit_length() + 1)
+
+    def merge(self, other):
+        """Fold another sketch into this one and return self."""
+        if isinstance(other.registers, dict):
+            for index, rank in other.registers.items():
+                self._update(index, rank)
+        else:
+            self.registers = bytearray(map(max, self._densify(), other.registers))
+        return self
+
+    def count(self):
+        """Estimated number of distinct values added.
+
+        Uses Ertl's improved estimator ("New cardinality estimation
+        algorithms for HyperLogLog sketches", 2017), which stays unbiased
+        across the whole range where the classic estimator has to switch to
+        linear counting and overshoots by a few percent around the switch.
+        """
+        registers = self.registers
+        # How many registers hold each rank, 0 to _RANK_BITS + 1
+        counts = [0] * (_RANK_BITS + 2)
+        if isinstance(registers, dict):
+            for rank in registers.values():
+                counts[rank] += 1
+            counts[0] = REGISTERS - len(registers)
+        else:
+            # Count each rank at C speed, until every register has been
+            # accounted for
+            remaining = REGISTERS
+            rank = 0
+            while remaining:
+                counts[rank] = registers.count(rank)
+                remaining -= counts[rank]
+                rank += 1
+        if counts[0] == REGISTERS:
+            return 0
+        z = REGISTERS * _tau(1 - counts[_RANK_BITS + 1] / REGISTERS)
+        for rank in range(_RANK_BITS, 0, -1):
+            z = 0.5 * (z + counts[rank])
+        z += REGISTERS * _sigma(counts[0] / REGISTERS)
+        return int(round(_ALPHA_INF * REGISTERS * REGISTERS / z))
+
+    def dumps(self):
+        if isinstance(self.registers, dict):
+            entries = sorted(self.registers.items())
+            return HEADER.pack(PRECISION, SPARSE) + b''.join(SPARSE_ENTRY.pack(*e) for e in entries)
+        return HEADER.pack(PRECISION, DENSE) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def loads(cls, blob):
+        """Rebuild a sketch from dumps(); None or an empty blob is an empty sketch."""
+        if not blob:
+            return cls()
+        blob = bytes(blob)
+        precision, encoding = HEADER.unpack_from(blob)
+        if precision != PRECISION:
+            raise ValueError(f'Unsupported HyperLogLog precision: {precision}')
+        if encoding == DENSE:
+            return cls(bytearray(zlib.decompress(blob[HEADER.size:])))
+        return cls(dict(SPARSE_ENTRY.iter_unpack(blob[HEADER.size:])))
+
+    def __bool__(self):
+        return any(self.registers) if isinstance(self.registers, bytearray) else bool(self.registers)
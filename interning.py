@@ -0,0 +1,63 @@
+import threading
+
+from rollups import dialect_insert
+
+
+class InternTable:
+    """Maps repeated strings to the integer ids of a lookup table.
+
+    ids() inserts any values the table has not seen yet and returns their
+    ids, remembering them in memory so that the common case costs no query
+    at all. The cache is dropped wholesale once it holds `maxsize` values,
+    and must be cleared with clear() if the transaction that inserted new
+    values is rolled back.
+    """
+
+    def __init__(self, db, model, maxsize=10000):
+        self.db = db
+        self.model = model
+        self.maxsize = maxsize
+        self._ids = {}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def ids(self, values):
+        """Return a {value: id} map for `values`, creating missing rows."""
+        with self._lock:
+            found = {value: self._ids[value] for value in values if value in self._ids}
+        missing = {value for value in values if value is not None and value not in found}
+        if not missing:
+            return found
+
+        table = self.model.__table__
+        session = self.db.session
+        # Sorted, like the rollup upserts, so concurrent flushes can't deadlock
+        stmt = dialect_insert(session, table).values([{'value': value} for value in sorted(missing)])
+        session.execute(stmt.on_conflict_do_nothing(index_elements=['value']))
+        rows = session.query(self.model.id, self.model.value).filter(
+            self.model.value.in_(missing)
+        ).all()
+
+        with self._lock:
+            if len(self._ids) + len(rows) > self.maxsize:
+                self._ids.clear()
+                self._values.clear()
+            for id, value in rows:
+                self._ids[value] = id
+                self._values[id] = value
+                found[value] = id
+        return found
+
+    def value(self, id):
+        """Return the string stored under `id`, or None."""
+        if id is None:
+            return None
+        with self._lock:
+            if id in self._values:
+                return self._values[id]
+        return self.db.session.query(self.model.value).filter_by(id=id).scalar()
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._values.clear()
@@ -0,0 +1,281 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process, nothing to coordinate with
+    fcntl = None
+
+import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
+
+# Sentinel returned by LinkCache.get() when a key is not cached at all,
+# as opposed to a cached miss (None).
+MISSING = object()
+
+data_versions = sa.table('data_versions',
+    sa.column('name', sa.String),
+    sa.column('version', sa.BigInteger)
+)
+
+
+class StampReader:
+    """Tracks which version of a stamp one consumer has caught up with.
+
+    Consumers that keep their own copy of shared data (the resolver cache,
+    the shortlink trie, the suggestion index) each read the stamp through
+    their own reader, made with VersionStamp.reader().
+    """
+
+    def __init__(self, stamp, seen):
+        self.stamp = stamp
+        self._seen = seen
+
+    def signature(self):
+        return self.stamp.signature()
+
+    def bump(self):
+        self.stamp.bump()
+
+    def changed(self):
+        signature = self.stamp.signature()
+        with self.stamp._seen_lock:
+            if signature != self._seen:
+                self._seen = signature
+                return True
+        return False
+
+    def stale(self):
+        """Like changed(), but doesn't mark the new version as seen."""
+        return self.stamp.signature() != self._seen
+
+    def _advance(self, before, after):
+        # Up to date before a bump of our own process: the bump's changes
+        # are applied in place, so there is nothing to reload
+        with self.stamp._seen_lock:
+            if self._seen == before:
+                self._seen = after
+
+
+class VersionStamp(StampReader):
+    """A version token shared between processes through a small file.
+
+    Writers call bump() after committing a change; readers call changed()
+    to find out whether any process has bumped the stamp since they last
+    looked. The file is replaced atomically so its inode changes on every
+    bump, which makes a single os.stat() enough to detect it.
+
+    A process's own bump only counts as a change for readers that had
+    already missed an earlier one; the others are expected to apply the
+    change themselves.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._seen_lock = threading.Lock()
+        self._readers = []
+        super().__init__(self, self.signature())
+
+    def reader(self):
+        """Another consumer of this stamp, with its own idea of what it has seen."""
+        reader = StampReader(self, self._seen)
+        self._readers.append(reader)
+        return reader
+
+    def signature(self):
+        """Current version token; changes every time any process bumps it."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def bump(self):
+        # Other processes bump under the same lock, so `before` is exactly
+        # the version this bump replaces
+        with open(f'{self.path}.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                before = self.signature()
+                tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                with open(tmp_path, 'w') as f:
+                    f.write(uuid.uuid4().hex)
+                os.replace(tmp_path, self.path)
+                after = self.signature()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        self._advance_all(before, after)
+
+    def _advance_all(self, before, after):
+        for reader in [self, *self._readers]:
+            reader._advance(before, after)
+
+
+class DatabaseVersionStamp(VersionStamp):
+    """A VersionStamp kept in a data_versions row instead of a local file.
+
+    Nodes that share a database server don't share a filesystem, so the
+    version lives in the database. signature() reads it at most once per
+    `poll_interval` seconds, which bounds how long other nodes keep serving
+    what they had cached; the process that bumps sees its own bump at once.
+    """
+
+    def __init__(self, engine, name, poll_interval=1.0):
+        self.engine = engine
+        self.name = name
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._signature = None
+        self._polled_at = None
+        self._seen_lock = threading.Lock()
+        self._readers = []
+        # Not read here: the app is imported before migrations create the table
+        StampReader.__init__(self, self, None)
+
+    def signature(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._polled_at is not None and now - self._polled_at < self.poll_interval:
+                return self._signature
+        try:
+            with self.engine.connect() as conn:
+                signature = conn.execute(
+                    sa.select(data_versions.c.version).where(data_versions.c.name == self.name)
+                ).scalar()
+        except SQLAlchemyError:
+            signature = None
+        with self._lock:
+            self._signature = signature
+            self._polled_at = now
+        return signature
+
+    def bump(self):
+        # The row lock taken by the UPDATE orders concurrent bumps, so the
+        # returned version is exactly one past the version it replaced
+        with self.engine.begin() as conn:
+            after = conn.execute(
+                data_versions.update()
+                .where(data_versions.c.name == self.name)
+                .values(version=data_versions.c.version + 1)
+                .returning(data_versions.c.version)
+            ).scalar()
+            before = None if after is None else after - 1
+            if after is None:
+                conn.execute(data_versions.insert().values(name=self.name, version=1))
+                after = 1
+        with self._lock:
+            self._signature = after
+            self._polled_at = time.monotonic()
+        self._advance_all(before, after)
+
+
+class ClockVersionStamp(VersionStamp):
+    """A VersionStamp for data that changes too often to share a version of.
+
+    Usage rollups change on every flush, and bumping a data_versions row
+    that often would make it the hottest row on the database server. This
+    stamp counts only the bumps of its own process, and also moves on every
+    `interval` seconds so changes made by other nodes are picked up within
+    that time, as they are with DatabaseVersionStamp.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._version = 0
+        self._seen_lock = threading.Lock()
+        self._readers = []
+        StampReader.__init__(self, self, self.signature())
+
+    def signature(self):
+        tick = int(time.time() // self.interval) if self.interval > 0 else time.time()
+        return (self._version, tick)
+
+    def bump(self):
+        with self._lock:
+            before = self.signature()
+            self._version += 1
+            after = self.signature()
+        self._advance_all(before, after)
+
+
+class LinkCache:
+    """Bounded LRU map of shortlink -> destination.
+
+    Missing shortlinks are cached as None so repeated misses don't hit the
+    database either. Every lookup checks the shared VersionStamp and drops
+    the whole cache when another process has changed the links table.
+
+    Fills race with invalidations, so callers read `generation` before
+    querying the database and pass it back to put(); the value is discarded
+    if anything was invalidated in between.
+    """
+
+    def __init__(self, maxsize, stamp):
+        self.maxsize = maxsize
+        self.stamp = stamp
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, check_stamp=True):
+        """Cached destination of `key`, None for a cached miss, or MISSING.
+
+        With `check_stamp` false the stamp isn't read, so the lookup does no
+        I/O; refresh() must then be called regularly instead.
+        """
+        if self.maxsize <= 0:
+            return MISSING
+        with self._lock:
+            if check_stamp and self.stamp.changed():
+                self._clear()
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            return self._data[key]
+
+    def refresh(self):
+        """Drop everything if another process has changed the links."""
+        with self._lock:
+            if self.stamp.changed():
+                self._clear()
+
+    def put(self, key, value, generation):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, *keys):
+        """Drop keys locally and tell the other processes to drop theirs."""
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._data.pop(key, None)
+        self.stamp.bump()
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self.generation += 1
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,107 @@
+import threading
+
+# Marks a node where a shortlink ends; never a valid path segment
+_END = object()
+
+
+class ShortlinkTrie:
+    """Segment trie of all shortlinks for longest-prefix matching.
+
+    Shortlinks are split on '/', so matching a request path costs one dict
+    lookup per path segment no matter how many links exist. The trie is
+    loaded lazily from `load` (a callable returning every shortlink), kept
+    current in this process by add() and remove(), and reloaded whole
+    whenever `stamp` shows that some process changed the links table.
+
+    The stamp should be a reader of the stamp the writers bump, so that this
+    process's own writes, already applied by add() and remove(), don't
+    trigger a reload.
+    """
+
+    def __init__(self, load, stamp):
+        self._load = load
+        self._stamp = stamp
+        self._root = None
+        # Bumped by add() and remove(), so a reload that raced with them can
+        # tell that the links it read may be out of date
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _current(self):
+        # Checked first, so the first load also marks the version as seen
+        changed = self._stamp.changed()
+        root = self._root
+        if root is None or changed:
+            root = self.reload()
+        return root
+
+    def loaded(self):
+        """True once the trie is in memory, whether or not it is current."""
+        return self._root is not None
+
+    def ready(self):
+        """True if lookups can be answered without loading the trie."""
+        return self._root is not None and not self._stamp.stale()
+
+    def reload(self):
+        while True:
+            generation = self._generation
+            root = {}
+            for shortlink in self._load():
+                self._insert(root, shortlink)
+            with self._lock:
+                if generation == self._generation:
+                    self._root = root
+                    return root
+
+    @staticmethod
+    def _insert(root, shortlink):
+        node = root
+        for segment in shortlink.split('/'):
+            node = node.setdefault(segment, {})
+        node[_END] = True
+
+    def add(self, shortlink):
+        with self._lock:
+            self._generation += 1
+            if self._root is not None:
+                self._insert(self._root, shortlink)
+
+    def remove(self, shortlink):
+        with self._lock:
+            self._generation += 1
+            if self._root is None:
+                return
+            path = [self._root]
+            segments = shortlink.split('/')
+            for segment in segments:
+                node = path[-1].get(segment)
+                if node is None:
+                    return
+                path.append(node)
+            path[-1].pop(_END, None)
+            # Drop nodes that no longer lead to any shortlink
+            for segment, parent, node in zip(reversed(segments), reversed(path[:-1]), reversed(path[1:])):
+                if node:
+                    break
+                del parent[segment]
+
+    def longest_prefix(self, path, check_stamp=True):
+        """Split `path` into (shortlink, rest) for the longest matching shortlink.
+
+        Returns (None, path) when no shortlink is a prefix of the path. With
+        `check_stamp` false the trie in memory is used as it is, without
+        reading the stamp; it must be loaded().
+        """
+        node = self._current() if check_stamp else self._root
+        segments = path.split('/')
+        matched = 0
+        for index, segment in enumerate(segments):
+            node = node.get(segment)
+            if node is None:
+                break
+            if _END in node:
+                matched = index + 1
+        if not matched:
+            return None, path
+        return '/'.join(segments[:matched]), '/'.join(segments[matched:])
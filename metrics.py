@@ -0,0 +1,174 @@
+"""Minimal in-process metrics with Prometheus text exposition.
+
+Only what golinks needs: labelled counters and histograms updated on the
+request path, and gauges/counters read from a callback at scrape time.
+Every process keeps its own registry, so under gunicorn each scrape
+reports the worker that served it.
+"""
+
+import bisect
+import threading
+import time
+
+from flask import g, request
+from sqlalchemy import event
+
+QUERY_VERBS = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'PRAGMA'}
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, help, label_names=()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f'{self.name}{_labels(self.label_names, labels)} {_number(value)}'
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, help, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f'{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}'
+            yield f'{self.name}_count{_labels(self.label_names, labels)} {cumulative}'
+
+
+class CallbackMetric:
+    """A gauge or counter whose value is read from `fn` at scrape time."""
+
+    def __init__(self, name, help, fn, type='gauge'):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.type = type
+
+    def samples(self):
+        yield f'{self.name} {_number(self.fn())}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, label_names=()):
+        return self.register(Counter(name, help, label_names))
+
+    def histogram(self, name, help, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, label_names, buckets))
+
+    def gauge_callback(self, name, help, fn):
+        return self.register(CallbackMetric(name, help, fn, 'gauge'))
+
+    def counter_callback(self, name, help, fn):
+        return self.register(CallbackMetric(name, help, fn, 'counter'))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+def install_request_metrics(app, histogram):
+    """Observe the latency of every request, labelled by endpoint, method and status."""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            histogram.observe(
+                time.perf_counter() - started,
+                (request.endpoint or 'unmatched', request.method, str(response.status_code))
+            )
+        return response
+
+
+def install_query_metrics(engine, histogram):
+    """Observe the duration of every SQL statement, labelled by statement type."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def observe_query(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started'].pop()
+        words = statement.split(None, 1)
+        verb = words[0].upper() if words else ''
+        histogram.observe(time.perf_counter() - started, (verb if verb in QUERY_VERBS else 'OTHER',))
+
+    @event.listens_for(engine, 'handle_error')
+    def discard_query_timer(exception_context):
+        if exception_context.connection is not None:
+            timers = exception_context.connection.info.get('query_started')
+            if timers:
+                timers.pop()
@@ -15,8 +15,8 @@ logger = logging.getLogger('alembic.env')
 
 config.set_main_option(
     'sqlalchemy.url',
-    str(current_app.extensions['migrate'].db.get_engine().url).replace(
-        '%', '%%'))
+    current_app.extensions['migrate'].db.get_engine().url.render_as_string(
+        hide_password=False).replace('%', '%%'))
 target_metadata = current_app.extensions['migrate'].db.metadata
 
 def run_migrations_offline():
@@ -0,0 +1,26 @@
+"""Add keyset index on golinks created_at
+
+Revision ID: 8b2e4f7c9d10
+Revises: 3f6c1d9a2b47
+Create Date: 2026-10-18 11:02:17.553091
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4f7c9d10'
+down_revision = '3f6c1d9a2b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('golinks', schema=None) as batch_op:
+        batch_op.create_index('ix_golinks_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('golinks', schema=None) as batch_op:
+        batch_op.drop_index('ix_golinks_created_at_id')
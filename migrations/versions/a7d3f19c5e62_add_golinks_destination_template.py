@@ -0,0 +1,64 @@
+"""Store compiled destination templates on golinks
+
+Revision ID: a7d3f19c5e62
+Revises: e5b8c2d4a913
+Create Date: 2026-10-18 17:41:09.215634
+
+"""
+import json
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3f19c5e62'
+down_revision = 'e5b8c2d4a913'
+branch_labels = None
+depends_on = None
+
+# DestinationTemplate.compile() as of this revision, copied so that later
+# changes to destinations.py don't change what this migration does
+PLACEHOLDER_RE = re.compile(r'\{(query|\d+|[A-Za-z_]\w*)(?::([^{}]*))?\}')
+
+
+def compile_destination(destination):
+    parts = []
+    position = 0
+    for match in PLACEHOLDER_RE.finditer(destination):
+        if match.start() > position:
+            parts.append(destination[position:match.start()])
+        in_query = '?' in destination[:match.start()]
+        parts.append((match.group(1), match.group(2), in_query))
+        position = match.end()
+    if position < len(destination):
+        parts.append(destination[position:])
+    return json.dumps(parts)
+
+
+golinks = sa.table('golinks',
+    sa.column('id', sa.Integer),
+    sa.column('destination', sa.String),
+    sa.column('destination_template', sa.Text)
+)
+
+
+def upgrade():
+    # Plain ADD COLUMN: a batch rebuild of golinks would drop the FTS triggers
+    op.add_column('golinks', sa.Column('destination_template', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(golinks.c.id, golinks.c.destination)).fetchall()
+    if rows:
+        conn.execute(
+            golinks.update().where(golinks.c.id == sa.bindparam('link_id')),
+            [
+                {'link_id': id, 'destination_template': compile_destination(destination)}
+                for id, destination in rows
+            ]
+        )
+
+
+def downgrade():
+    op.drop_column('golinks', 'destination_template')
@@ -0,0 +1,36 @@
+"""Mark usage totals whose visitors were never sketched
+
+Revision ID: b5e2d7f90c13
+Revises: c6e1b8f47a20
+Create Date: 2026-10-19 10:12:44.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e2d7f90c13'
+down_revision = 'c6e1b8f47a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Links clicked before the sketches were added report unique_visitors
+    # as unknown rather than 0 until `flask usage backfill` sketches them
+    with op.batch_alter_table('link_usage_totals', schema=None) as batch_op:
+        batch_op.alter_column('unique_visitors', existing_type=sa.Integer(), nullable=True,
+                              existing_server_default='0')
+
+    op.execute(
+        'UPDATE link_usage_totals SET unique_visitors = NULL WHERE visitors IS NULL AND visits > 0'
+    )
+
+
+def downgrade():
+    op.execute('UPDATE link_usage_totals SET unique_visitors = 0 WHERE unique_visitors IS NULL')
+
+    with op.batch_alter_table('link_usage_totals', schema=None) as batch_op:
+        batch_op.alter_column('unique_visitors', existing_type=sa.Integer(), nullable=False,
+                              existing_server_default='0')
@@ -0,0 +1,52 @@
+"""Add shared data versions and trigram search indexes
+
+Revision ID: b91e6d2f4c37
+Revises: a7d3f19c5e62
+Create Date: 2026-10-18 20:31:52.480317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b91e6d2f4c37'
+down_revision = 'a7d3f19c5e62'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = {
+    'ix_golinks_shortlink_trgm': 'shortlink',
+    'ix_golinks_destination_trgm': 'destination',
+}
+
+
+def upgrade():
+    data_versions = op.create_table('data_versions',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(data_versions, [
+        {'name': 'links', 'version': 0},
+        {'name': 'usage', 'version': 0},
+    ])
+
+    # Substring search (ILIKE '%q%') and similarity ranking on PostgreSQL;
+    # SQLite has the FTS5 table instead
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES.items():
+        op.create_index(
+            name, 'golinks', [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name='golinks')
+    op.drop_table('data_versions')
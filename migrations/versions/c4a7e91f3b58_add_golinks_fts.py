@@ -0,0 +1,64 @@
+"""Add full-text search index on golinks
+
+Revision ID: c4a7e91f3b58
+Revises: 8b2e4f7c9d10
+Create Date: 2026-10-18 11:48:35.204118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a7e91f3b58'
+down_revision = '8b2e4f7c9d10'
+branch_labels = None
+depends_on = None
+
+
+def fts5_available(bind):
+    options = [row[0] for row in bind.exec_driver_sql('PRAGMA compile_options')]
+    return 'ENABLE_FTS5' in options
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Other backends and SQLite builds without FTS5 use the LIKE fallback
+    if bind.dialect.name != 'sqlite' or not fts5_available(bind):
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE golinks_fts USING fts5("
+        "shortlink, destination, content='golinks', content_rowid='id', "
+        "tokenize='unicode61', prefix='2 3')"
+    )
+    # Matches in the shortlink count ten times as much as in the destination
+    op.execute("INSERT INTO golinks_fts(golinks_fts, rank) VALUES('rank', 'bm25(10.0, 1.0)')")
+    op.execute(
+        "CREATE TRIGGER golinks_fts_ai AFTER INSERT ON golinks BEGIN "
+        "INSERT INTO golinks_fts(rowid, shortlink, destination) "
+        "VALUES (new.id, new.shortlink, new.destination); END"
+    )
+    op.execute(
+        "CREATE TRIGGER golinks_fts_ad AFTER DELETE ON golinks BEGIN "
+        "INSERT INTO golinks_fts(golinks_fts, rowid, shortlink, destination) "
+        "VALUES ('delete', old.id, old.shortlink, old.destination); END"
+    )
+    op.execute(
+        "CREATE TRIGGER golinks_fts_au AFTER UPDATE ON golinks BEGIN "
+        "INSERT INTO golinks_fts(golinks_fts, rowid, shortlink, destination) "
+        "VALUES ('delete', old.id, old.shortlink, old.destination); "
+        "INSERT INTO golinks_fts(rowid, shortlink, destination) "
+        "VALUES (new.id, new.shortlink, new.destination); END"
+    )
+    op.execute("INSERT INTO golinks_fts(golinks_fts) VALUES('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS golinks_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS golinks_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS golinks_fts_ai")
+    op.execute("DROP TABLE IF EXISTS golinks_fts")
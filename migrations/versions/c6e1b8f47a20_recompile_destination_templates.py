@@ -0,0 +1,68 @@
+"""Recompile destination templates with opt-in named arguments
+
+Revision ID: c6e1b8f47a20
+Revises: f3c8e6a1d274
+Create Date: 2026-10-19 09:12:37.604118
+
+"""
+import json
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e1b8f47a20'
+down_revision = 'f3c8e6a1d274'
+branch_labels = None
+depends_on = None
+
+# Named arguments are written {?name} from this revision on; {name} is
+# literal text again, as it was before templates were compiled
+PLACEHOLDER_RE = re.compile(r'\{(query|\d+|\?[A-Za-z_]\w*)(?::([^{}]*))?\}')
+PREVIOUS_PLACEHOLDER_RE = re.compile(r'\{(query|\d+|[A-Za-z_]\w*)(?::([^{}]*))?\}')
+
+golinks = sa.table('golinks',
+    sa.column('id', sa.Integer),
+    sa.column('destination', sa.String),
+    sa.column('destination_template', sa.Text)
+)
+
+
+def compile_destination(destination, placeholder_re):
+    parts = []
+    position = 0
+    for match in placeholder_re.finditer(destination):
+        if match.start() > position:
+            parts.append(destination[position:match.start()])
+        in_query = '?' in destination[:match.start()]
+        parts.append((match.group(1), match.group(2), in_query))
+        position = match.end()
+    if position < len(destination):
+        parts.append(destination[position:])
+    return json.dumps(parts)
+
+
+def recompile(placeholder_re):
+    # Destinations without braces compile the same either way
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(golinks.c.id, golinks.c.destination).where(golinks.c.destination.contains('{'))
+    ).fetchall()
+    if rows:
+        conn.execute(
+            golinks.update().where(golinks.c.id == sa.bindparam('link_id')),
+            [
+                {'link_id': id, 'destination_template': compile_destination(destination, placeholder_re)}
+                for id, destination in rows
+            ]
+        )
+
+
+def upgrade():
+    recompile(PLACEHOLDER_RE)
+
+
+def downgrade():
+    recompile(PREVIOUS_PLACEHOLDER_RE)
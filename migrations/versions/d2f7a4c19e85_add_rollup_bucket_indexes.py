@@ -0,0 +1,32 @@
+"""Add bucket indexes to the usage rollups
+
+Revision ID: d2f7a4c19e85
+Revises: b91e6d2f4c37
+Create Date: 2026-10-18 22:14:06.913524
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f7a4c19e85'
+down_revision = 'b91e6d2f4c37'
+branch_labels = None
+depends_on = None
+
+ROLLUP_TABLES = ('link_usage_hourly', 'link_usage_daily')
+
+
+def upgrade():
+    # (bucket, shortlink, visits) answers time-range queries across all
+    # shortlinks from the index alone
+    for table in ROLLUP_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(f'ix_{table}_bucket', ['bucket', 'shortlink', 'visits'], unique=False)
+
+
+def downgrade():
+    for table in ROLLUP_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_bucket')
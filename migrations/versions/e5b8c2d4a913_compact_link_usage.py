@@ -0,0 +1,166 @@
+"""Compact link_usage rows: user agent lookup table, packed IPs, epoch times
+
+Revision ID: e5b8c2d4a913
+Revises: c4a7e91f3b58
+Create Date: 2026-10-18 16:05:31.482907
+
+"""
+import ipaddress
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b8c2d4a913'
+down_revision = 'c4a7e91f3b58'
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 10000
+
+user_agents = sa.table('user_agents',
+    sa.column('id', sa.Integer),
+    sa.column('value', sa.String)
+)
+wide_usage = sa.table('link_usage',
+    sa.column('id', sa.Integer),
+    sa.column('shortlink', sa.String),
+    sa.column('accessed_at', sa.DateTime),
+    sa.column('args', sa.String),
+    sa.column('user_agent', sa.String),
+    sa.column('ip_address', sa.String)
+)
+compact_usage = sa.table('link_usage',
+    sa.column('id', sa.Integer),
+    sa.column('shortlink', sa.String),
+    sa.column('accessed_at', sa.BigInteger),
+    sa.column('args', sa.String),
+    sa.column('user_agent_id', sa.Integer),
+    sa.column('ip_address', sa.LargeBinary)
+)
+
+
+def pack_ip(value):
+    try:
+        return ipaddress.ip_address(value).packed if value else None
+    except ValueError:
+        return None
+
+
+def unpack_ip(value):
+    return str(ipaddress.ip_address(bytes(value))) if value is not None else None
+
+
+def to_epoch(value):
+    return int(value.replace(tzinfo=timezone.utc).timestamp()) if value is not None else None
+
+
+def from_epoch(value):
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None) if value is not None else None
+
+
+def copy_rows(source, target, convert):
+    """Copy every row of `source` into `target` in id order, CHUNK_SIZE at a time."""
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(source).where(source.c.id > last_id).order_by(source.c.id).limit(CHUNK_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(sa.insert(target), [convert(row) for row in rows])
+        last_id = rows[-1].id
+
+
+def swap_tables(name, tmp_name):
+    with op.batch_alter_table(name, schema=None) as batch_op:
+        batch_op.drop_index('ix_link_usage_shortlink')
+    op.drop_table(name)
+    op.rename_table(tmp_name, name)
+    with op.batch_alter_table(name, schema=None) as batch_op:
+        batch_op.create_index('ix_link_usage_shortlink', ['shortlink'], unique=False)
+
+
+def upgrade():
+    op.create_table('user_agents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.String(length=1024), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('user_agents', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_agents_value'), ['value'], unique=True)
+
+    op.create_table('link_usage_compact',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('shortlink', sa.String(length=255), nullable=False),
+    sa.Column('accessed_at', sa.BigInteger(), nullable=True),
+    sa.Column('args', sa.String(length=1024), nullable=True),
+    sa.Column('user_agent_id', sa.Integer(), nullable=True),
+    sa.Column('ip_address', sa.LargeBinary(length=16), nullable=True),
+    sa.ForeignKeyConstraint(['user_agent_id'], ['user_agents.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "INSERT INTO user_agents (value) SELECT DISTINCT user_agent FROM link_usage "
+        "WHERE user_agent IS NOT NULL"
+    ))
+    agent_ids = {value: id for id, value in conn.execute(sa.select(user_agents.c.id, user_agents.c.value))}
+
+    target = sa.table('link_usage_compact', *[sa.column(c.name, c.type) for c in compact_usage.c])
+    copy_rows(wide_usage, target, lambda row: {
+        'id': row.id,
+        'shortlink': row.shortlink,
+        'accessed_at': to_epoch(row.accessed_at),
+        'args': row.args,
+        'user_agent_id': agent_ids.get(row.user_agent),
+        'ip_address': pack_ip(row.ip_address),
+    })
+    swap_tables('link_usage', 'link_usage_compact')
+
+    if conn.dialect.name == 'postgresql':
+        conn.execute(sa.text(
+            "SELECT setval(pg_get_serial_sequence('link_usage', 'id'), "
+            "COALESCE((SELECT MAX(id) FROM link_usage), 0) + 1, false)"
+        ))
+
+
+def downgrade():
+    op.create_table('link_usage_wide',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('shortlink', sa.String(length=255), nullable=False),
+    sa.Column('accessed_at', sa.DateTime(), nullable=True),
+    sa.Column('args', sa.String(length=1024), nullable=True),
+    sa.Column('user_agent', sa.String(length=1024), nullable=True),
+    sa.Column('ip_address', sa.String(length=45), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    conn = op.get_bind()
+    agent_values = {id: value for id, value in conn.execute(sa.select(user_agents.c.id, user_agents.c.value))}
+
+    target = sa.table('link_usage_wide', *[sa.column(c.name, c.type) for c in wide_usage.c])
+    copy_rows(compact_usage, target, lambda row: {
+        'id': row.id,
+        'shortlink': row.shortlink,
+        'accessed_at': from_epoch(row.accessed_at),
+        'args': row.args,
+        'user_agent': agent_values.get(row.user_agent_id),
+        'ip_address': unpack_ip(row.ip_address),
+    })
+    swap_tables('link_usage', 'link_usage_wide')
+
+    if conn.dialect.name == 'postgresql':
+        conn.execute(sa.text(
+            "SELECT setval(pg_get_serial_sequence('link_usage', 'id'), "
+            "COALESCE((SELECT MAX(id) FROM link_usage), 0) + 1, false)"
+        ))
+
+    with op.batch_alter_table('user_agents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_agents_value'))
+
+    op.drop_table('user_agents')
@@ -0,0 +1,35 @@
+"""Add HyperLogLog visitor sketches to the usage rollups
+
+Revision ID: f3c8e6a1d274
+Revises: d2f7a4c19e85
+Create Date: 2026-10-18 23:40:18.270641
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8e6a1d274'
+down_revision = 'd2f7a4c19e85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing clicks get sketches from `flask usage backfill`
+    with op.batch_alter_table('link_usage_totals', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('visitors', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('unique_visitors', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('link_usage_daily', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('visitors', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('link_usage_daily', schema=None) as batch_op:
+        batch_op.drop_column('visitors')
+
+    with op.batch_alter_table('link_usage_totals', schema=None) as batch_op:
+        batch_op.drop_column('unique_visitors')
+        batch_op.drop_column('visitors')
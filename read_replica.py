@@ -0,0 +1,60 @@
+import time
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+# Key of the replica engine in SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+
+# Cookie that keeps a client's reads on the primary right after it wrote
+PRIMARY_COOKIE = 'golinks_primary_until'
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica engine once use_replica() is called.
+
+    Flushes always go to the primary, so a view that unexpectedly writes
+    still writes to the right place.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(REPLICA_BIND) and not self._flushing:
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_replica(session):
+    """Send this session's queries to the replica, if one is configured."""
+    session.info[REPLICA_BIND] = True
+
+
+def wrote_recently():
+    """True if this client committed a write within its read-your-writes window."""
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def install_read_your_writes(app, session, seconds):
+    """Keep a client's reads on the primary for `seconds` after each of its writes.
+
+    Every commit made while handling a request sets a cookie, which
+    wrote_recently() checks. Replicas that lag behind the primary then can't
+    hide a link the client has just created or changed.
+    """
+
+    @event.listens_for(session, 'after_commit')
+    def mark_write(session):
+        if has_request_context():
+            g.wrote_to_primary = True
+
+    @app.after_request
+    def set_primary_cookie(response):
+        if g.get('wrote_to_primary'):
+            response.set_cookie(
+                PRIMARY_COOKIE, str(time.time() + seconds),
+                max_age=seconds, httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,203 @@
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the single dev-server process runs jobs
+    fcntl = None
+
+from rollups import day_bucket
+
+
+class UsageRetention:
+    """Moves old raw clicks out of link_usage.
+
+    The daily and hourly rollups already hold the aggregated counts, so a
+    pass only has to export each expired day of raw rows to
+    <archive_dir>/YYYY/MM/link_usage-YYYY-MM-DD.jsonl.gz and delete them in
+    small batches, committing between batches so writers never wait long
+    for the SQLite write lock. Days are processed oldest first, and a day is
+    written to its archive before any of its rows are deleted, so only the
+    oldest day left in link_usage can be partially pruned.
+    """
+
+    def __init__(self, db, model, archive_dir, batch_size=1000, logger=None, serialize=None):
+        self.db = db
+        self.model = model
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.logger = logger
+        self.serialize = serialize or self._serialize
+
+    def _serialize(self, row):
+        return {
+            column.name: value.isoformat() if isinstance(value, datetime) else value
+            for column in self.model.__table__.columns
+            for value in [getattr(row, column.name)]
+        }
+
+    def archive_path(self, day):
+        return os.path.join(
+            self.archive_dir, f'{day:%Y}', f'{day:%m}', f'link_usage-{day:%Y-%m-%d}.jsonl.gz'
+        )
+
+    def expired_days(self, cutoff):
+        oldest = self.db.session.query(self.db.func.min(self.model.accessed_at)).filter(
+            self.model.accessed_at < cutoff
+        ).scalar()
+        if oldest is None:
+            return []
+        day = day_bucket(oldest)
+        days = []
+        while day < cutoff:
+            days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    def _copy_archive(self, path, archive_file):
+        """Copy an existing archive into `archive_file`; returns the ids it holds."""
+        ids = set()
+        if not os.path.exists(path):
+            return ids
+        with gzip.open(path, 'rt', encoding='utf-8') as existing:
+            for line in existing:
+                archive_file.write(line)
+                ids.add(json.loads(line).get('id'))
+        return ids
+
+    def prune_day(self, day, end, archive=True):
+        """Archive and delete the rows of one day; returns how many were removed."""
+        model = self.model
+        rows = self.db.session.query(*model.__table__.columns).filter(
+            model.accessed_at >= day, model.accessed_at < end
+        ).order_by(model.id).execution_options(yield_per=self.batch_size)
+
+        ids = []
+        archive_file = None
+        path = self.archive_path(day)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        archived = set()
+        try:
+            for row in rows:
+                if archive and archive_file is None:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    archive_file = gzip.open(tmp_path, 'wt', encoding='utf-8')
+                    # A pass interrupted while deleting leaves the day's
+                    # archive behind: keep its rows and skip them below
+                    archived = self._copy_archive(path, archive_file)
+                if archive_file is not None and row.id not in archived:
+                    archive_file.write(json.dumps(self.serialize(row)) + '\n')
+                ids.append(row.id)
+            if archive_file is not None:
+                archive_file.close()
+                os.replace(tmp_path, path)
+        finally:
+            if archive_file is not None and not archive_file.closed:
+                archive_file.close()
+                os.remove(tmp_path)
+        self.db.session.rollback()
+
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start:start + self.batch_size]
+            self.db.session.query(model).filter(model.id.in_(batch)).delete(synchronize_session=False)
+            self.db.session.commit()
+        return len(ids)
+
+    def vacuum(self, full=False):
+        """Give freed pages back to the filesystem after a prune (SQLite only)."""
+        engine = self.db.engine
+        if engine.dialect.name != 'sqlite':
+            return
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            mode = conn.exec_driver_sql('PRAGMA auto_vacuum').scalar()
+            if mode == 2:
+                conn.exec_driver_sql('PRAGMA incremental_vacuum')
+            elif full:
+                # Switching an existing database to incremental mode takes one full VACUUM
+                conn.exec_driver_sql('PRAGMA auto_vacuum=INCREMENTAL')
+                conn.exec_driver_sql('VACUUM')
+            elif self.logger:
+                self.logger.info('Skipping vacuum: auto_vacuum is not INCREMENTAL, run a full vacuum once')
+
+    def run(self, days, archive=True, vacuum=True, full_vacuum=False, now=None):
+        """Remove raw clicks older than `days` days; returns the number of rows removed."""
+        cutoff = day_bucket((now or datetime.utcnow()) - timedelta(days=days))
+        removed = 0
+        for day in self.expired_days(cutoff):
+            removed += self.prune_day(day, min(day + timedelta(days=1), cutoff), archive)
+        if vacuum and (removed or full_vacuum):
+            self.vacuum(full_vacuum)
+        if self.logger:
+            self.logger.info(f'Usage retention removed {removed} rows older than {cutoff:%Y-%m-%d}')
+        return removed
+
+
+class RetentionScheduler:
+    """Runs `job` every `interval` seconds in a background thread.
+
+    Safe to start from every gunicorn worker: a lock file makes sure only one
+    process runs the job at a time and records when it last ran, so the job
+    runs once per interval overall rather than once per worker. The thread
+    is recreated after fork.
+    """
+
+    # How often the thread wakes up to see whether the job is due. Kept short
+    # so that workers recycled by max_requests still get to run it.
+    POLL_INTERVAL = 60
+
+    def __init__(self, job, interval, lock_path, logger=None):
+        self.job = job
+        self.interval = interval
+        self.lock_path = lock_path
+        self.logger = logger
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name='golinks-retention', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(min(self.interval, self.POLL_INTERVAL))
+            try:
+                self._run_locked()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f'Error running usage retention: {str(e)}')
+
+    def _run_locked(self):
+        with open(self.lock_path, 'a+') as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return  # another worker is already on it
+            try:
+                lock_file.seek(0)
+                try:
+                    last_run = float(lock_file.read().strip() or 0)
+                except ValueError:
+                    last_run = 0
+                if time.time() - last_run < self.interval:
+                    return
+                self.job()
+                lock_file.seek(0)
+                lock_file.truncate()
+                lock_file.write(str(time.time()))
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
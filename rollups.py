@@ -0,0 +1,211 @@
+import ipaddress
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from sqlalchemy import and_, bindparam, case, func, literal, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from hll import HyperLogLog
+
+
+def hour_bucket(ts):
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(ts):
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def week_bucket(ts):
+    # Weeks start on Monday, like ISO weeks
+    day = day_bucket(ts)
+    return day - timedelta(days=day.weekday())
+
+
+# Width and floor function of each time-series bucket
+BUCKETS = {
+    'hour': (timedelta(hours=1), hour_bucket),
+    'day': (timedelta(days=1), day_bucket),
+    'week': (timedelta(weeks=1), week_bucket),
+}
+
+
+def bucket_range(start, end, bucket):
+    """Widen [start, end) to whole buckets; returns (start, end, bucket count)."""
+    width, floor = BUCKETS[bucket]
+    start = floor(start)
+    if floor(end) != end:
+        end = floor(end) + width
+    return start, end, max(0, (end - start) // width)
+
+
+def bucket_starts(start, end, bucket):
+    width = BUCKETS[bucket][0]
+    while start < end:
+        yield start
+        start += width
+
+
+@lru_cache(maxsize=4096)
+def canonical_ip(value):
+    """The address as link_usage gives it back; invalid addresses are stored as NULL."""
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        return ''
+
+
+def visitor_key(ip_address, user_agent):
+    """Identify a visitor by IP address and user agent, as stored in link_usage."""
+    return f'{canonical_ip(ip_address) if ip_address else ""}\0{user_agent or ""}'
+
+
+class UsageAggregate:
+    """Per-shortlink counters for a batch of usage events.
+
+    Adding events only touches in-memory counters; the result is turned into
+    rows for the totals, hourly and daily rollup tables with the *_rows()
+    methods, ready to be upserted. Events with a visitor key also feed a
+    HyperLogLog sketch of the link's distinct visitors for that day.
+    """
+
+    def __init__(self):
+        self.visits = Counter()
+        self.last_used = {}
+        self.hourly = Counter()
+        self.daily = Counter()
+        self.daily_visitors = defaultdict(HyperLogLog)
+
+    def add(self, shortlink, accessed_at, visitor=None):
+        self.visits[shortlink] += 1
+        if accessed_at > self.last_used.get(shortlink, datetime.min):
+            self.last_used[shortlink] = accessed_at
+        self.hourly[(shortlink, hour_bucket(accessed_at))] += 1
+        self.daily[(shortlink, day_bucket(accessed_at))] += 1
+        if visitor is not None:
+            self.daily_visitors[(shortlink, day_bucket(accessed_at))].add(visitor)
+
+    def __bool__(self):
+        return bool(self.visits)
+
+    def total_rows(self):
+        return [
+            {'shortlink': shortlink, 'visits': visits, 'last_used': self.last_used[shortlink]}
+            for shortlink, visits in self.visits.items()
+        ]
+
+    def hourly_rows(self):
+        return [
+            {'shortlink': shortlink, 'bucket': bucket, 'visits': visits}
+            for (shortlink, bucket), visits in self.hourly.items()
+        ]
+
+    def daily_rows(self):
+        return [
+            {'shortlink': shortlink, 'bucket': bucket, 'visits': visits}
+            for (shortlink, bucket), visits in self.daily.items()
+        ]
+
+    def total_visitors(self):
+        """Merge the daily visitor sketches into one sketch per shortlink."""
+        totals = defaultdict(HyperLogLog)
+        for (shortlink, _), sketch in self.daily_visitors.items():
+            totals[(shortlink,)].merge(sketch)
+        return totals
+
+
+def dialect_insert(session, table):
+    """Return an INSERT construct that supports ON CONFLICT for this backend."""
+    name = session.get_bind().dialect.name
+    if name == 'postgresql':
+        return postgresql.insert(table)
+    if name == 'sqlite':
+        return sqlite.insert(table)
+    raise NotImplementedError(f'Rollups are not supported on {name}')
+
+
+def upsert_counts(session, table, rows, keys, keep_larger=False):
+    """Add the `visits` of each row to the existing row with the same keys.
+
+    With `keep_larger` the existing row keeps the larger of the two counts
+    instead. If the table has a last_used column it keeps the later of the
+    two values.
+
+    Rows are written in key order, so that concurrent writers take their row
+    locks in the same order and can't deadlock each other.
+    """
+    if not rows:
+        return
+    rows = sorted(rows, key=lambda row: tuple(row[key] for key in keys))
+    stmt = dialect_insert(session, table)
+    if keep_larger:
+        visits = case(
+            (stmt.excluded.visits > table.c.visits, stmt.excluded.visits),
+            else_=table.c.visits
+        )
+    else:
+        visits = table.c.visits + stmt.excluded.visits
+    updates = {'visits': visits}
+    if 'last_used' in table.c:
+        # The comparison is NULL while the stored value is, which keeps it
+        updates['last_used'] = func.coalesce(
+            case(
+                (stmt.excluded.last_used > table.c.last_used, stmt.excluded.last_used),
+                else_=table.c.last_used
+            ),
+            stmt.excluded.last_used
+        )
+    session.execute(stmt.on_conflict_do_update(index_elements=keys, set_=updates), rows)
+
+
+def merge_sketches(session, table, sketches, keys):
+    """Merge HyperLogLog sketches into the `visitors` column of existing rows.
+
+    `sketches` maps tuples of `keys` values to sketches. The rows must exist
+    and be write-locked by the current transaction, which upsert_counts()
+    on the same rows does, so concurrent writers never lose each other's
+    registers. A unique_visitors column, if the table has one, is set to
+    the merged estimate. Like upsert_counts(), rows are updated in key order.
+
+    A NULL unique_visitors marks a row whose earlier visitors were never
+    sketched. Such rows are left alone: an estimate of the new visitors alone
+    would be too low, and `flask usage backfill` rebuilds them whole.
+    """
+    if not sketches:
+        return
+    columns = [table.c[key] for key in keys]
+    has_estimate = 'unique_visitors' in table.c
+    estimate = table.c.unique_visitors if has_estimate else literal(0)
+    stored = session.execute(
+        select(*columns, table.c.visitors, estimate).where(tuple_(*columns).in_(list(sketches)))
+    )
+    rows = []
+    for *key, blob, previous in stored:
+        if blob is None and previous is None:
+            continue
+        sketch = HyperLogLog.loads(blob).merge(sketches[tuple(key)])
+        row = {f'key_{name}': value for name, value in zip(keys, key)}
+        row['sketch'] = sketch.dumps()
+        row['estimate'] = sketch.count()
+        rows.append(row)
+    rows.sort(key=lambda row: tuple(row[f'key_{name}'] for name in keys))
+
+    if not rows:
+        return
+    values = {'visitors': bindparam('sketch')}
+    if has_estimate:
+        values['unique_visitors'] = bindparam('estimate')
+    stmt = table.update().where(
+        and_(*(column == bindparam(f'key_{column.name}') for column in columns))
+    ).values(values)
+    session.execute(stmt, rows)
+
+
+def apply_aggregate(session, aggregate, totals, hourly, daily):
+    """Fold an aggregate into the rollup tables within the current transaction."""
+    upsert_counts(session, totals, aggregate.total_rows(), ['shortlink'])
+    upsert_counts(session, hourly, aggregate.hourly_rows(), ['shortlink', 'bucket'])
+    upsert_counts(session, daily, aggregate.daily_rows(), ['shortlink', 'bucket'])
+    merge_sketches(session, daily, aggregate.daily_visitors, ['shortlink', 'bucket'])
+    merge_sketches(session, totals, aggregate.total_visitors(), ['shortlink'])
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Check the migrations against a real database.
+
+Upgrades an empty database to head, compares the resulting schema with the
+models, then downgrades to base and upgrades again. Runs against:
+
+    python scripts/check_migrations.py                      # a throwaway SQLite file
+    python scripts/check_migrations.py --postgres           # a throwaway PostgreSQL cluster
+    python scripts/check_migrations.py --database-url URL   # an existing empty database
+
+--postgres needs initdb, pg_ctl and the pg_trgm extension installed locally.
+Exits with status 1 if the schema differs from the models or a step fails.
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# Objects the migrations create that the models don't describe
+MIGRATION_ONLY_TABLES = {'alembic_version'}
+MIGRATION_ONLY_TABLE_PREFIXES = ('golinks_fts',)
+MIGRATION_ONLY_INDEX_SUFFIXES = ('_trgm',)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def temporary_postgres():
+    """Start a PostgreSQL cluster in a temporary directory and yield its URL."""
+    for tool in ('initdb', 'pg_ctl'):
+        if shutil.which(tool) is None:
+            sys.exit(f'{tool} not found on PATH; install PostgreSQL or pass --database-url')
+    data_dir = tempfile.mkdtemp(prefix='golinks-pg-')
+    port = free_port()
+    subprocess.run(
+        ['initdb', '-D', data_dir, '-U', 'postgres', '--auth=trust', '--no-sync'],
+        check=True, stdout=subprocess.DEVNULL
+    )
+    subprocess.run(
+        ['pg_ctl', '-D', data_dir, '-l', os.path.join(data_dir, 'server.log'), '-w',
+         '-o', f'-p {port} -k {data_dir} -c listen_addresses=127.0.0.1 -c fsync=off', 'start'],
+        check=True, stdout=subprocess.DEVNULL
+    )
+    try:
+        yield f'postgresql://postgres@127.0.0.1:{port}/postgres'
+    finally:
+        subprocess.run(['pg_ctl', '-D', data_dir, '-m', 'immediate', 'stop'], stdout=subprocess.DEVNULL)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == 'table':
+        return name not in MIGRATION_ONLY_TABLES and not name.startswith(MIGRATION_ONLY_TABLE_PREFIXES)
+    if type_ == 'index' and name:
+        return not name.endswith(MIGRATION_ONLY_INDEX_SUFFIXES)
+    return True
+
+
+def schema_differences(db):
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+
+    with db.engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={
+            'include_object': include_object,
+            'compare_type': True,
+        })
+        return compare_metadata(context, db.metadata)
+
+
+def check(database_url):
+    # The app reads its configuration when it is imported
+    os.environ['GOLINKS_DATABASE_URL'] = database_url
+    os.environ.setdefault('GOLINKS_DIR', tempfile.mkdtemp(prefix='golinks-check-'))
+    os.environ['GOLINKS_METRICS'] = '0'
+
+    from flask_migrate import downgrade, upgrade
+    from app import app, db
+
+    directory = os.path.join(ROOT_DIR, 'migrations')
+    failures = 0
+    with app.app_context():
+        print(f'Backend: {db.engine.dialect.name}')
+        steps = [
+            ('upgrade to head', lambda: upgrade(directory=directory)),
+            ('compare with models', lambda: schema_differences(db)),
+            ('downgrade to base', lambda: downgrade(directory=directory, revision='base')),
+            ('upgrade to head again', lambda: upgrade(directory=directory)),
+        ]
+        for name, step in steps:
+            try:
+                differences = step()
+            except Exception as e:
+                print(f'FAIL {name}: {e}')
+                return 1
+            if differences:
+                failures += 1
+                print(f'FAIL {name}:')
+                for difference in differences:
+                    print(f'    {difference}')
+            else:
+                print(f'ok   {name}')
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument('--database-url', help='empty database to migrate')
+    backend.add_argument('--postgres', action='store_true', help='start a temporary PostgreSQL cluster')
+    args = parser.parse_args()
+
+    if args.postgres:
+        with temporary_postgres() as url:
+            return check(url)
+    if args.database_url:
+        return check(args.database_url)
+    with tempfile.TemporaryDirectory() as tmp:
+        return check(f"sqlite:///{os.path.join(tmp, 'golinks.db')}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
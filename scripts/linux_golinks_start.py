@@ -68,11 +68,29 @@ def setup_database():
         print(f"Error initializing database: {e}")
         sys.exit(1)
 
+def server_command(root_dir):
+    # GOLINKS_SERVER=gunicorn (default) runs the production server,
+    # GOLINKS_SERVER=asgi the event-loop server in asgi.py (uvicorn),
+    # GOLINKS_SERVER=dev the Flask development server
+    server = os.environ.get("GOLINKS_SERVER", "gunicorn")
+    venv_bin = os.path.join(root_dir, "venv", "bin")
+    if server == "dev":
+        return [os.path.join(venv_bin, "python3"), os.path.join(root_dir, "app.py")]
+    if server == "gunicorn":
+        return [
+            os.path.join(venv_bin, "gunicorn"),
+            "--config", os.path.join(root_dir, "gunicorn.conf.py"),
+            "app:app",
+        ]
+    if server == "asgi":
+        return [os.path.join(venv_bin, "python3"), os.path.join(root_dir, "asgi.py")]
+    print(f"Unknown GOLINKS_SERVER '{server}', expected 'gunicorn', 'asgi' or 'dev'")
+    sys.exit(1)
+
 def create_systemd_service():
     print("Setting up systemd service...")
     root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    venv_python = os.path.join(root_dir, "venv", "bin", "python3")
-    app_path = os.path.join(root_dir, "app.py")
+    command = " ".join(server_command(root_dir))
     
     service_content = f"""[Unit]
 Description=GoLinks Local Service
@@ -83,7 +101,10 @@ Type=simple
 User={os.getenv('USER')}
 WorkingDirectory={root_dir}
 Environment=PATH=/usr/local/bin:/usr/bin:/bin
-ExecStart={venv_python} {app_path}
+ExecStart={command}
+ExecReload=/bin/kill -s HUP $MAINPID
+KillSignal=SIGTERM
+TimeoutStopSec=35
 Restart=always
 
 [Install]
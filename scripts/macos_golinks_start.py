@@ -68,11 +68,31 @@ def setup_database():
         print(f"Error initializing database: {e}")
         sys.exit(1)
 
+def server_command(root_dir):
+    # GOLINKS_SERVER=gunicorn (default) runs the production server,
+    # GOLINKS_SERVER=asgi the event-loop server in asgi.py (uvicorn),
+    # GOLINKS_SERVER=dev the Flask development server
+    server = os.environ.get("GOLINKS_SERVER", "gunicorn")
+    venv_bin = os.path.join(root_dir, "venv", "bin")
+    if server == "dev":
+        return [os.path.join(venv_bin, "python3"), os.path.join(root_dir, "app.py")]
+    if server == "gunicorn":
+        return [
+            os.path.join(venv_bin, "gunicorn"),
+            "--config", os.path.join(root_dir, "gunicorn.conf.py"),
+            "app:app",
+        ]
+    if server == "asgi":
+        return [os.path.join(venv_bin, "python3"), os.path.join(root_dir, "asgi.py")]
+    print(f"Unknown GOLINKS_SERVER '{server}', expected 'gunicorn', 'asgi' or 'dev'")
+    sys.exit(1)
+
 def create_launch_agent():
     print("Setting up launch agent...")
     root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    venv_python = os.path.join(root_dir, "venv", "bin", "python3")
-    app_path = os.path.join(root_dir, "app.py")
+    program_arguments = "\n".join(
+        f"        <string>{arg}</string>" for arg in server_command(root_dir)
+    )
     
     plist_content = f"""<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
@@ -82,8 +102,7 @@ def create_launch_agent():
     <string>com.user.golinks</string>
     <key>ProgramArguments</key>
     <array>
-        <string>{venv_python}</string>
-        <string>{app_path}</string>
+{program_arguments}
     </array>
     <key>WorkingDirectory</key>
     <string>{root_dir}</string>
@@ -63,6 +63,10 @@ def setup_nssm():
     venv_python = os.path.join(root_dir, "venv", "Scripts", "python.exe")
     app_path = os.path.join(root_dir, "app.py")
     
+    # gunicorn needs fork(), so Windows always runs the built-in server
+    if os.environ.get("GOLINKS_SERVER", "dev") != "dev":
+        print("GOLINKS_SERVER is not supported on Windows; using the built-in server")
+    
     # Check if NSSM is available
     try:
         subprocess.run(["nssm", "version"], check=True, capture_output=True)
@@ -0,0 +1,84 @@
+import re
+
+from sqlalchemy import column, func, inspect, table, text
+
+FTS_TABLE = 'golinks_fts'
+
+# GIN trigram index on golinks.shortlink, created by migration on PostgreSQL
+TRIGRAM_INDEX = 'ix_golinks_shortlink_trgm'
+
+# FTS5's unicode61 tokenizer splits on everything but letters and digits
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+# Rows of the FTS table, joined to golinks on rowid = golinks.id
+fts = table(FTS_TABLE, column('rowid'), column('rank'))
+
+
+def match_expression(search_query):
+    """Turn free text into an FTS5 query that prefix-matches every word.
+
+    Returns None when the text has no searchable words, e.g. only punctuation.
+    """
+    tokens = _TOKEN_RE.findall(search_query.lower())
+    if not tokens:
+        return None
+    return ' AND '.join(f'"{token}"*' for token in tokens)
+
+
+class LinkSearch:
+    """Ranked search over golinks with a LIKE fallback.
+
+    On SQLite the golinks_fts table (kept in sync by triggers) is used when
+    it exists. On PostgreSQL with the pg_trgm indexes, substring matches are
+    found through the indexes and ranked by trigram similarity. Other
+    backends, SQLite builds without FTS5, and queries with no searchable
+    words fall back to unranked substring matching.
+    """
+
+    def __init__(self):
+        self._available = {}
+
+    def _cached(self, engine, name, check):
+        key = (str(engine.url), name)
+        if key not in self._available:
+            self._available[key] = check()
+        return self._available[key]
+
+    def fts_available(self, engine):
+        if engine.dialect.name != 'sqlite':
+            return False
+        return self._cached(engine, FTS_TABLE, lambda: inspect(engine).has_table(FTS_TABLE))
+
+    def trigram_available(self, engine):
+        if engine.dialect.name != 'postgresql':
+            return False
+        return self._cached(engine, TRIGRAM_INDEX, lambda: any(
+            index['name'] == TRIGRAM_INDEX for index in inspect(engine).get_indexes('golinks')
+        ))
+
+    def apply(self, query, engine, model, search_query):
+        """Filter and order `query` by search relevance.
+
+        Returns the new query and whether its results are ranked, in which
+        case they should not be re-ordered or keyset-paginated.
+        """
+        match = match_expression(search_query)
+        if match and self.fts_available(engine):
+            query = query.join(fts, fts.c.rowid == model.id).filter(
+                text(f'{FTS_TABLE} MATCH :match').bindparams(match=match)
+            ).order_by(None).order_by(fts.c.rank, model.id.desc())
+            return query, True
+
+        query = query.filter(
+            model.shortlink.ilike(f'%{search_query}%') |
+            model.destination.ilike(f'%{search_query}%')
+        )
+        if search_query and self.trigram_available(engine):
+            # Like the FTS ranking, the shortlink counts ten times as much
+            relevance = (
+                func.similarity(model.shortlink, search_query) * 10 +
+                func.similarity(model.destination, search_query)
+            )
+            query = query.order_by(None).order_by(relevance.desc(), model.id.desc())
+            return query, True
+        return query, False
@@ -0,0 +1,39 @@
+from sqlalchemy import event
+
+
+# Settings kept in the database file itself, which read-only connections can't change
+FILE_PRAGMAS = ('auto_vacuum', 'journal_mode')
+
+
+def sqlite_pragmas(config, read_only=False):
+    """PRAGMA statements for every new SQLite connection, in execution order."""
+    pragmas = [
+        ('auto_vacuum', config['SQLITE_AUTO_VACUUM']),
+        ('journal_mode', config['SQLITE_JOURNAL_MODE']),
+        ('synchronous', config['SQLITE_SYNCHRONOUS']),
+        ('busy_timeout', config['SQLITE_BUSY_TIMEOUT_MS']),
+        ('mmap_size', config['SQLITE_MMAP_SIZE']),
+        ('cache_size', config['SQLITE_CACHE_SIZE']),
+        ('temp_store', config['SQLITE_TEMP_STORE']),
+    ]
+    if read_only:
+        return [(name, value) for name, value in pragmas if name not in FILE_PRAGMAS]
+    return pragmas
+
+
+def install_sqlite_profile(engine, pragmas):
+    """Run `pragmas` on every connection the engine opens.
+
+    Does nothing for other backends, so it is safe to call unconditionally.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,538 @@
+// Utility functions
+function icon(name, classes = '') {
+    // Icons come from the versioned SVG sprite linked on <body>
+    return `<svg class="icon ${classes}" aria-hidden="true"><use href="${document.body.dataset.icons}#${name}"></use></svg>`;
+}
+
+function formatDate(dateString) {
+    if (!dateString) return '';
+    // Parse the ISO string as UTC
+    const date = new Date(dateString + 'Z');
+    const timezone = document.getElementById('timezoneSelect').value;
+
+    const options = {
+        year: 'numeric',
+        month: 'short',
+        day: 'numeric',
+        hour: '2-digit',
+        minute: '2-digit',
+        second: '2-digit',
+        timeZoneName: 'short'
+    };
+
+    if (timezone === 'local') {
+        return date.toLocaleString(undefined, options);
+    }
+
+    return date.toLocaleString(undefined, { ...options, timeZone: timezone });
+}
+
+function showNotification(message, type = 'error') {
+    const container = document.getElementById('notificationContainer');
+    const notification = document.createElement('div');
+    notification.className = `notification ${type}`;
+    notification.innerHTML = `
+        <div class="flex items-center">
+            ${icon(type === 'error' ? 'circle-exclamation' : 'circle-check', 'mr-2')}
+            <span>${message}</span>
+        </div>
+        <button class="notification-close" onclick="dismissNotification(this.parentElement)">
+            ${icon('times')}
+        </button>
+    `;
+    container.appendChild(notification);
+
+    // Remove notification after 5 seconds
+    setTimeout(() => {
+        dismissNotification(notification);
+    }, 5000);
+}
+
+function showError(message) {
+    showNotification(message, 'error');
+}
+
+function showSuccess(message) {
+    showNotification(message, 'success');
+}
+
+function dismissNotification(notification) {
+    notification.classList.add('fade-out');
+    setTimeout(() => {
+        notification.remove();
+    }, 500); // Wait for fade animation to complete
+}
+
+// UI state management
+document.getElementById('showLinks').addEventListener('click', () => {
+    document.getElementById('linksTable').classList.remove('hidden');
+    document.getElementById('analyticsTable').classList.add('hidden');
+    loadLinks();
+});
+
+document.getElementById('showAnalytics').addEventListener('click', () => {
+    document.getElementById('linksTable').classList.add('hidden');
+    document.getElementById('analyticsTable').classList.remove('hidden');
+    loadAnalytics();
+});
+
+// Links management
+let searchTimeout;
+function debounceSearch(value) {
+    clearTimeout(searchTimeout);
+    searchTimeout = setTimeout(() => {
+        loadLinks(value);
+    }, 300);
+}
+
+// Infinite scroll state for the links table
+const LINKS_PAGE_SIZE = 100;
+let linksQuery = '';
+let linksCursor = null;
+let linksLoading = false;
+let linksRequestId = 0;
+
+async function loadLinks(searchQuery = '') {
+    linksQuery = searchQuery;
+    linksCursor = null;
+    linkStats = {};
+    await loadMoreLinks(true);
+}
+
+async function loadMoreLinks(reset = false) {
+    if (linksLoading && !reset) return;
+    if (!reset && !linksCursor) return;
+
+    const requestId = ++linksRequestId;
+    linksLoading = true;
+    try {
+        const params = new URLSearchParams({ limit: LINKS_PAGE_SIZE });
+        if (linksQuery) params.set('q', linksQuery);
+        if (linksCursor) params.set('cursor', linksCursor);
+
+        const response = await fetch(`/api/links?${params}`);
+        const links = await response.json();
+
+        // A newer search has started since this request was sent
+        if (requestId !== linksRequestId) return;
+
+        linksCursor = response.headers.get('X-Next-Cursor');
+        const tbody = document.getElementById('linksTableBody');
+
+        if (reset && links.length === 0) {
+            tbody.innerHTML = `
+                <tr>
+                    <td colspan="4" class="px-6 py-4 text-center text-gray-500">
+                        ${linksQuery ? 'No matches found' : 'No links added yet'}
+                    </td>
+                </tr>
+            `;
+            return;
+        }
+
+        if (reset) tbody.innerHTML = '';
+        links.forEach(link => {
+            const row = createTableRow(link);
+            tbody.appendChild(row);
+        });
+
+        prefetchLinkStats(links.map(link => link.shortlink));
+    } catch (error) {
+        showError('Failed to load links');
+    } finally {
+        if (requestId === linksRequestId) linksLoading = false;
+    }
+
+    // Keep going until the table is tall enough to scroll
+    if (requestId === linksRequestId && nearLinksBottom()) loadMoreLinks();
+}
+
+function nearLinksBottom() {
+    const container = document.getElementById('linksTable');
+    return container.scrollTop + container.clientHeight >= container.scrollHeight - 200;
+}
+
+document.getElementById('linksTable').addEventListener('scroll', () => {
+    if (nearLinksBottom()) loadMoreLinks();
+});
+
+function createTableRow(link) {
+    const tr = document.createElement('tr');
+    tr.classList.add('row-stats');
+    tr.dataset.id = link.id;
+    tr.innerHTML = `
+        <td class="px-6 py-4 whitespace-nowrap text-sm">
+            <div class="stats-cell" onmouseover="loadLinkStats('${link.shortlink}', this)">
+                <div class="view-mode">
+                    <span class="text-gray-500">go/</span>${link.shortlink}
+                </div>
+                <div class="edit-mode" style="display: none;">
+                    <div class="flex items-center">
+                        <span class="text-gray-500 mr-1">go/</span>
+                        <input type="text" value="${link.shortlink}" class="shortlink-edit w-full">
+                    </div>
+                </div>
+                <div class="tooltip">
+                    <div class="text-sm">
+                        <div class="font-medium mb-1">Loading stats...</div>
+                    </div>
+                </div>
+            </div>
+        </td>
+        <td class="px-6 py-4 whitespace-nowrap text-sm">
+            <div class="view-mode">${link.destination}</div>
+            <div class="edit-mode" style="display: none;">
+                <input type="text" value="${link.destination}" class="destination-edit w-full">
+            </div>
+        </td>
+        <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
+            ${formatDate(link.created_at)}
+        </td>
+        <td class="px-6 py-4 whitespace-nowrap text-sm text-right w-32">
+            <div class="flex justify-end items-center gap-2">
+                <div class="view-mode">
+                    <button onclick="enableEditMode(this.closest('tr'))" class="text-blue-600 hover:text-blue-800 p-1">
+                        ${icon('edit')}
+                    </button>
+                    <button onclick="deleteLink('${link.shortlink}')" class="text-red-600 hover:text-red-800 p-1">
+                        ${icon('trash')}
+                    </button>
+                </div>
+                <div class="edit-mode" style="display: none;">
+                    <button onclick="saveEdit(this.closest('tr'))" class="bg-green-600 text-white hover:bg-green-700 p-1 rounded">
+                        ${icon('check')}
+                    </button>
+                    <button onclick="cancelEdit(this.closest('tr'))" class="bg-gray-500 text-white hover:bg-gray-600 p-1 rounded">
+                        ${icon('times')}
+                    </button>
+                </div>
+            </div>
+        </td>
+    `;
+    return tr;
+}
+
+document.getElementById('addLinkForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const shortlink = document.getElementById('shortlink').value.trim();
+    const destination = document.getElementById('destination').value.trim();
+
+    try {
+        const response = await fetch('/api/links', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ shortlink, destination }),
+        });
+
+        const data = await response.json();
+
+        if (!response.ok) {
+            if (response.status === 409) {
+                showError(`The shortlink '${shortlink}' already exists. Please choose a different name.`);
+            } else {
+                showError(data.error || 'Failed to add link');
+            }
+            return;
+        }
+
+        document.getElementById('shortlink').value = '';
+        document.getElementById('destination').value = '';
+        showSuccess('Link added successfully!');
+        loadLinks();
+    } catch (error) {
+        showError('Failed to add link. Please try again.');
+    }
+});
+
+async function deleteLink(shortlink) {
+    if (!confirm('Are you sure you want to delete this link?')) return;
+
+    try {
+        const response = await fetch(`/api/links/${shortlink}`, {
+            method: 'DELETE',
+        });
+
+        if (!response.ok) {
+            showError('Failed to delete link');
+            return;
+        }
+
+        showSuccess('Link deleted successfully!');
+        loadLinks();
+    } catch (error) {
+        showError('Failed to delete link. Please try again.');
+    }
+}
+
+function enableEditMode(row) {
+    const viewModes = row.querySelectorAll('.view-mode');
+    const editModes = row.querySelectorAll('.edit-mode');
+
+    viewModes.forEach(el => el.style.display = 'none');
+    editModes.forEach(el => {
+        el.style.display = 'block';
+        el.classList.add('active');
+    });
+
+    const shortlinkInput = row.querySelector('.shortlink-edit');
+    if (shortlinkInput) {
+        shortlinkInput.focus();
+        shortlinkInput.select();
+    }
+}
+
+function cancelEdit(row) {
+    const viewModes = row.querySelectorAll('.view-mode');
+    const editModes = row.querySelectorAll('.edit-mode');
+
+    viewModes.forEach(el => el.style.display = 'block');
+    editModes.forEach(el => {
+        el.style.display = 'none';
+        el.classList.remove('active');
+    });
+}
+
+async function saveEdit(row) {
+    const shortlinkInput = row.querySelector('.shortlink-edit');
+    const destinationInput = row.querySelector('.destination-edit');
+
+    if (!shortlinkInput || !destinationInput) return;
+
+    const shortlink = shortlinkInput.value.trim();
+    const destination = destinationInput.value.trim();
+
+    if (!shortlink || !destination) {
+        showError('Both shortlink and destination are required');
+        return;
+    }
+
+    try {
+        const response = await fetch(`/api/links/${row.dataset.id}`, {
+            method: 'PUT',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ shortlink, destination })
+        });
+
+        if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error || 'Failed to update link');
+        }
+
+        showSuccess('Link updated successfully');
+        loadLinks();
+    } catch (error) {
+        showError(error.message || 'Failed to update link. Please try again.');
+        cancelEdit(row);
+    }
+}
+
+async function loadAnalytics() {
+    loadTimeseries();
+    loadTopLinks();
+    try {
+        const response = await fetch('/api/analytics');
+        const analytics = await response.json();
+        const tbody = document.getElementById('analyticsTableBody');
+        tbody.innerHTML = analytics.map(item => `
+            <tr class="hover:bg-gray-50">
+                <td class="px-6 py-4 whitespace-nowrap">go/${item.shortlink}</td>
+                <td class="px-6 py-4 whitespace-nowrap">${item.usage_count}</td>
+                <td class="px-6 py-4 whitespace-nowrap">${item.unique_visitors === null ? '—' : '~' + item.unique_visitors}</td>
+                <td class="px-6 py-4 whitespace-nowrap">${item.last_used ? formatDate(item.last_used) : 'Never'}</td>
+            </tr>
+        `).join('');
+    } catch (error) {
+        showError('Failed to load analytics');
+    }
+}
+
+// Visits over time, bucketed by the server and drawn as an SVG bar chart
+const CHART_HEIGHT = 100;
+let timeseriesRequestId = 0;
+
+async function loadTimeseries() {
+    const shortlink = document.getElementById('timeseriesShortlink').value.trim();
+    const params = new URLSearchParams({ bucket: document.getElementById('timeseriesBucket').value });
+    if (shortlink) params.set('shortlink', shortlink);
+
+    const requestId = ++timeseriesRequestId;
+    try {
+        const response = await fetch(`/api/analytics/timeseries?${params}`);
+        const series = await response.json();
+        if (!response.ok) throw new Error(series.error);
+        if (requestId !== timeseriesRequestId) return;
+        renderTimeseries(series);
+    } catch (error) {
+        showError(error.message || 'Failed to load visits over time');
+    }
+}
+
+function renderTimeseries(series) {
+    const chart = document.getElementById('timeseriesChart');
+    const points = series.points;
+    const peak = Math.max(1, ...points.map(point => point.visits));
+
+    chart.setAttribute('viewBox', `0 0 ${points.length} ${CHART_HEIGHT}`);
+    chart.innerHTML = points.map((point, i) => {
+        const height = point.visits / peak * CHART_HEIGHT;
+        return `
+            <rect x="${i + 0.1}" y="${CHART_HEIGHT - height}" width="0.8" height="${height}">
+                <title>${formatDate(point.t)}: ${point.visits} visits</title>
+            </rect>
+        `;
+    }).join('');
+
+    const name = series.shortlink ? `go/${series.shortlink}` : 'All links';
+    document.getElementById('timeseriesTitle').textContent = `${name}: ${series.total} visits, peak ${peak}`;
+    document.getElementById('timeseriesStart').textContent = points.length ? formatDate(points[0].t) : '';
+    document.getElementById('timeseriesEnd').textContent = formatDate(series.to);
+}
+
+async function loadTopLinks() {
+    try {
+        const response = await fetch('/api/analytics/top?limit=10');
+        const top = await response.json();
+        if (!response.ok) throw new Error(top.error);
+        document.getElementById('topLinksList').innerHTML = top.links.length ? top.links.map(link => `
+            <li data-shortlink="${link.shortlink}">
+                <span>go/${link.shortlink}</span>
+                <span class="text-gray-500">${link.visits}</span>
+            </li>
+        `).join('') : '<li class="text-gray-500">No visits yet</li>';
+    } catch (error) {
+        showError(error.message || 'Failed to load top links');
+    }
+}
+
+// Chart a link by picking it from the top links
+document.getElementById('topLinksList').addEventListener('click', (event) => {
+    const item = event.target.closest('li[data-shortlink]');
+    if (!item) return;
+    document.getElementById('timeseriesShortlink').value = item.dataset.shortlink;
+    loadTimeseries();
+});
+
+document.getElementById('timeseriesBucket').addEventListener('change', loadTimeseries);
+
+let timeseriesTimeout;
+document.getElementById('timeseriesShortlink').addEventListener('input', () => {
+    clearTimeout(timeseriesTimeout);
+    timeseriesTimeout = setTimeout(loadTimeseries, 300);
+});
+
+// Usage stats for the rendered rows, keyed by shortlink
+let linkStats = {};
+
+async function prefetchLinkStats(shortlinks) {
+    if (shortlinks.length === 0) return;
+
+    try {
+        const response = await fetch('/api/links/stats', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ shortlinks })
+        });
+        if (!response.ok) return;
+
+        Object.assign(linkStats, await response.json());
+    } catch (error) {
+        // Tooltips fall back to fetching stats one link at a time
+    }
+}
+
+function renderLinkStats(tooltip, stats) {
+    tooltip.innerHTML = `
+        <div class="text-sm">
+            <div class="font-medium mb-2">Usage Statistics</div>
+            <div class="space-y-1">
+                <div class="flex items-center gap-2">
+                    ${icon('chart-line', 'text-blue-600')}
+                    <span>Visits: ${stats.visits || 0}</span>
+                </div>
+                <div class="flex items-center gap-2">
+                    ${icon('link', 'text-blue-600')}
+                    <span>Unique Visitors: ${stats.unique_visitors === null ? 'not yet counted' : '~' + stats.unique_visitors}</span>
+                </div>
+                <div class="flex items-center gap-2">
+                    ${icon('clock', 'text-green-600')}
+                    <span>Last Used: ${stats.last_used ? formatDate(stats.last_used) : 'Never'}</span>
+                </div>
+            </div>
+        </div>
+    `;
+}
+
+async function loadLinkStats(shortlink, cell) {
+    // Only load stats if they haven't been loaded yet
+    if (cell.dataset.statsLoaded === 'true') return;
+
+    const tooltip = cell.querySelector('.tooltip');
+    if (!tooltip) return;
+
+    try {
+        let stats = linkStats[shortlink];
+        if (!stats) {
+            const response = await fetch(`/api/links/${shortlink}/stats`);
+            if (!response.ok) throw new Error('Failed to load stats');
+            stats = await response.json();
+        }
+
+        renderLinkStats(tooltip, stats);
+
+        // Mark stats as loaded
+        cell.dataset.statsLoaded = 'true';
+    } catch (error) {
+        tooltip.innerHTML = `
+            <div class="text-sm text-red-600">
+                ${icon('exclamation-circle', 'mr-1')}
+                Failed to load stats
+            </div>
+        `;
+    }
+}
+
+// Timezone handling
+function populateTimezones() {
+    const timezones = Intl.supportedValuesOf('timeZone');
+    const select = document.getElementById('timezoneSelect');
+
+    // Keep the local timezone option as first
+    const localOption = select.querySelector('option[value="local"]');
+    localOption.textContent = `Local Timezone (${Intl.DateTimeFormat().resolvedOptions().timeZone})`;
+
+    // Add other timezones
+    timezones.forEach(timezone => {
+        const option = document.createElement('option');
+        option.value = timezone;
+        option.textContent = timezone;
+        select.appendChild(option);
+    });
+
+    // Load saved timezone preference
+    const savedTimezone = localStorage.getItem('preferredTimezone');
+    if (savedTimezone) {
+        select.value = savedTimezone;
+    }
+}
+
+// Save timezone preference when changed
+document.getElementById('timezoneSelect').addEventListener('change', function() {
+    localStorage.setItem('preferredTimezone', this.value);
+    // Refresh the current view to update timestamps
+    if (document.getElementById('analyticsTable').classList.contains('hidden')) {
+        loadLinks();
+    } else {
+        loadAnalytics();
+    }
+});
+
+populateTimezones();
+
+// Initial load
+loadLinks();
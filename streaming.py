@@ -0,0 +1,58 @@
+import json
+
+from flask import Response, current_app, request, stream_with_context
+
+JSON_MIMETYPE = 'application/json'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Rows fetched from the database at a time while streaming
+STREAM_CHUNK_SIZE = 1000
+
+# Serialized bytes collected before they are handed to the server
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def wants_ndjson():
+    """True if the client prefers newline-delimited JSON over a JSON array."""
+    best = request.accept_mimetypes.best_match([JSON_MIMETYPE, NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def _encode(items, ndjson):
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    buffer = [] if ndjson else ['[']
+    size = 0
+    for index, item in enumerate(items):
+        chunk = dumps(item) + '\n' if ndjson else (',' if index else '') + dumps(item)
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if not ndjson:
+        buffer.append(']')
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_json(items, ndjson=False):
+    """Stream `items` as a JSON array, or as NDJSON, while they are produced.
+
+    `items` is consumed lazily inside the request context, so it can be a
+    generator over a yield_per query: memory stays bounded by one chunk of
+    rows and the first bytes go out before the query has finished. Once
+    streaming has started errors can no longer change the status code; they
+    are logged and the body is cut short, which clients see as invalid JSON.
+    """
+
+    def generate():
+        try:
+            yield from _encode(items, ndjson)
+        except Exception as e:
+            current_app.logger.error(f'Error streaming response: {str(e)}')
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=NDJSON_MIMETYPE if ndjson else JSON_MIMETYPE
+    )
@@ -0,0 +1,246 @@
+import bisect
+import heapq
+import threading
+from collections import Counter
+
+# Most edits between a missed name and a suggested shortlink
+MAX_DISTANCE = 2
+
+# Trigrams shared by more than this fraction of all shortlinks are too
+# common to find candidates with
+COMMON_TRIGRAM_FRACTION = 0.02
+
+# Candidates from the trigram index that are compared by edit distance
+MAX_CANDIDATES = 24
+
+# Shortlinks either side of the name in sorted order that are compared too
+NEIGHBOURS = 6
+
+# Names up to this long are looked up in the deletion index, which finds
+# every shortlink one edit away; few trigrams survive a typo in them
+SHORT_NAME = 5
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def deletions(text):
+    """The text and every string one deletion away from it.
+
+    Two strings are at most one edit apart (including a swap of adjacent
+    characters) only if these sets overlap.
+    """
+    return {text} | {text[:i] + text[i + 1:] for i in range(len(text))}
+
+
+def edit_distance(a, b, limit):
+    """Edit distance of a and b, or limit + 1 once it exceeds limit.
+
+    Swapping two adjacent characters counts as one edit, since that is one
+    of the most common typos. Only cells within `limit` of the diagonal are
+    computed.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        low = max(1, i - limit)
+        high = min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        if low == 1:
+            current[0] = i
+        best = current[low - 1]
+        for j in range(low, high + 1):
+            cb = b[j - 1]
+            cost = previous[j - 1] if ca == cb else previous[j - 1] + 1
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if before and j > 1 and ca == b[j - 2] and a[i - 2] == cb and before[j - 2] + 1 < cost:
+                cost = before[j - 2] + 1
+            current[j] = cost
+            if cost < best:
+                best = cost
+        if best > limit:
+            return over
+        before, previous = previous, current
+    return min(previous[-1], over)
+
+
+class _Index:
+    def __init__(self, shortlinks):
+        self.names = []
+        self.ids = {}
+        self.postings = {}
+        # deletions() of every shortlink a short name could be one edit
+        # from, mapped to a link id, or to a set of them when several share it
+        self.short = {}
+        self.sorted = []
+        for shortlink in shortlinks:
+            self.add(shortlink, keep_sorted=False)
+        self.sorted.sort()
+
+    def add(self, shortlink, keep_sorted=True):
+        if shortlink in self.ids:
+            return
+        key = shortlink.lower()
+        self.ids[shortlink] = len(self.names)
+        self.names.append(shortlink)
+        for gram in trigrams(key):
+            self.postings.setdefault(gram, set()).add(self.ids[shortlink])
+        if len(key) <= SHORT_NAME + 1:
+            link_id = self.ids[shortlink]
+            for variant in deletions(key):
+                ids = self.short.get(variant)
+                if ids is None:
+                    self.short[variant] = link_id
+                elif isinstance(ids, int):
+                    self.short[variant] = {ids, link_id}
+                else:
+                    ids.add(link_id)
+        if keep_sorted:
+            bisect.insort(self.sorted, (key, shortlink))
+        else:
+            self.sorted.append((key, shortlink))
+
+    def remove(self, shortlink):
+        link_id = self.ids.pop(shortlink, None)
+        if link_id is None:
+            return
+        key = shortlink.lower()
+        self.names[link_id] = None
+        for gram in trigrams(key):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(link_id)
+        if len(key) <= SHORT_NAME + 1:
+            for variant in deletions(key):
+                ids = self.short.get(variant)
+                if ids == link_id:
+                    del self.short[variant]
+                elif isinstance(ids, set):
+                    ids.discard(link_id)
+        index = bisect.bisect_left(self.sorted, (key, shortlink))
+        if index < len(self.sorted) and self.sorted[index] == (key, shortlink):
+            del self.sorted[index]
+
+
+class SuggestionIndex:
+    """Finds existing shortlinks close to a missed one.
+
+    Shortlinks that start with the missed name come first, then the ones
+    with the smallest edit distance. Candidates for the edit distance are
+    picked from a trigram index instead of scanning every link, so a lookup
+    stays well under a millisecond with 100k links. Like ShortlinkTrie the
+    index is loaded lazily from `load`, updated in place by add() and
+    remove(), and rebuilt when `stamp` (a reader of the stamp the writers
+    bump) shows another process changed the links.
+
+    Names of up to SHORT_NAME characters, where transposed or mistyped
+    letters leave few trigrams intact, are also looked up in an index of
+    single deletions, which finds every shortlink one edit away.
+    """
+
+    def __init__(self, load, stamp):
+        self._load = load
+        self._stamp = stamp
+        self._index = None
+        # Bumped by add() and remove(), see ShortlinkTrie
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _current(self):
+        # Checked first, so the first load also marks the version as seen
+        changed = self._stamp.changed()
+        index = self._index
+        if index is None or changed:
+            index = self.reload()
+        return index
+
+    def reload(self):
+        while True:
+            generation = self._generation
+            index = _Index(self._load())
+            with self._lock:
+                if generation == self._generation:
+                    self._index = index
+                    return index
+
+    def add(self, shortlink):
+        with self._lock:
+            self._generation += 1
+            if self._index is not None:
+                self._index.add(shortlink)
+
+    def remove(self, shortlink):
+        with self._lock:
+            self._generation += 1
+            if self._index is not None:
+                self._index.remove(shortlink)
+
+    def suggest(self, name, limit=5):
+        index = self._current()
+        key = name.lower()
+
+        # Existing shortlinks that extend what was typed
+        start = bisect.bisect_left(index.sorted, (key,))
+        completions = []
+        for other_key, shortlink in index.sorted[start:start + limit + 1]:
+            if not other_key.startswith(key):
+                break
+            if other_key != key:
+                completions.append(shortlink)
+
+        # Shortlinks sharing the most of the name's six rarest trigrams,
+        # skipping those so common they say little about similarity. This
+        # finds most close matches of longer names, but isn't exhaustive.
+        common = max(len(index.ids) * COMMON_TRIGRAM_FRACTION, MAX_CANDIDATES)
+        postings = sorted((index.postings.get(gram, ()) for gram in trigrams(key)), key=len)
+        rarest = [posting for posting in postings[:6] if len(posting) <= common] or postings[:1]
+        shared = Counter()
+        for posting in rarest:
+            shared.update(posting)
+        needed = max(1, len(rarest) - 4)
+        candidates = heapq.nlargest(
+            MAX_CANDIDATES,
+            ((count, link_id) for link_id, count in shared.items() if count >= needed)
+        )
+        candidates = {index.names[link_id]: count for count, link_id in candidates}
+
+        # Every shortlink one edit away from a short name
+        if len(key) <= SHORT_NAME:
+            for variant in deletions(key):
+                ids = index.short.get(variant, ())
+                for link_id in (ids,) if isinstance(ids, int) else ids:
+                    candidates.setdefault(index.names[link_id], shared.get(link_id, 0))
+
+        # Typos near the end leave only common trigrams intact, but keep the
+        # name next to the shortlink in sorted order
+        for _, shortlink in index.sorted[max(0, start - NEIGHBOURS):start + NEIGHBOURS]:
+            candidates.setdefault(shortlink, shared.get(index.ids[shortlink], 0))
+
+        max_distance = min(MAX_DISTANCE, max(1, len(key) // 4))
+        ranked = []
+        for shortlink, count in candidates.items():
+            if shortlink is None or abs(len(shortlink) - len(key)) > max_distance:
+                continue
+            other_key = shortlink.lower()
+            distance = edit_distance(key, other_key, max_distance)
+            if distance <= max_distance:
+                # Swapped letters are the likeliest typo of all
+                swapped = distance == 1 and sorted(other_key) == sorted(key)
+                ranked.append((distance, False, not swapped, -count, shortlink))
+
+        # Completions rank with shortlinks one edit away, after them
+        ranked.extend((1, True, True, 0, shortlink) for shortlink in completions)
+        suggestions = []
+        for *_, shortlink in sorted(ranked):
+            if shortlink not in suggestions:
+                suggestions.append(shortlink)
+        return suggestions[:limit]
@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# The app reads its configuration when it is imported
+os.environ['GOLINKS_DIR'] = tempfile.mkdtemp(prefix='golinks-test-')
+for name in ('GOLINKS_DATABASE_URL', 'DATABASE_URL', 'GOLINKS_REPLICA_DATABASE_URL', 'SENTRY_DSN'):
+    os.environ.pop(name, None)
+os.environ['GOLINKS_METRICS'] = '0'
+
+
+@pytest.fixture(scope='session')
+def golinks():
+    """The app module, with a migrated database in a temporary directory."""
+    from flask_migrate import upgrade
+    import app as golinks
+
+    with golinks.app.app_context():
+        upgrade(directory=os.path.join(ROOT_DIR, 'migrations'))
+    yield golinks
+    golinks.usage_writer.stop()
+
+
+@pytest.fixture
+def client(golinks):
+    return golinks.app.test_client()
+
+
+@pytest.fixture
+def create_link(client):
+    """Create a link through the API and return its JSON."""
+    def create(shortlink, destination='https://example.com'):
+        response = client.post('/api/links', json={'shortlink': shortlink, 'destination': destination})
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()
+    return create
@@ -0,0 +1,101 @@
+from datetime import datetime
+
+import pytest
+
+# Clicks on two links in the first days of March 2021, a Monday, when no
+# other test records any
+CLICKS = {
+    'series-a': ['2021-03-01 10:15', '2021-03-01 10:45', '2021-03-01 23:30', '2021-03-02 00:10', '2021-03-03 12:00'],
+    'series-b': ['2021-03-01 11:00', '2021-03-02 09:00'],
+}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def clicks(golinks):
+    golinks.write_usage_events([{
+        'shortlink': shortlink, 'accessed_at': datetime.fromisoformat(accessed_at), 'args': None,
+        'user_agent': 'test', 'ip_address': '10.0.0.1'
+    } for shortlink, times in CLICKS.items() for accessed_at in times])
+
+
+def timeseries(client, **params):
+    response = client.get('/api/analytics/timeseries', query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def top(client, **params):
+    response = client.get('/api/analytics/top', query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return [(link['shortlink'], link['visits']) for link in response.get_json()['links']]
+
+
+def test_daily_series_of_one_link(client):
+    """Every day in the window gets a point, with zero for days without clicks."""
+    series = timeseries(client, shortlink='series-a', bucket='day', **{'from': '2021-03-01', 'to': '2021-03-05'})
+
+    assert [point['visits'] for point in series['points']] == [3, 1, 1, 0]
+    assert series['points'][0]['t'] == '2021-03-01T00:00:00'
+    assert series['total'] == 5
+
+
+def test_daily_series_of_all_links(client):
+    """Without a shortlink the series sums every link."""
+    series = timeseries(client, bucket='day', **{'from': '2021-03-01', 'to': '2021-03-04'})
+
+    assert [point['visits'] for point in series['points']] == [4, 2, 1]
+
+
+def test_hourly_series_widened_to_whole_hours(client):
+    """The window is widened to whole buckets, and offsets are converted to UTC."""
+    series = timeseries(client, bucket='hour', **{'from': '2021-03-01T12:30:00+02:00', 'to': '2021-03-01T11:15:00Z'})
+
+    assert series['from'] == '2021-03-01T10:00:00'
+    assert series['to'] == '2021-03-01T12:00:00'
+    assert [point['visits'] for point in series['points']] == [2, 1]
+
+
+def test_weekly_series(client):
+    """Weeks start on Monday and are summed from the daily rollup."""
+    series = timeseries(client, bucket='week', **{'from': '2021-03-03', 'to': '2021-03-15'})
+
+    assert [(point['t'], point['visits']) for point in series['points']] == [
+        ('2021-03-01T00:00:00', 7), ('2021-03-08T00:00:00', 0)
+    ]
+
+
+@pytest.mark.parametrize('params', [
+    {'bucket': 'month'},
+    {'from': '2021-03-02', 'to': '2021-03-01'},
+    {'from': 'yesterday'},
+    {'bucket': 'hour', 'from': '2019-01-01', 'to': '2021-01-01'},
+])
+def test_timeseries_rejects_bad_window(client, params):
+    """Unknown buckets, empty or unparsable windows and too many points are 400s."""
+    assert client.get('/api/analytics/timeseries', query_string=params).status_code == 400
+
+
+def test_top_links_across_rollups(client):
+    """A window with partial days at both ends adds hourly and daily counts without double counting."""
+    window = {'from': '2021-03-01T10:00', 'to': '2021-03-03T13:00'}
+
+    assert top(client, **window) == [('series-a', 5), ('series-b', 2)]
+    assert top(client, limit=1, **window) == [('series-a', 5)]
+
+
+def test_top_links_partial_days(client):
+    """Hours outside the window are left out, even within a day that is partly in it."""
+    assert top(client, **{'from': '2021-03-01T10:30', 'to': '2021-03-02T05:00'}) == [
+        ('series-a', 4), ('series-b', 1)
+    ]
+
+
+def test_top_links_ties_by_shortlink(client):
+    """Links with the same visits are listed by shortlink."""
+    assert top(client, **{'from': '2021-03-02', 'to': '2021-03-03'}) == [('series-a', 1), ('series-b', 1)]
+
+
+@pytest.mark.parametrize('params', [{'limit': 0}, {'limit': 'ten'}, {'limit': 101}])
+def test_top_links_rejects_bad_limit(client, params):
+    """limit must be a whole number between 1 and MAX_TOP_LINKS."""
+    assert client.get('/api/analytics/top', query_string=params).status_code == 400
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+
+asgi = pytest.importorskip('asgi')
+
+
+async def request(application, path, method='GET'):
+    """Send one HTTP request through an ASGI application; returns (status, headers, body)."""
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'headers': [(b'user-agent', b'pytest')], 'client': ('10.0.0.1', 5000), 'server': ('localhost', 80),
+        'scheme': 'http', 'http_version': '1.1', 'root_path': '',
+    }
+    response = {'body': b''}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = dict(message['headers'])
+        else:
+            response['body'] += message.get('body', b'')
+
+    await application(scope, receive, send)
+    return response['status'], response['headers'], response['body']
+
+
+def call(application, path, method='GET'):
+    return asyncio.run(request(application, path, method))
+
+
+@pytest.fixture
+def application(golinks):
+    application = asgi.GoLinksASGI(golinks.app, db_threads=4)
+    yield application
+    application.executor.shutdown()
+
+
+def test_redirect_from_memory_reads_no_stamp(golinks, application, create_link, monkeypatch):
+    """Once the watcher has found the links current, redirects never touch the stamp on the loop."""
+    create_link('asgi-docs', 'https://docs.example.com')
+    asgi.resolve('asgi-docs/setup')
+    application.links_current = asgi.links_current()
+    assert application.links_current
+
+    def no_io():
+        raise AssertionError('stamp read on the event loop')
+    monkeypatch.setattr(golinks.links_stamp, 'signature', no_io)
+
+    status, headers, _ = call(application, '/asgi-docs/setup')
+
+    assert status == 302
+    assert headers[b'location'] == b'https://docs.example.com/setup'
+
+
+def test_redirect_before_first_check_uses_pool(application, create_link):
+    """Until the links have been checked, redirects are resolved in the thread pool."""
+    create_link('asgi-wiki', 'https://wiki.example.com')
+    assert not application.links_current
+
+    status, headers, _ = call(application, '/asgi-wiki')
+
+    assert status == 302
+    assert headers[b'location'] == b'https://wiki.example.com'
+
+
+def test_watcher_notices_foreign_change(golinks, application, create_link):
+    """A change by another process makes the memory stale until the pool reloads it."""
+    create_link('asgi-stale')
+    asgi.resolve('asgi-stale')
+    assert asgi.links_current()
+
+    golinks.VersionStamp(golinks.links_stamp.path).bump()
+
+    assert not golinks.link_trie.ready()
+    asgi.resolve('asgi-stale')
+    assert asgi.links_current()
+
+
+def test_flask_requests_run_concurrently(golinks, application, monkeypatch):
+    """Slow requests handled by Flask don't wait for each other."""
+    def slow_view():
+        time.sleep(0.3)
+        return 'slow'
+    monkeypatch.setitem(golinks.app.view_functions, 'get_links', slow_view)
+
+    async def both():
+        return await asyncio.gather(request(application, '/api/links'), request(application, '/api/links'))
+    started = time.perf_counter()
+    results = asyncio.run(both())
+
+    assert [status for status, _, _ in results] == [200, 200]
+    assert time.perf_counter() - started < 0.55
+
+
+def test_watcher_marks_links_current(golinks, application, create_link):
+    """The lifespan task checks the stamp in the pool and flags the memory as current."""
+    create_link('asgi-watched')
+    asgi.resolve('asgi-watched')
+
+    async def watch():
+        watcher = asyncio.create_task(application.watch_links())
+        await asyncio.sleep(0.1)
+        watcher.cancel()
+    asyncio.run(watch())
+
+    assert application.links_current
@@ -0,0 +1,22 @@
+def test_import_errors_in_row_order(client, create_link):
+    """Validation errors and conflicts found later in a chunk are reported by row."""
+    create_link('bulk-taken')
+
+    response = client.post('/api/links/bulk', json=[
+        {'shortlink': 'bulk-taken', 'destination': 'example.com'},
+        {'shortlink': 'bulk-new', 'destination': 'example.com'},
+        'not an object',
+        {'shortlink': 'bulk-new', 'destination': 'example.com'},
+        {'shortlink': 'bulk-taken', 'destination': 'example.org'},
+        {'shortlink': 'api/bulk', 'destination': 'example.com'},
+    ])
+
+    report = response.get_json()
+    assert report['created'] == 1
+    assert [(error['row'], error['error']) for error in report['errors']] == [
+        (1, 'Shortlink already exists'),
+        (3, 'Expected a JSON object'),
+        (4, 'Duplicate shortlink in input'),
+        (5, 'Duplicate shortlink in input'),
+        (6, "Shortlinks can't start with 'api', it is used by golinks itself"),
+    ]
@@ -0,0 +1,140 @@
+import importlib.util
+import os
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from db_types import EpochDateTime, PackedIP
+from interning import InternTable
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATION = os.path.join(ROOT_DIR, 'migrations', 'versions', 'e5b8c2d4a913_compact_link_usage.py')
+
+
+@pytest.fixture
+def app_context(golinks):
+    with golinks.app.app_context():
+        yield
+
+
+@pytest.mark.parametrize('value', ['10.1.2.3', '2001:db8::1', '::ffff:10.0.0.1'])
+def test_packed_ip_round_trip(value):
+    """Addresses come back as they went in, from 4 or 16 bytes."""
+    ip = PackedIP()
+
+    packed = ip.process_bind_param(value, None)
+
+    assert len(packed) in (4, 16)
+    assert ip.process_result_value(packed, None) == value
+
+
+def test_packed_ip_rejects_garbage():
+    """Anything that isn't an address is stored as NULL instead of failing the batch."""
+    assert PackedIP().process_bind_param('unknown', None) is None
+    assert PackedIP().process_bind_param(None, None) is None
+
+
+def test_epoch_datetime_round_trip():
+    """Naive UTC datetimes are stored as whole epoch seconds."""
+    epoch = EpochDateTime()
+
+    assert epoch.process_bind_param(datetime(1970, 1, 2), None) == 86400
+    assert epoch.process_result_value(86400, None) == datetime(1970, 1, 2)
+    assert epoch.process_result_value(
+        epoch.process_bind_param(datetime(2024, 5, 1, 12, 30, 15, 999999), None), None
+    ) == datetime(2024, 5, 1, 12, 30, 15)
+
+
+def test_intern_table_reuses_ids(golinks, app_context, monkeypatch):
+    """Each value gets one row; known values are answered without a query."""
+    agents = InternTable(golinks.db, golinks.UserAgent)
+    first = agents.ids({'intern-a', 'intern-b'})
+    golinks.db.session.commit()
+
+    monkeypatch.setattr(golinks.db.session, 'execute', None)
+    again = agents.ids({'intern-a', 'intern-b'})
+
+    assert again == first
+    assert len(set(first.values())) == 2
+    assert agents.value(first['intern-a']) == 'intern-a'
+
+
+def test_intern_table_shares_rows(golinks, app_context):
+    """Two caches interning the same value agree on its id, and None isn't interned."""
+    first = InternTable(golinks.db, golinks.UserAgent).ids({'intern-shared', None})
+    second = InternTable(golinks.db, golinks.UserAgent).ids({'intern-shared'})
+    golinks.db.session.commit()
+
+    assert first == second
+    assert golinks.UserAgent.query.filter_by(value='intern-shared').count() == 1
+
+
+def test_clicks_stored_compactly(golinks, client, create_link):
+    """A redirect stores the interned user agent, the packed IP and an epoch time."""
+    create_link('compact-click')
+
+    client.get('/compact-click', headers={'User-Agent': 'compact-agent/1.0'},
+               environ_base={'REMOTE_ADDR': '2001:db8::7'})
+    golinks.usage_writer.join()
+
+    with golinks.app.app_context():
+        raw = golinks.db.session.execute(sa.text(
+            'SELECT accessed_at, ip_address, user_agent_id FROM link_usage WHERE shortlink = :shortlink'
+        ), {'shortlink': 'compact-click'}).one()
+        assert isinstance(raw.accessed_at, int)
+        assert len(raw.ip_address) == 16
+        assert golinks.db.session.get(golinks.UserAgent, raw.user_agent_id).value == 'compact-agent/1.0'
+
+
+def run_migration(engine, step):
+    spec = importlib.util.spec_from_file_location('compact_link_usage', MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with engine.begin() as conn, Operations.context(MigrationContext.configure(conn)):
+        getattr(migration, step)()
+
+
+def test_migration_converts_rows(tmp_path):
+    """Upgrading rewrites old rows compactly, and downgrading restores them."""
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'usage.db'}")
+    wide = [
+        (1, 'docs', '2024-05-01 12:00:00.000000', None, 'agent/1', '10.0.0.1'),
+        (2, 'docs', '2024-05-01 13:00:00.000000', 'q', 'agent/1', '2001:db8::1'),
+        (3, 'wiki', '2024-05-02 09:30:00.000000', None, 'agent/2', 'not an ip'),
+        (4, 'wiki', None, None, None, None),
+    ]
+    with engine.begin() as conn:
+        conn.execute(sa.text(
+            'CREATE TABLE link_usage (id INTEGER PRIMARY KEY, shortlink VARCHAR(255) NOT NULL, '
+            'accessed_at DATETIME, args VARCHAR(1024), user_agent VARCHAR(1024), ip_address VARCHAR(45))'
+        ))
+        conn.execute(sa.text('CREATE INDEX ix_link_usage_shortlink ON link_usage (shortlink)'))
+        conn.execute(sa.text('INSERT INTO link_usage VALUES (:0, :1, :2, :3, :4, :5)'), [
+            {str(i): value for i, value in enumerate(row)} for row in wide
+        ])
+
+    run_migration(engine, 'upgrade')
+
+    with engine.connect() as conn:
+        agents = dict(conn.execute(sa.text('SELECT value, id FROM user_agents')).all())
+        compact = conn.execute(sa.text(
+            'SELECT id, accessed_at, user_agent_id, ip_address FROM link_usage ORDER BY id'
+        )).all()
+    assert sorted(agents) == ['agent/1', 'agent/2']
+    assert [tuple(row) for row in compact] == [
+        (1, 1714564800, agents['agent/1'], bytes([10, 0, 0, 1])),
+        (2, 1714568400, agents['agent/1'], bytes.fromhex('20010db8000000000000000000000001')),
+        (3, 1714642200, agents['agent/2'], None),
+        (4, None, None, None),
+    ]
+
+    run_migration(engine, 'downgrade')
+
+    with engine.connect() as conn:
+        restored = conn.execute(sa.text('SELECT * FROM link_usage ORDER BY id')).all()
+    assert [tuple(row) for row in restored] == [
+        wide[0], wide[1], wide[2][:5] + (None,), wide[3]
+    ]
@@ -0,0 +1,102 @@
+import gzip
+import json
+import re
+import zlib
+
+import pytest
+
+import compression
+from assets import IMMUTABLE
+
+
+def asset_urls(html):
+    """The /static URLs the page links to, with their ?v= hashes."""
+    return re.findall(r'(/static/[^"#]+\?v=[0-9a-f]+)', html)
+
+
+def test_dashboard_assets_are_versioned(client):
+    """The dashboard's scripts, styles and icons are separate files with content hashes."""
+    html = client.get('/').get_data(as_text=True)
+
+    urls = set(asset_urls(html))
+    paths = {url.split('?')[0] for url in urls}
+    assert {'/static/js/index.js', '/static/css/index.css', '/static/icons.svg'} <= paths
+    assert '<script>' not in html and '<style>' not in html
+
+
+def test_versioned_asset_is_immutable(client):
+    """Assets requested with their current hash can be cached forever, others can't."""
+    url = next(url for url in asset_urls(client.get('/').get_data(as_text=True)) if 'index.js' in url)
+
+    assert client.get(url).headers['Cache-Control'] == IMMUTABLE
+    assert client.get('/static/js/index.js?v=0000').headers.get('Cache-Control') != IMMUTABLE
+    assert client.get('/static/js/index.js').headers.get('Cache-Control') != IMMUTABLE
+
+
+def test_gzip_dashboard(client):
+    """The dashboard is gzipped for clients that accept it, with a weak ETag."""
+    plain = client.get('/')
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == plain.data
+    assert len(response.data) < len(plain.data)
+    assert response.headers['ETag'].startswith('W/')
+
+
+def test_gzip_static_asset(client):
+    """Static files, sent from disk, are compressed too."""
+    plain = client.get('/static/css/index.css')
+    response = client.get('/static/css/index.css', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_brotli_preferred(client):
+    """Brotli is used when the client accepts it, if it is installed."""
+    expected = 'br' if compression.brotli is not None else 'gzip'
+
+    response = client.get('/', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == expected
+
+
+def test_brotli_round_trip(client):
+    """Brotli responses decode to the uncompressed page."""
+    brotli = pytest.importorskip('brotli')
+    plain = client.get('/')
+
+    response = client.get('/', headers={'Accept-Encoding': 'br'})
+
+    assert brotli.decompress(response.data) == plain.data
+
+
+def test_small_responses_not_compressed(client):
+    """Responses under GOLINKS_COMPRESSION_MIN_SIZE aren't worth compressing."""
+    response = client.get('/api/links/compression-tiny/stats', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_streamed_response_gzipped(client, create_link):
+    """Streamed responses are gzipped chunk by chunk into one valid stream."""
+    create_link('compression-streamed')
+
+    response = client.get('/api/links', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.is_streamed
+    assert response.headers['Content-Encoding'] == 'gzip'
+    links = json.loads(gzip.decompress(response.data))
+    assert 'compression-streamed' in [link['shortlink'] for link in links]
+
+
+def test_gzip_stream_flushes_every_chunk():
+    """Each chunk can be decoded as soon as it arrives, so slow streams don't stall."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    stream = compression.gzip_stream(iter(['first', 'second']), 6)
+
+    assert decompressor.decompress(next(stream)) == b'first'
+    assert decompressor.decompress(next(stream)) == b'second'
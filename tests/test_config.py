@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+import pytest
+import sqlalchemy as sa
+
+from config import sqlite_read_only_url
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_sqlite_replica_reads_the_configured_file(tmp_path):
+    """The read-only replica URL opens the database the primary URL names."""
+    url = f'sqlite:///{tmp_path}/custom golinks.db'
+    with sa.create_engine(url).begin() as conn:
+        conn.exec_driver_sql('CREATE TABLE golinks (shortlink TEXT)')
+        conn.exec_driver_sql("INSERT INTO golinks VALUES ('docs')")
+
+    replica = sa.create_engine(sqlite_read_only_url(url))
+    with replica.connect() as conn:
+        assert conn.exec_driver_sql('SELECT shortlink FROM golinks').scalar() == 'docs'
+        with pytest.raises(sa.exc.OperationalError, match='readonly'):
+            conn.exec_driver_sql("INSERT INTO golinks VALUES ('wiki')")
+
+
+def test_in_memory_sqlite_has_no_replica():
+    """An in-memory database can't be opened a second time, so it gets no replica."""
+    assert sqlite_read_only_url('sqlite://') is None
+
+
+def test_app_starts_on_in_memory_sqlite(tmp_path):
+    """sqlite:// gets no QueuePool sizes, which its StaticPool would reject."""
+    env = dict(os.environ, GOLINKS_DIR=str(tmp_path), GOLINKS_DATABASE_URL='sqlite://')
+    result = subprocess.run(
+        [sys.executable, '-c', 'import app; app.usage_writer.stop()'],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,36 @@
+from werkzeug.datastructures import MultiDict
+
+from destinations import DestinationTemplate
+
+
+def expand(destination, query='', path='', **params):
+    template = DestinationTemplate.loads(DestinationTemplate.compile(destination).dumps())
+    return template.expand(query, path, MultiDict(params))
+
+
+def test_literal_braces_stay_literal():
+    """Braces that aren't a placeholder, like {page}, are kept in the redirect."""
+    assert expand('https://wiki.example.com/{page}') == 'https://wiki.example.com/{page}'
+    assert expand('https://wiki.example.com/{page}', query='x') == 'https://wiki.example.com/{page}?q=x'
+    assert expand('https://docs.example.com/users/{id}/{?id}', id='7') == 'https://docs.example.com/users/{id}/7'
+
+
+def test_named_arguments_need_question_mark():
+    """{?name} is filled from the query argument of that name."""
+    assert expand('https://github.com/org/repo?tab={?tab:code}', tab='issues') == 'https://github.com/org/repo?tab=issues'
+    assert expand('https://github.com/org/repo?tab={?tab:code}') == 'https://github.com/org/repo?tab=code'
+
+
+def test_query_and_positional_placeholders():
+    """{query} and {1}, {2}, ... are filled from ?q= or the rest of the path."""
+    assert expand('https://google.com/search?q={query}', query='a b') == 'https://google.com/search?q=a+b'
+    assert expand('https://jira.example.com/browse/{1:PROJ}', path='ABC-1') == 'https://jira.example.com/browse/ABC-1'
+    assert expand('https://jira.example.com/browse/{1:PROJ}') == 'https://jira.example.com/browse/PROJ'
+
+
+def test_literal_brace_redirect(client, create_link):
+    """A saved destination with literal braces redirects unchanged."""
+    create_link('brace-wiki', 'https://wiki.example.com/{page}')
+    response = client.get('/brace-wiki')
+    assert response.status_code == 302
+    assert response.headers['Location'] == 'https://wiki.example.com/{page}'
@@ -0,0 +1,50 @@
+import pytest
+
+from hll import SPARSE_LIMIT, STANDARD_ERROR, HyperLogLog
+
+
+def sketch_of(values):
+    sketch = HyperLogLog()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+@pytest.mark.parametrize('n', [100, 1000, 5000, 20000])
+def test_estimate_within_standard_error(n):
+    """Estimates are unbiased and spread by about the documented standard error,
+    including around 5000, where the classic estimator switched to linear counting."""
+    errors = [sketch_of(f'{trial}-{i}' for i in range(n)).count() / n - 1 for trial in range(20)]
+
+    bias = sum(errors) / len(errors)
+    spread = (sum(error * error for error in errors) / len(errors)) ** 0.5
+    assert abs(bias) < STANDARD_ERROR / 2
+    assert spread < 1.2 * STANDARD_ERROR
+    assert max(abs(error) for error in errors) < 4 * STANDARD_ERROR
+
+
+def test_small_counts_exact():
+    """A handful of visitors is counted exactly."""
+    assert sketch_of([]).count() == 0
+    assert sketch_of(['a', 'a', 'b', 'c']).count() == 3
+
+
+def test_merge_equals_union():
+    """Merging two sketches gives the sketch of the union of their values."""
+    left = sketch_of(f'v{i}' for i in range(3000))
+    right = sketch_of(f'v{i}' for i in range(2000, 6000))
+
+    merged = HyperLogLog.loads(left.dumps()).merge(right)
+
+    assert merged.dumps() == sketch_of(f'v{i}' for i in range(6000)).dumps()
+
+
+@pytest.mark.parametrize('n', [10, 10 * SPARSE_LIMIT])
+def test_dumps_round_trip(n):
+    """Sparse and dense sketches survive serialization unchanged."""
+    sketch = sketch_of(str(i) for i in range(n))
+
+    loaded = HyperLogLog.loads(sketch.dumps())
+
+    assert loaded.count() == sketch.count()
+    assert isinstance(loaded.registers, dict) == (n == 10)
@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def recorded_queries():
+    """Collect the SQL run on any engine, the replica's included, while the block runs."""
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+
+
+def test_matching_etag_is_not_modified(client, create_link):
+    """A request whose If-None-Match still matches gets a 304 without touching the database."""
+    create_link('etag-unchanged')
+    first = client.get('/api/links?limit=5')
+    etag = first.headers['ETag']
+
+    with recorded_queries() as statements:
+        second = client.get('/api/links?limit=5', headers={'If-None-Match': etag})
+
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+    assert second.headers['Cache-Control'] == 'no-cache'
+    assert statements == []
+
+
+def test_weak_etag_matches(client):
+    """Compression marks the ETag weak, and a weak If-None-Match still matches."""
+    etag = client.get('/api/links?limit=5').headers['ETag'].strip('"')
+
+    response = client.get('/api/links?limit=5', headers={'If-None-Match': f'W/"{etag}"'})
+
+    assert response.status_code == 304
+
+
+def test_link_write_changes_etag(client, create_link):
+    """Creating a link changes the ETag, so the stale copy is sent again in full."""
+    etag = client.get('/api/links?limit=5').headers['ETag']
+
+    create_link('etag-changed')
+    response = client.get('/api/links?limit=5', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()[0]['shortlink'] == 'etag-changed'
+
+
+def test_usage_changes_stats_etag(golinks, client, create_link):
+    """A click on the link changes the ETag of its stats."""
+    create_link('etag-stats')
+    etag = client.get('/api/links/etag-stats/stats').headers['ETag']
+
+    client.get('/etag-stats')
+    golinks.usage_writer.join()
+    response = client.get('/api/links/etag-stats/stats', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.get_json()['visits'] == 1
+
+
+def test_etag_depends_on_url_and_accept(client):
+    """Different pages and representations never share an ETag."""
+    etags = {
+        client.get('/api/links?limit=5').headers['ETag'],
+        client.get('/api/links?limit=6').headers['ETag'],
+        client.get('/api/links?limit=5', headers={'Accept': 'application/x-ndjson'}).headers['ETag'],
+    }
+
+    assert len(etags) == 3
+
+
+def test_errors_have_no_etag(client):
+    """Only successful responses are cacheable."""
+    response = client.get('/api/links?limit=0')
+
+    assert response.status_code == 400
+    assert 'ETag' not in response.headers
+
+
+@pytest.mark.parametrize('max_age, cache_control', [(0, None), (300, 'private, max-age=300')])
+def test_redirect_cache_control(golinks, client, create_link, monkeypatch, max_age, cache_control):
+    """Redirects are only cacheable by the browser when GOLINKS_REDIRECT_CACHE_MAX_AGE is set."""
+    create_link(f'etag-redirect-{max_age}')
+    monkeypatch.setitem(golinks.app.config, 'REDIRECT_CACHE_MAX_AGE', max_age)
+
+    response = client.get(f'/etag-redirect-{max_age}')
+
+    assert response.status_code == 302
+    assert response.headers.get('Cache-Control') == cache_control
@@ -0,0 +1,48 @@
+from link_cache import MISSING, LinkCache, VersionStamp
+
+
+def test_invalidate_keeps_unrelated_entries(tmp_path):
+    """A write in this process only drops the keys it changed."""
+    stamp = VersionStamp(str(tmp_path / 'links.version'))
+    cache = LinkCache(10, stamp)
+    cache.put('a', 'https://a.example', cache.generation)
+    cache.put('b', 'https://b.example', cache.generation)
+
+    cache.invalidate('a')
+
+    assert cache.get('a') is MISSING
+    assert cache.get('b') == 'https://b.example'
+
+
+def test_foreign_bump_clears_cache(tmp_path):
+    """A bump by another process drops everything cached here."""
+    path = str(tmp_path / 'links.version')
+    cache = LinkCache(10, VersionStamp(path))
+    cache.put('b', 'https://b.example', cache.generation)
+
+    VersionStamp(path).bump()
+
+    assert cache.get('b') is MISSING
+
+
+def test_missed_bump_still_clears_after_own_bump(tmp_path):
+    """An own bump doesn't hide a foreign one that came before it."""
+    path = str(tmp_path / 'links.version')
+    cache = LinkCache(10, VersionStamp(path))
+    cache.put('b', 'https://b.example', cache.generation)
+
+    VersionStamp(path).bump()
+    cache.invalidate('a')
+
+    assert cache.get('b') is MISSING
+
+
+def test_write_keeps_unrelated_links_cached(golinks, client, create_link):
+    """Creating a link leaves the other cached destinations in place."""
+    create_link('cache-a', 'https://a.example')
+    assert client.get('/cache-a').status_code == 302
+    assert golinks.link_cache.get('cache-a') is not MISSING
+
+    create_link('cache-b')
+
+    assert golinks.link_cache.get('cache-a') is not MISSING
@@ -0,0 +1,86 @@
+import pytest
+
+
+def count_loads(monkeypatch, index):
+    """Count how often `index` loads every shortlink from the database."""
+    loads = []
+    load = index._load
+
+    def counting_load():
+        loads.append(1)
+        return load()
+
+    monkeypatch.setattr(index, '_load', counting_load)
+    return loads
+
+
+def test_own_writes_do_not_reload_trie(golinks, client, create_link, monkeypatch):
+    """Creating, renaming and deleting links updates the trie in place."""
+    create_link('trie-a')
+    assert client.get('/trie-a').status_code == 302
+    loads = count_loads(monkeypatch, golinks.link_trie)
+
+    link = create_link('trie-b')
+    assert client.get('/trie-b/page').status_code == 302
+    client.put(f"/api/links/{link['id']}", json={'shortlink': 'trie-c', 'destination': 'example.com'})
+    assert client.get('/trie-c').status_code == 302
+    assert client.delete('/api/links/trie-c').status_code == 204
+    assert client.get('/trie-a').status_code == 302
+
+    assert loads == []
+
+
+def test_foreign_write_reloads_trie(golinks, client, create_link, monkeypatch):
+    """A bump by another process makes the next lookup reload the trie."""
+    create_link('trie-d')
+    assert client.get('/trie-d').status_code == 302
+    loads = count_loads(monkeypatch, golinks.link_trie)
+
+    # Another process writing the stamp file, bypassing this process's stamp
+    other = type(golinks.links_stamp)(golinks.links_stamp.path)
+    other.bump()
+    assert client.get('/trie-d').status_code == 302
+
+    assert loads == [1]
+
+
+def test_reload_racing_with_add_keeps_new_link():
+    """A reload that read the links before an add() is redone."""
+    from link_trie import ShortlinkTrie
+
+    class Stamp:
+        def changed(self):
+            return False
+
+    links = ['a']
+
+    def load():
+        # A write lands while the reload is reading
+        if trie._generation == 0:
+            links.append('b')
+            trie.add('b')
+        return list(links)
+
+    trie = ShortlinkTrie(load, Stamp())
+    assert trie.longest_prefix('b/x') == ('b', 'x')
+
+
+@pytest.mark.parametrize('shortlink', ['api', 'api/links', 'static/app', 'team/stats'])
+def test_reserved_first_segments_rejected(client, shortlink):
+    """Shortlinks that the app's own routes would shadow are refused."""
+    response = client.post('/api/links', json={'shortlink': shortlink, 'destination': 'example.com'})
+    assert response.status_code == 400
+    assert 'golinks itself' in response.get_json()['error']
+
+
+def test_first_load_marks_stamp_seen(golinks, client, create_link, monkeypatch):
+    """The first load catches up with the stamp, so the next own write doesn't reload."""
+    create_link('trie-e')
+    golinks.link_trie._root = None
+    assert client.get('/trie-e').status_code == 302
+    loads = count_loads(monkeypatch, golinks.link_trie)
+
+    create_link('trie-f')
+    assert client.get('/trie-f').status_code == 302
+
+    assert loads == []
@@ -0,0 +1,16 @@
+def test_metrics_name_is_free_for_a_shortlink(client, create_link):
+    """The metrics endpoint lives under /api, so go/metrics can be a link."""
+    create_link('metrics', 'https://grafana.example/d/golinks')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 302
+    assert response.headers['Location'] == 'https://grafana.example/d/golinks'
+
+
+def test_disabled_metrics_not_found(client):
+    """With GOLINKS_METRICS=0 the endpoint answers 404 rather than an empty page."""
+    response = client.get('/api/metrics')
+
+    assert response.status_code == 404
+    assert response.get_json() == {'error': 'Not found'}
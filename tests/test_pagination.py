@@ -0,0 +1,53 @@
+def page_through(client, limit, insert_between=None, **params):
+    """Shortlinks of every page of GET /api/links, following X-Next-Cursor."""
+    seen, cursor = [], None
+    while True:
+        query = dict(params, limit=limit, **({'cursor': cursor} if cursor else {}))
+        response = client.get('/api/links', query_string=query)
+        assert response.status_code == 200, response.get_json()
+        seen += [link['shortlink'] for link in response.get_json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            return seen
+        if insert_between:
+            insert_between()
+            insert_between = None
+
+
+def test_pages_cover_every_link_once(client, create_link):
+    """Following the cursors returns each link once, newest first."""
+    created = [create_link(f'page-{i}')['shortlink'] for i in range(5)]
+
+    seen = page_through(client, 2)
+
+    assert len(seen) == len(set(seen))
+    assert [shortlink for shortlink in seen if shortlink in created] == created[::-1]
+
+
+def test_cursor_is_stable_across_inserts(client, create_link):
+    """Links created while paging don't shift later pages or repeat earlier ones."""
+    created = [create_link(f'stable-{i}')['shortlink'] for i in range(5)]
+    before = page_through(client, 2)
+
+    seen = page_through(client, 2, insert_between=lambda: create_link('stable-late'))
+
+    assert seen == before
+    assert 'stable-late' not in seen
+    assert set(created) <= set(seen)
+
+
+def test_fields_and_total(client, create_link):
+    """fields limits the keys of each link, and X-Total-Count counts all of them."""
+    create_link('fields-only')
+
+    response = client.get('/api/links', query_string={'fields': 'shortlink', 'limit': 1})
+
+    assert response.get_json() == [{'shortlink': 'fields-only'}]
+    assert int(response.headers['X-Total-Count']) >= 1
+
+
+def test_bad_parameters(client):
+    """Unknown fields, out of range limits and garbled cursors are 400s."""
+    assert client.get('/api/links?fields=password').status_code == 400
+    assert client.get('/api/links?limit=0').status_code == 400
+    assert client.get('/api/links?limit=1&cursor=not-a-cursor').status_code == 400
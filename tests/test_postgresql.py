@@ -0,0 +1,114 @@
+"""The PostgreSQL statements, compiled without a server to run them on."""
+from contextlib import contextmanager
+
+import pytest
+from flask import Flask
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from config import Config
+from link_cache import ClockVersionStamp, DatabaseVersionStamp
+from rollups import upsert_counts
+from search import LinkSearch
+
+DIALECT = postgresql.dialect()
+
+
+def compiled(stmt):
+    return ' '.join(str(stmt.compile(dialect=DIALECT)).split())
+
+
+class RecordingConnection:
+    """Stands in for a session or connection, keeping what it was asked to run."""
+
+    dialect = DIALECT
+
+    def __init__(self, result=None):
+        self.statements = []
+        self.result = result
+
+    def get_bind(self):
+        return self
+
+    def execute(self, stmt, *args):
+        self.statements.append(stmt)
+        return self
+
+    def scalar(self):
+        return self.result
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+
+def test_upsert_counts_on_conflict(golinks):
+    """Rollup counts are added to the existing row with ON CONFLICT DO UPDATE."""
+    session = RecordingConnection()
+    table = golinks.LinkUsageHourly.__table__
+
+    upsert_counts(session, table, [{'shortlink': 'a', 'bucket': None, 'visits': 1}], ['shortlink', 'bucket'])
+
+    sql = compiled(session.statements[0])
+    assert 'ON CONFLICT (shortlink, bucket) DO UPDATE' in sql
+    assert 'visits = (link_usage_hourly.visits + excluded.visits)' in sql
+
+
+def test_upsert_last_used_coalesce(golinks):
+    """A NULL last_used is replaced on PostgreSQL too."""
+    session = RecordingConnection()
+    table = golinks.LinkUsageTotal.__table__
+
+    upsert_counts(session, table, [{'shortlink': 'a', 'visits': 1, 'last_used': None}], ['shortlink'])
+
+    sql = compiled(session.statements[0])
+    assert 'last_used = coalesce(CASE WHEN (excluded.last_used > link_usage_totals.last_used)' in sql
+
+
+def test_trigram_search(golinks, monkeypatch):
+    """Search ranks substring matches by pg_trgm similarity, shortlink first."""
+    search = LinkSearch()
+    monkeypatch.setattr(search, 'trigram_available', lambda engine: True)
+    model = golinks.GoLink
+
+    query, ranked = search.apply(select(model), RecordingConnection(), model, 'wiki')
+
+    sql = compiled(query)
+    assert ranked
+    assert 'golinks.shortlink ILIKE' in sql
+    assert 'ORDER BY similarity(golinks.shortlink, %(similarity_1)s) * %(similarity_2)s' in sql
+    assert sql.endswith('DESC, golinks.id DESC')
+
+
+def test_database_stamp_bump():
+    """Link changes bump the data_versions row and read the new version back."""
+    conn = RecordingConnection(result=5)
+    stamp = DatabaseVersionStamp(conn, 'links')
+
+    stamp.bump()
+
+    sql = compiled(conn.statements[0])
+    assert sql.startswith('UPDATE data_versions SET version=(data_versions.version + %(version_1)s)')
+    assert sql.endswith('RETURNING data_versions.version')
+    assert stamp.signature() == 5
+
+
+def test_clock_stamp_bump():
+    """The usage stamp moves on its own bumps without a data_versions row."""
+    stamp = ClockVersionStamp(interval=3600)
+    before = stamp.signature()
+
+    stamp.bump()
+
+    assert stamp.signature() != before
+    assert not stamp.changed()
+
+
+@pytest.mark.parametrize('url', ['mysql://golinks@db/golinks', 'mssql+pyodbc://golinks@db/golinks'])
+def test_unsupported_database(url):
+    """Backends the rollups can't upsert into are refused at startup."""
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=url, SQLALCHEMY_BINDS={})
+
+    with pytest.raises(ValueError, match='Unsupported database'):
+        Config.init_app(app)
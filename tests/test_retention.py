@@ -0,0 +1,73 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from retention import UsageRetention
+
+
+@pytest.fixture
+def app_context(golinks):
+    with golinks.app.app_context():
+        yield
+
+
+def add_clicks(golinks, shortlink, *times):
+    """Insert raw clicks without going through the usage writer or the rollups."""
+    golinks.db.session.execute(golinks.db.insert(golinks.LinkUsage), [
+        {'shortlink': shortlink, 'accessed_at': accessed_at} for accessed_at in times
+    ])
+    golinks.db.session.commit()
+
+
+def daily_visits(golinks, shortlink):
+    """{day: visits} of one shortlink's daily rollup."""
+    return dict(golinks.db.session.query(golinks.LinkUsageDaily.bucket, golinks.LinkUsageDaily.visits).filter(
+        golinks.LinkUsageDaily.shortlink == shortlink
+    ))
+
+
+def test_rerun_after_interrupted_prune_archives_each_row_once(golinks, app_context, tmp_path, monkeypatch):
+    """Rows archived by an interrupted pass aren't written to the archive again."""
+    day = datetime(2019, 6, 1)
+    add_clicks(golinks, 'pruned', *(day + timedelta(minutes=i) for i in range(5)))
+    retention = UsageRetention(
+        golinks.db, golinks.LinkUsage, str(tmp_path), batch_size=2, serialize=golinks.archived_usage
+    )
+
+    commit = golinks.db.session.commit
+    commits = []
+    def interrupted_commit():
+        if commits:
+            raise RuntimeError('interrupted')
+        commits.append(True)
+        commit()
+    monkeypatch.setattr(golinks.db.session, 'commit', interrupted_commit)
+    with pytest.raises(RuntimeError):
+        retention.prune_day(day, day + timedelta(days=1))
+    monkeypatch.undo()
+    golinks.db.session.rollback()
+
+    assert retention.prune_day(day, day + timedelta(days=1)) == 3
+
+    with gzip.open(retention.archive_path(day), 'rt', encoding='utf-8') as f:
+        ids = [json.loads(line)['id'] for line in f]
+    assert len(ids) == len(set(ids)) == 5
+
+
+def test_rebuild_keeps_counts_of_partially_pruned_day(golinks, app_context):
+    """Rebuilding never lowers the counts of the oldest day, which retention may have cut short."""
+    first, second = datetime(2020, 1, 1), datetime(2020, 1, 2)
+    add_clicks(golinks, 'rebuilt', first, first + timedelta(hours=1), first + timedelta(hours=2), second)
+
+    golinks.rebuild_rollups()
+    golinks.db.session.query(golinks.LinkUsage).filter(
+        golinks.LinkUsage.shortlink == 'rebuilt', golinks.LinkUsage.accessed_at < first + timedelta(hours=2)
+    ).delete()
+    golinks.db.session.commit()
+
+    golinks.rebuild_rollups()
+
+    assert daily_visits(golinks, 'rebuilt') == {first: 3, second: 1}
+    assert golinks.db.session.get(golinks.LinkUsageTotal, 'rebuilt').visits == 4
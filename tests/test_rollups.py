@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+from hll import HyperLogLog
+from rollups import merge_sketches, upsert_counts
+
+
+@pytest.fixture
+def totals(golinks):
+    with golinks.app.app_context():
+        yield golinks.LinkUsageTotal
+
+
+def upsert_total(golinks, shortlink, last_used):
+    """Upsert one visit to a shortlink's total and return the stored row."""
+    upsert_counts(
+        golinks.db.session, golinks.LinkUsageTotal.__table__,
+        [{'shortlink': shortlink, 'visits': 1, 'last_used': last_used}], ['shortlink']
+    )
+    golinks.db.session.commit()
+    return golinks.db.session.get(golinks.LinkUsageTotal, shortlink, populate_existing=True)
+
+
+def test_last_used_replaces_null(golinks, totals):
+    """A total whose last_used is NULL takes the upserted time."""
+    golinks.db.session.add(totals(shortlink='never-used', visits=3, last_used=None))
+    golinks.db.session.commit()
+
+    total = upsert_total(golinks, 'never-used', datetime(2024, 5, 1))
+
+    assert (total.visits, total.last_used) == (4, datetime(2024, 5, 1))
+
+
+def test_last_used_keeps_later_time(golinks, totals):
+    """An upsert never moves last_used back, or to NULL."""
+    upsert_total(golinks, 'used', datetime(2024, 5, 2))
+
+    assert upsert_total(golinks, 'used', datetime(2024, 5, 1)).last_used == datetime(2024, 5, 2)
+    assert upsert_total(golinks, 'used', None).last_used == datetime(2024, 5, 2)
+
+
+class RecordingSession:
+    """Keeps the parameters of every statement, answering SELECTs with `stored`."""
+
+    def __init__(self, stored=()):
+        self.stored = stored
+        self.params = []
+        self.bind = sa.create_engine('sqlite://')
+
+    def get_bind(self):
+        return self.bind
+
+    def execute(self, stmt, params=None):
+        if params is None:
+            return self.stored
+        self.params.append(params)
+
+
+def test_upsert_counts_in_key_order(golinks):
+    """Rows are upserted in key order, so concurrent flushes lock rows in the same order."""
+    session = RecordingSession()
+    table = golinks.LinkUsageHourly.__table__
+    rows = [
+        {'shortlink': 'b', 'bucket': datetime(2024, 5, 1), 'visits': 1},
+        {'shortlink': 'a', 'bucket': datetime(2024, 5, 2), 'visits': 1},
+        {'shortlink': 'a', 'bucket': datetime(2024, 5, 1), 'visits': 1},
+    ]
+
+    upsert_counts(session, table, rows, ['shortlink', 'bucket'])
+
+    assert [(row['shortlink'], row['bucket'].day) for row in session.params[0]] == [('a', 1), ('a', 2), ('b', 1)]
+
+
+def test_merge_sketches_in_key_order(golinks):
+    """Sketches are written back in key order too, whatever order the SELECT returned."""
+    session = RecordingSession(stored=[('b', None, 0), ('c', None, 0), ('a', None, 0)])
+    sketches = {(shortlink,): HyperLogLog() for shortlink in 'cab'}
+
+    merge_sketches(session, golinks.LinkUsageTotal.__table__, sketches, ['shortlink'])
+
+    assert [row['key_shortlink'] for row in session.params[0]] == ['a', 'b', 'c']
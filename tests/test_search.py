@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import text
+
+from search import FTS_TABLE, match_expression
+
+
+@pytest.fixture(autouse=True)
+def fts_required(golinks):
+    with golinks.app.app_context():
+        if not golinks.link_search.fts_available(golinks.db.engine):
+            pytest.skip('SQLite was built without FTS5')
+
+
+def search(client, query, **params):
+    response = client.get('/api/links', query_string=dict(params, q=query))
+    assert response.status_code == 200, response.get_json()
+    return [link['shortlink'] for link in response.get_json()]
+
+
+def fts_rows(golinks, word):
+    """Shortlinks of the golinks_fts rows matching `word`, read from the index itself."""
+    with golinks.app.app_context():
+        return golinks.db.session.execute(
+            text(f'SELECT shortlink FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match'),
+            {'match': match_expression(word)}
+        ).scalars().all()
+
+
+def test_match_expression():
+    """Every word is prefix-matched; text without words doesn't use the index."""
+    assert match_expression('Team Wiki') == '"team"* AND "wiki"*'
+    assert match_expression('go/docs-v2') == '"go"* AND "docs"* AND "v2"*'
+    assert match_expression('--') is None
+
+
+def test_shortlink_matches_rank_first(client, create_link):
+    """A word in the shortlink outranks the same word in a destination."""
+    create_link('elsewhere', 'https://zebrafish.example/wiki')
+    create_link('zebrafish', 'https://example.com/fish')
+
+    assert search(client, 'zebrafish') == ['zebrafish', 'elsewhere']
+    assert search(client, 'zebra') == ['zebrafish', 'elsewhere']
+    assert search(client, 'zebra wiki') == ['elsewhere']
+
+
+def test_ranked_results_page_by_cursor(client, create_link):
+    """Ranked results are paged by offset, without repeats."""
+    for i in range(5):
+        create_link(f'pangolin-{i}')
+
+    first = client.get('/api/links', query_string={'q': 'pangolin', 'limit': 3})
+    rest = search(client, 'pangolin', limit=3, cursor=first.headers['X-Next-Cursor'])
+
+    shortlinks = [link['shortlink'] for link in first.get_json()] + rest
+    assert sorted(shortlinks) == [f'pangolin-{i}' for i in range(5)]
+    assert first.headers['X-Total-Count'] == '5'
+
+
+def test_rename_updates_index(golinks, client, create_link):
+    """Renaming a link replaces its row in the index."""
+    link = create_link('quokka-old', 'https://example.com/quokka')
+
+    response = client.put(f"/api/links/{link['id']}", json={
+        'shortlink': 'wombat-new', 'destination': 'https://example.com/wombat'
+    })
+
+    assert response.status_code == 200
+    assert fts_rows(golinks, 'quokka') == []
+    assert fts_rows(golinks, 'wombat') == ['wombat-new']
+    assert search(client, 'quokka') == []
+    assert search(client, 'wombat') == ['wombat-new']
+
+
+def test_delete_updates_index(golinks, client, create_link):
+    """Deleting a link removes its row from the index."""
+    create_link('axolotl', 'https://example.com/axolotl')
+
+    assert client.delete('/api/links/axolotl').status_code == 204
+
+    assert fts_rows(golinks, 'axolotl') == []
+    assert search(client, 'axolotl') == []
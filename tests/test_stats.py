@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+
+
+@pytest.mark.parametrize('body', [b'', b'{"shortlinks": [', b'["docs"]', b'{"shortlinks": "docs"}'])
+def test_batch_stats_rejects_bad_body(client, body):
+    """A body that isn't {"shortlinks": [...]} is a 400, not a server error."""
+    response = client.post('/api/links/stats', data=body, content_type='application/json')
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'shortlinks must be a list of strings'}
+
+
+def test_batch_stats_of_unused_links(client):
+    """Shortlinks without any visits report zero visits."""
+    response = client.post('/api/links/stats', json={'shortlinks': ['stats-unused']})
+
+    assert response.status_code == 200
+    assert response.get_json()['stats-unused']['visits'] == 0
+
+
+def test_unsketched_link_reports_unknown_visitors(golinks, client):
+    """A link whose clicks predate the visitor sketches reports null, not 0, even after new clicks."""
+    with golinks.app.app_context():
+        golinks.db.session.execute(golinks.db.insert(golinks.LinkUsageTotal.__table__).values(
+            shortlink='stats-legacy', visits=5, unique_visitors=None
+        ))
+        golinks.db.session.commit()
+        golinks.write_usage_events([{
+            'shortlink': 'stats-legacy', 'accessed_at': datetime.utcnow(), 'args': None,
+            'user_agent': 'test', 'ip_address': '10.0.0.1'
+        }])
+
+    stats = client.get('/api/links/stats-legacy/stats').get_json()
+
+    assert stats['visits'] == 6
+    assert stats['unique_visitors'] is None
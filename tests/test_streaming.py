@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+import streaming
+from streaming import NDJSON_MIMETYPE, stream_json
+
+
+@pytest.mark.parametrize('ndjson', [False, True])
+def test_encode_in_bounded_chunks(monkeypatch, ndjson):
+    """Items are flushed whenever the buffer fills, and the chunks join into valid output."""
+    monkeypatch.setattr(streaming, 'STREAM_BUFFER_SIZE', 100)
+    items = [{'shortlink': f'link-{i}', 'visits': i} for i in range(50)]
+
+    chunks = list(streaming._encode(iter(items), ndjson))
+
+    assert len(chunks) > 10
+    assert all(len(chunk) < 200 for chunk in chunks)
+    body = ''.join(chunks)
+    if ndjson:
+        assert [json.loads(line) for line in body.splitlines()] == items
+    else:
+        assert json.loads(body) == items
+
+
+def test_encode_nothing():
+    """No items is an empty array, or an empty NDJSON body."""
+    assert ''.join(streaming._encode(iter([]), False)) == '[]'
+    assert ''.join(streaming._encode(iter([]), True)) == ''
+
+
+def test_error_cuts_body_short(golinks, monkeypatch):
+    """An error after streaming has started ends the body instead of raising."""
+    monkeypatch.setattr(streaming, 'STREAM_BUFFER_SIZE', 1)
+    def items():
+        yield {'shortlink': 'first'}
+        raise RuntimeError('connection lost')
+
+    with golinks.app.test_request_context():
+        response = stream_json(items())
+        body = b''.join(response.iter_encoded())
+
+    assert body == b'[{"shortlink":"first"}'
+    with pytest.raises(ValueError):
+        json.loads(body)
+
+
+def test_links_stream_without_limit(client, create_link):
+    """Without a limit every link is streamed as one JSON array."""
+    create_link('streamed')
+
+    response = client.get('/api/links')
+
+    assert response.is_streamed
+    links = response.get_json()
+    assert 'streamed' in [link['shortlink'] for link in links]
+    assert int(response.headers['X-Total-Count']) == len(links)
+
+
+def test_links_as_ndjson(client, create_link):
+    """Clients that accept NDJSON get one link per line, paged or not."""
+    create_link('streamed-ndjson')
+    headers = {'Accept': NDJSON_MIMETYPE}
+
+    streamed = client.get('/api/links', headers=headers)
+    shortlinks = [json.loads(line)['shortlink'] for line in streamed.get_data(as_text=True).splitlines()]
+    paged = client.get('/api/links?limit=1', headers=headers)
+
+    assert streamed.mimetype == paged.mimetype == NDJSON_MIMETYPE
+    assert 'streamed-ndjson' in shortlinks
+    assert json.loads(paged.get_data(as_text=True))['shortlink'] == 'streamed-ndjson'
+
+
+def test_analytics_as_ndjson(golinks, client, create_link):
+    """Analytics stream one total per line in shortlink order."""
+    create_link('streamed-analytics')
+    client.get('/streamed-analytics')
+    golinks.usage_writer.join()
+
+    response = client.get('/api/analytics', headers={'Accept': NDJSON_MIMETYPE})
+
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    shortlinks = [row['shortlink'] for row in rows]
+    assert shortlinks == sorted(shortlinks)
+    assert rows[shortlinks.index('streamed-analytics')]['usage_count'] == 1
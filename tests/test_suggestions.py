@@ -0,0 +1,80 @@
+import random
+import string
+
+import pytest
+
+from suggestions import SHORT_NAME, SuggestionIndex, edit_distance
+
+
+class FixedStamp:
+    def changed(self):
+        return False
+
+
+def random_links(count, seed):
+    rng = random.Random(seed)
+    lengths = [3, 4, 4, 5, 5, 6, 7, 9, 12]
+    links = {
+        ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.choice(lengths)))
+        for _ in range(count)
+    }
+    return sorted(links | {'jira', 'docs', 'wiki'})
+
+
+def typos(links, seed):
+    """Swaps, substitutions, deletions and insertions of short shortlinks."""
+    rng = random.Random(seed)
+    names = ['jria', 'dcos', 'wkii', 'dosc']
+    for link in rng.sample([link for link in links if len(link) <= SHORT_NAME], 100):
+        i = rng.randrange(len(link) - 1)
+        c = rng.choice(string.ascii_lowercase)
+        names += [
+            link[:i] + link[i + 1] + link[i] + link[i + 2:],
+            link[:i] + c + link[i + 1:],
+            link[:i] + link[i + 1:],
+            link[:i] + c + link[i:],
+        ]
+    return [name for name in names if 0 < len(name) <= SHORT_NAME]
+
+
+@pytest.mark.parametrize('count', [1000, 10000])
+def test_short_names_find_every_link_one_edit_away(count):
+    """Suggestions for short names include everything brute force finds."""
+    links = random_links(count, seed=count)
+    index = SuggestionIndex(lambda: links, FixedStamp())
+    for name in typos(links, seed=count + 1):
+        expected = {link for link in links if link != name and edit_distance(name, link, 1) <= 1}
+        assert expected <= set(index.suggest(name, limit=len(links))), name
+
+
+@pytest.mark.parametrize('name, shortlink', [('jria', 'jira'), ('dcos', 'docs'), ('wkii', 'wiki'), ('dosc', 'docs')])
+def test_swapped_letters_rank_first(name, shortlink):
+    """A shortlink with two letters swapped is the first suggestion."""
+    index = SuggestionIndex(lambda: random_links(10000, seed=7), FixedStamp())
+    assert index.suggest(name)[0] == shortlink
+
+
+def test_removed_links_are_not_suggested():
+    """remove() takes a shortlink out of the deletion index as well."""
+    index = SuggestionIndex(lambda: ['jira', 'jiro'], FixedStamp())
+    index.suggest('jria')
+    index.remove('jira')
+    assert index.suggest('jria') == []
+    index.add('jira')
+    assert index.suggest('jria') == ['jira']
+
+
+def test_own_writes_do_not_reload_suggestions(golinks, client, create_link, monkeypatch):
+    """Creating a link updates the suggestion index in place."""
+    create_link('suggest-a')
+    assert client.get('/suggest-b').status_code == 404
+    loads = []
+    load = golinks.link_suggestions._load
+    monkeypatch.setattr(golinks.link_suggestions, '_load', lambda: loads.append(1) or load())
+
+    create_link('suggest-c')
+    response = client.get('/suggest-d')
+
+    assert response.status_code == 404
+    assert b'suggest-c' in response.data
+    assert loads == []
@@ -0,0 +1,20 @@
+from types import SimpleNamespace
+
+from tracing import sentry_options
+
+
+def test_errors_mode_leaves_tracing_off():
+    """Errors mode passes no sampling options, so the SDK never starts tracing."""
+    assert sentry_options(SimpleNamespace(SENTRY_MODE='errors')) == {}
+
+
+def test_sampled_mode_uses_samplers():
+    """Sampled mode traces and profiles through the per-route samplers."""
+    config = SimpleNamespace(
+        SENTRY_MODE='sampled',
+        SENTRY_TRACES_SAMPLE_RATE=1.0,
+        SENTRY_REDIRECT_TRACES_SAMPLE_RATE=0.01,
+        SENTRY_PROFILES_SAMPLE_RATE=1.0,
+        SENTRY_PROFILE_REDIRECTS=False,
+    )
+    assert set(sentry_options(config)) == {'traces_sampler', 'profiles_sampler'}
@@ -0,0 +1,96 @@
+import threading
+
+from usage_writer import OVERFLOW_DROP, UsageWriter
+
+
+class Sink:
+    """A flush callback that keeps every batch it was given."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def __call__(self, batch):
+        if self.fail:
+            raise RuntimeError('database is down')
+        self.batches.append(list(batch))
+
+    @property
+    def events(self):
+        return [event for batch in self.batches for event in batch]
+
+
+def test_flush_in_batches():
+    """Queued events reach the flush callback in batches of at most batch_size."""
+    sink = Sink()
+    writer = UsageWriter(sink, batch_size=10, interval_ms=50)
+
+    for i in range(25):
+        assert writer.enqueue(i)
+    writer.join()
+    writer.stop()
+
+    assert sorted(sink.events) == list(range(25))
+    assert all(len(batch) <= 10 for batch in sink.batches)
+    assert writer.stats()['flushed'] == 25
+
+
+def test_stop_drains_queue():
+    """Events still queued at shutdown are written, none are lost."""
+    release = threading.Event()
+    sink = Sink()
+    def slow_flush(batch):
+        release.wait()
+        sink(batch)
+    writer = UsageWriter(slow_flush, batch_size=5, interval_ms=1000)
+
+    for i in range(100):
+        writer.enqueue(i)
+    release.set()
+    writer.stop()
+
+    assert sorted(sink.events) == list(range(100))
+    assert writer.stats() == {'queued': 100, 'flushed': 100, 'dropped': 0, 'failed': 0, 'depth': 0}
+
+
+def test_failed_writes_are_counted():
+    """A flush that raises counts its events as failed and the writer keeps going."""
+    sink = Sink(fail=True)
+    writer = UsageWriter(sink, batch_size=4, interval_ms=50)
+
+    for i in range(10):
+        writer.enqueue(i)
+    writer.join()
+    sink.fail = False
+    writer.enqueue('after')
+    writer.stop()
+
+    stats = writer.stats()
+    assert (stats['failed'], stats['flushed']) == (10, 1)
+    assert sink.events == ['after']
+
+
+def test_full_queue_drops():
+    """With the drop policy a full queue refuses events instead of blocking."""
+    release = threading.Event()
+    writer = UsageWriter(lambda batch: release.wait(), max_queue=2, batch_size=1,
+                         interval_ms=1000, overflow=OVERFLOW_DROP)
+
+    accepted = [writer.enqueue(i) for i in range(10)]
+    release.set()
+    writer.stop()
+
+    assert not all(accepted)
+    assert writer.stats()['dropped'] == accepted.count(False)
+
+
+def test_redirects_are_recorded(golinks, client, create_link):
+    """Every redirect served ends up in the link's usage totals."""
+    create_link('writer-counted')
+
+    for _ in range(3):
+        assert client.get('/writer-counted').status_code == 302
+    golinks.usage_writer.join()
+
+    with golinks.app.app_context():
+        assert golinks.db.session.get(golinks.LinkUsageTotal, 'writer-counted').visits == 3
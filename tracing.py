@@ -0,0 +1,80 @@
+import sentry_sdk
+from sentry_sdk.integrations.flask import FlaskIntegration
+
+# Routes that are not shortlink redirects
+NON_REDIRECT_PATHS = ('', '/')
+NON_REDIRECT_PREFIXES = ('/api/', '/static/')
+
+SENTRY_MODES = ('full', 'sampled', 'errors')
+
+
+def is_redirect_path(path):
+    return path not in NON_REDIRECT_PATHS and not path.startswith(NON_REDIRECT_PREFIXES)
+
+
+def _request_path(sampling_context):
+    environ = sampling_context.get('wsgi_environ') or {}
+    return environ.get('PATH_INFO', '')
+
+
+def make_traces_sampler(redirect_rate, default_rate):
+    """Sample redirects at `redirect_rate` and every other request at `default_rate`."""
+
+    def traces_sampler(sampling_context):
+        # Keep traces that continue from an upstream service whole
+        parent_sampled = sampling_context.get('parent_sampled')
+        if parent_sampled is not None:
+            return float(parent_sampled)
+        if is_redirect_path(_request_path(sampling_context)):
+            return redirect_rate
+        return default_rate
+
+    return traces_sampler
+
+
+def make_profiles_sampler(profile_redirects, rate):
+    """Profile `rate` of the sampled transactions, optionally skipping redirects."""
+
+    def profiles_sampler(sampling_context):
+        if not profile_redirects and is_redirect_path(_request_path(sampling_context)):
+            return 0.0
+        return rate
+
+    return profiles_sampler
+
+
+def sentry_options(config):
+    """Keyword arguments for sentry_sdk.init() for the configured mode.
+
+    full     trace and profile every request (the old behaviour)
+    sampled  per-route trace sampling, redirects sampled much less often
+    errors   report errors only, no tracing or profiling overhead
+    """
+    mode = config.SENTRY_MODE
+    if mode not in SENTRY_MODES:
+        raise ValueError(f"Unknown Sentry mode '{mode}', expected one of {', '.join(SENTRY_MODES)}")
+
+    if mode == 'full':
+        return {'traces_sample_rate': 1.0, 'profiles_sample_rate': 1.0}
+    if mode == 'errors':
+        # Any traces_sample_rate, even 0.0, turns tracing on in the SDK
+        return {}
+    return {
+        'traces_sampler': make_traces_sampler(
+            config.SENTRY_REDIRECT_TRACES_SAMPLE_RATE,
+            config.SENTRY_TRACES_SAMPLE_RATE
+        ),
+        'profiles_sampler': make_profiles_sampler(
+            config.SENTRY_PROFILE_REDIRECTS,
+            config.SENTRY_PROFILES_SAMPLE_RATE
+        ),
+    }
+
+
+def init_sentry(config, **kwargs):
+    sentry_sdk.init(
+        dsn=config.SENTRY_DSN,
+        integrations=[FlaskIntegration()],
+        **sentry_options(config),
+        **kwargs
+    )
@@ -0,0 +1,166 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+OVERFLOW_DROP = 'drop'
+OVERFLOW_BLOCK = 'block'
+
+# How long a request waits for queue space under the 'block' policy before
+# giving up and dropping the event anyway.
+BLOCK_TIMEOUT = 5.0
+
+
+class UsageWriter:
+    """Buffers usage events in memory and writes them in batches.
+
+    Redirects call enqueue(), which never touches the database. A background
+    thread collects events and hands them to `flush` as a list, either once
+    `batch_size` events are waiting or `interval_ms` after the first one
+    arrived, whichever comes first.
+
+    The thread is started lazily and restarted after a fork, so the writer
+    works the same under the dev server and under preloaded gunicorn workers.
+    """
+
+    def __init__(self, flush, max_queue=10000, batch_size=500, interval_ms=1000,
+                 overflow=OVERFLOW_DROP, logger=None):
+        if overflow not in (OVERFLOW_DROP, OVERFLOW_BLOCK):
+            raise ValueError(f'Unknown usage overflow policy: {overflow}')
+        self.flush = flush
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000
+        self.overflow = overflow
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.queued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked: the parent's thread and queued events don't exist here
+                self._reset()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='golinks-usage-writer', daemon=True
+                )
+                self._thread.start()
+
+    def enqueue(self, event, wait=True):
+        """Queue one event; returns False if it was dropped.
+
+        With wait=False a full queue drops the event even under the 'block'
+        policy, for callers such as an event loop that must never wait.
+        """
+        self._ensure_started()
+        try:
+            if wait and self.overflow == OVERFLOW_BLOCK:
+                self._queue.put(event, timeout=BLOCK_TIMEOUT)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.queued += 1
+        return True
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self.queued,
+                'flushed': self.flushed,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'depth': self.depth(),
+            }
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            self.flush(batch)
+        except Exception as e:
+            self.logger.error(f'Error writing {len(batch)} usage events: {str(e)}')
+            with self._lock:
+                self.failed += len(batch)
+        else:
+            with self._lock:
+                self.flushed += len(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+        self._drain()
+
+    def _drain(self):
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._write(batch)
+
+    def join(self):
+        """Block until every event queued so far has been written."""
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def stop(self, timeout=10.0):
+        """Flush whatever is queued and stop the background thread."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self.logger.warning('Usage writer did not drain before shutdown')
+        else:
+            self._thread = None
+        stats = self.stats()
+        self.logger.info(
+            f"Usage writer stopped: queued={stats['queued']} flushed={stats['flushed']} "
+            f"dropped={stats['dropped']} failed={stats['failed']}"
+        )